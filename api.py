@@ -8,7 +8,23 @@ from flask_cors import CORS
 import joblib
 import pandas as pd
 import numpy as np
+import atexit
 import os
+import threading
+import time
+from src.cluster_profile import load_cluster_profile
+from src.stats_cube import build_cube, query_cube, update_cube
+from src.percentiles import build_rank_index, rank_scores, cohort_sizes
+from src.similarity_index import load_similarity_index, query_similar, nearest_clusters, DEFAULT_K
+from src.response_ingest import (responses_frame, survey_rows, source_fingerprint, save_checkpoint,
+                                 load_checkpoint, CHECKPOINT_EVERY_ROWS, CHECKPOINT_EVERY_SECONDS, YEAR_NAMES)
+from src.response_store import (open_store, close_store, submit_responses, submit_predictions, connection,
+                                query_responses, count_responses, store_status)
+from src.explanations import build_explainer, explain_rows, explanation_payloads, student_matrix, class_names
+from src.drift_monitor import load_reference, create_monitor, observe, drift_report
+from src.distillation import load_distilled
+from src.eda_aggregates import load_aggregates, SECTIONS as EDA_SECTIONS
+from src import instruments
 
 app = Flask(__name__)
 CORS(app)
@@ -23,6 +39,45 @@ MODELS = {
 # Load data for statistics
 df = pd.read_csv('outputs/clustered_data.csv')
 
+# Flattened node tables of each forest: /predict and /explain score and explain in one vectorized pass
+TARGET_COLS = {'anxiety': 'Anxiety Label', 'stress': 'Stress Label', 'depression': 'Depression Label'}
+EXPLAINERS = {name: build_explainer(model, class_names(TARGET_COLS[name], df)) for name, model in MODELS.items()}
+
+# Fast tier: shallow trees distilled from the forests (src/distillation.py); a prediction whose confidence is
+# below its target's threshold is escalated to the forest
+DISTILLED = load_distilled()
+FAST_EXPLAINERS = {name: build_explainer(DISTILLED[col]['model'], DISTILLED[col]['classes'])
+                   for name, col in TARGET_COLS.items()} if DISTILLED else None
+FAST_THRESHOLDS = {name: DISTILLED[col]['threshold'] for name, col in TARGET_COLS.items()} if DISTILLED else None
+TIERS = ['full', 'fast']
+
+# Aggregate cube over University x Department x Year x Gender x Scholarship; /stats merges its cells.
+# POST /responses updates it in place; it resumes from the last checkpoint if built from the same data
+STATS_SOURCE = source_fingerprint('outputs/clustered_data.csv')
+STATS_CUBE, INGESTED = load_checkpoint(STATS_SOURCE) or (build_cube(df), 0)
+STATS_LOCK = threading.Lock()
+CHECKPOINT_STATE = {'saved_rows': INGESTED, 'saved_at': time.monotonic()}
+
+# Presorted score arrays (global and per cohort) for /percentile lookups
+RANK_INDEX = build_rank_index(df)
+
+# Append-only SQLite store for ingested responses and predictions; a background thread batches the writes
+STORE = open_store()
+atexit.register(close_store, STORE)
+
+# Per-cluster profile written by 3_clustering_analysis (served without rescanning df)
+CLUSTER_PROFILE = load_cluster_profile()
+
+# KD-tree over the standardized clustering features, persisted next to the models
+SIMILARITY_INDEX = load_similarity_index()
+
+# EDA statistics behind the figures, saved by 2_exploratory_analysis (served as is, no rows are read)
+EDA_AGGREGATES = load_aggregates()
+
+# Fixed-bin histograms of /predict inputs, compared with the training data's (saved by 4_classification_models)
+DRIFT_REFERENCE = load_reference()
+DRIFT_MONITOR = create_monitor(DRIFT_REFERENCE) if DRIFT_REFERENCE else None
+
 
 @app.route('/')
 def home():
@@ -32,9 +87,16 @@ def home():
         'version': '1.0.0',
         'author': 'Sakhi Patel',
         'endpoints': {
-            '/predict': 'POST - Predict mental health levels',
+            '/predict': 'POST - Predict mental health levels ("tier": "fast" for the distilled models)',
             '/assess': 'POST - Complete assessment with scores',
-            '/stats': 'GET - Get dataset statistics',
+            '/percentile': 'GET/POST - Percentile rank of scores within the cohort',
+            '/responses': 'POST - Submit new survey responses (live statistics); GET - Stored responses',
+            '/stats': 'GET - Get dataset statistics (filter by university, department, year, gender, scholarship)',
+            '/clusters': 'GET - Per-cluster profiles (/clusters/<id> for one)',
+            '/similar': 'POST - Outcomes of the most similar students',
+            '/explain': 'POST - Per-feature contributions behind each prediction',
+            '/drift': 'GET - Drift of /predict inputs from the training data (PSI, KS)',
+            '/eda': 'GET - EDA statistics behind the figures (?section=histograms, groups, ...)',
             '/health': 'GET - API health check'
         }
     })
@@ -42,8 +104,11 @@ def home():
 
 @app.route('/health')
 def health():
-    """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'models_loaded': len(MODELS)})
+    """Health check endpoint (degraded while the response store cannot write)"""
+    store = store_status(STORE)
+    status = 'healthy' if store['writer_alive'] and store['error'] is None else 'degraded'
+    return jsonify({'status': status, 'models_loaded': len(MODELS), 'fast_tier': FAST_EXPLAINERS is not None,
+                    'response_store': store})
 
 
 @app.route('/predict', methods=['POST'])
@@ -58,7 +123,9 @@ def predict():
         "cgpa": 3.5,
         "scholarship": 1,  # 0=No, 1=Yes
         "academic_year": 2,  # 1-4
-        "cluster": 1  # Optional, will be estimated if not provided
+        "cluster": 1,  # Optional, will be estimated if not provided
+        "tier": "fast",  # Optional: "full" (default, the forests) or "fast" (distilled trees, also ?tier=fast)
+        "threshold": 0.8  # Optional with "fast": escalate below this confidence (default: per-model threshold)
     }
     """
     try:
@@ -68,47 +135,59 @@ def predict():
         required = ['age', 'gender', 'cgpa', 'scholarship', 'academic_year']
         if not all(k in data for k in required):
             return jsonify({'error': f'Missing required fields: {required}'}), 400
+        tier = data.get('tier', request.args.get('tier', 'full'))
+        if tier not in TIERS:
+            return jsonify({'error': f'tier must be one of {TIERS}'}), 400
+        if tier == 'fast' and FAST_EXPLAINERS is None:
+            return jsonify({'error': 'Distilled models not found, run src/distillation.py'}), 503
+        threshold = data.get('threshold')
+        if threshold is not None and (isinstance(threshold, bool) or not isinstance(threshold, (int, float))
+                                      or not 0 <= threshold <= 1):
+            return jsonify({'error': 'threshold must be a number between 0 and 1'}), 400
         
-        # Estimate cluster if not provided
-        if 'cluster' not in data:
-            data['cluster'] = estimate_cluster(data['cgpa'])
-        
-        # Prepare features
-        features = pd.DataFrame([{
-            'Age': data['age'],
-            'Gender': data['gender'],
-            'Current CGPA': data['cgpa'],
-            'Scholarship': data['scholarship'],
-            'Academic Year': data['academic_year'],
-            'Cluster': data['cluster']
-        }])
+        # Prepare features (a missing cluster is estimated from CGPA)
+        try:
+            features = student_matrix([data], estimate_cluster)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        data.setdefault('cluster', int(features['Cluster'].iloc[0]))
+        if DRIFT_MONITOR is not None:
+            observe(DRIFT_MONITOR, features.to_numpy())
         
-        # Make predictions
+        # Make predictions; the tree-path explanation comes from the same pass
         predictions = {}
-        for name, model in MODELS.items():
-            pred = model.predict(features)[0]
-            proba = model.predict_proba(features)[0]
-            
-            label_map = {0: 'Low', 1: 'Medium', 2: 'High'}
+        for name in MODELS:
+            explainer, served, (proba, baseline, contributions) = score_tiered(name, features, tier, threshold)
+            explanation = explanation_payloads(explainer, proba, baseline, contributions)[0]
+            probabilities = dict.fromkeys(instruments.LEVELS, 0.0)
+            probabilities.update(zip(explainer['classes'], map(float, proba[0])))
             predictions[name] = {
-                'level': label_map.get(pred, 'Low'),
-                'confidence': float(max(proba)),
-                'probabilities': {
-                    'Low': float(proba[0]) if len(proba) > 0 else 0,
-                    'Medium': float(proba[1]) if len(proba) > 1 else 0,
-                    'High': float(proba[2]) if len(proba) > 2 else 0
-                }
+                'level': explanation['level'],
+                'confidence': float(max(proba[0])),
+                'probabilities': probabilities,
+                'tier': served,
+                'explanation': {'baseline': explanation['baseline'], 'contributions': explanation['contributions']}
             }
         
+        # Log predictions to the response store (written off the request thread)
+        store_error = submit_predictions(STORE, pd.DataFrame([{
+            'age': data['age'], 'gender': data['gender'], 'cgpa': data['cgpa'],
+            'scholarship': data['scholarship'], 'academic_year': data['academic_year'], 'cluster': data['cluster'],
+            'target': name, 'level': pred['level'], 'confidence': pred['confidence']
+        } for name, pred in predictions.items()]))
+        
         # Generate recommendations
         recommendations = generate_recommendations(predictions)
         
-        return jsonify({
+        result = {
             'predictions': predictions,
             'recommendations': recommendations,
             'input': data
-        })
-        
+        }
+        if store_error:
+            result['store_error'] = store_error
+        return jsonify(result)
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -121,7 +200,7 @@ def assess():
     Request body:
     {
         "anxiety_responses": [2, 3, 1, 2, 3, 2, 1],  # 7 questions, 0-4 scale
-        "stress_responses": [2, 2, 3, 2, 1, 3, 2, 1, 2, 3],  # 10 questions
+        "stress_responses": [2, 2, 3, 2, 1, 3, 2, 1, 2, 3],  # 10 questions, 5-8 reverse-keyed
         "depression_responses": [1, 2, 1, 2, 3, 2, 1, 0, 0]  # 9 questions
     }
     """
@@ -130,38 +209,19 @@ def assess():
         
         results = {}
         
-        # Anxiety assessment
-        if 'anxiety_responses' in data:
-            anxiety_score = sum(data['anxiety_responses'])
-            results['anxiety'] = {
-                'score': anxiety_score,
-                'max_score': 28,
-                'level': get_level(anxiety_score, 18, 35),
-                'interpretation': get_interpretation('anxiety', anxiety_score)
-            }
-        
-        # Stress assessment
-        if 'stress_responses' in data:
-            stress_score = sum(data['stress_responses'])
-            results['stress'] = {
-                'score': stress_score,
-                'max_score': 40,
-                'level': get_level(stress_score, 18, 35),
-                'interpretation': get_interpretation('stress', stress_score)
-            }
-        
-        # Depression assessment
-        if 'depression_responses' in data:
-            depression_score = sum(data['depression_responses'])
-            results['depression'] = {
-                'score': depression_score,
-                'max_score': 36,
-                'level': get_level(depression_score, 18, 35),
-                'interpretation': get_interpretation('depression', depression_score)
-            }
+        # Score each submitted instrument with the shared scoring engine
+        for category in ['anxiety', 'stress', 'depression']:
+            if f'{category}_responses' not in data:
+                continue
+            try:
+                result = instruments.assess(category, data[f'{category}_responses'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            results[category] = {key: result[key] for key in ('score', 'max_score', 'level', 'interpretation')}
+            results[category]['percentile'] = rank_scores(RANK_INDEX, {category: result['score']})[category][0]['percentile']
             
             # Check for suicidal thoughts
-            if len(data['depression_responses']) >= 9 and data['depression_responses'][8] >= 2:
+            if result['crisis']:
                 results['crisis_alert'] = True
                 results['crisis_resources'] = get_crisis_resources()
         
@@ -169,47 +229,254 @@ def assess():
         results['recommendations'] = generate_assessment_recommendations(results)
         
         return jsonify(results)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/responses', methods=['POST'])
+def responses():
+    """
+    Ingest new survey responses into the live statistics (one object, or a batch under "responses")
+    
+    Request body:
+    {
+        "university": "Duke University", "department": "Biology",
+        "academic_year": 2, "gender": 1, "scholarship": 0, "age": 20, "cgpa": 3.4,
+        "anxiety_responses": [...7], "stress_responses": [...10], "depression_responses": [...9]
+    }
+    """
+    global INGESTED
+    try:
+        data = request.json or {}
+        records = data.get('responses', [data])
+        try:
+            rows, crisis = responses_frame(records)
+            if SIMILARITY_INDEX is not None:
+                rows['Cluster'] = nearest_clusters(SIMILARITY_INDEX, rows)
+            else:
+                rows['Cluster'] = [estimate_cluster(cgpa) for cgpa in rows['Current CGPA']]
+            with STATS_LOCK:
+                update_cube(STATS_CUBE, rows)
+                INGESTED += len(rows)
+                checkpoint_if_due()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        store_error = submit_responses(STORE, survey_rows(rows))
+        
+        scored = []
+        for _, row in rows.iterrows():
+            entry = {name: {'score': int(row[f'{name.title()} Value']), 'level': row[f'{name.title()} Label']}
+                     for name in ['anxiety', 'stress', 'depression']}
+            entry['cluster'] = int(row['Cluster'])
+            scored.append(entry)
+        result = {'accepted': len(rows), 'ingested_responses': INGESTED, 'scored': scored}
+        if store_error:
+            result['store_error'] = store_error
+        if crisis.any():
+            result['crisis_alert'] = True
+            result['crisis_resources'] = get_crisis_resources()
+        return jsonify(result), 201
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/responses', methods=['GET'])
+def stored_responses():
+    """
+    Stored responses, oldest first, from the SQLite store (indexed cohort filters)
+    
+    Query parameters: university, department, year (1-4) - repeat to select several;
+    limit (default 100, max 1000); after_id (page after the last id you received)
+    """
+    try:
+        filters = {}
+        for key, col in [('university', 'University'), ('department', 'Department'), ('year', 'Academic Year')]:
+            values = request.args.getlist(key)
+            if values:
+                filters[col] = [YEAR_NAMES.get(int(v), v) if key == 'year' and v.isdigit() else v for v in values]
+        try:
+            limit = min(int(request.args.get('limit', 100)), 1000)
+            after_id = int(request.args.get('after_id', 0))
+        except ValueError:
+            return jsonify({'error': 'limit and after_id must be whole numbers'}), 400
+        
+        conn = connection(STORE)
+        page = query_responses(conn, filters, limit=limit, after_id=after_id)
+        return jsonify({
+            'stored_responses': count_responses(conn),
+            'responses': page.to_dict(orient='records'),
+            'next_after_id': int(page['id'].iloc[-1]) if len(page) else None
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/percentile', methods=['GET', 'POST'])
+def percentile():
+    """
+    Percentile rank of scores within the whole dataset and, optionally, one cohort per dimension
+    
+    GET  /percentile?stress=25&stress=30&cgpa=3.1&university=Duke University
+    POST {"scores": {"stress": [25, 30], "cgpa": [3.1]}, "cohort": {"university": "Duke University"}}
+    """
+    try:
+        if request.method == 'POST':
+            data = request.json or {}
+            scores, cohort = data.get('scores', {}), data.get('cohort', {})
+        else:
+            scores = {key: request.args.getlist(key) for key in request.args if key not in STATS_CUBE['categories']}
+            cohort = {key: request.args[key] for key in request.args if key in STATS_CUBE['categories']}
+        if not scores:
+            return jsonify({'error': 'No scores given, expected any of anxiety, stress, depression, cgpa'}), 400
+        try:
+            ranks = rank_scores(RANK_INDEX, scores, cohort)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
+        return jsonify({'percentiles': ranks, 'cohort_size': cohort_sizes(RANK_INDEX, cohort)})
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/stats')
 def stats():
-    """Get dataset statistics"""
+    """
+    Get dataset statistics, optionally filtered
+    
+    Query parameters (repeat one to select several values):
+        university, department, year (1-4), gender (0=Male, 1=Female), scholarship (0=No, 1=Yes)
+    e.g. /stats?university=Duke University&year=2
+    """
     try:
-        statistics = {
-            'total_students': len(df),
-            'cgpa': {
-                'mean': float(df['Current CGPA'].mean()),
-                'std': float(df['Current CGPA'].std()),
-                'min': float(df['Current CGPA'].min()),
-                'max': float(df['Current CGPA'].max())
-            },
-            'mental_health': {
-                'anxiety': {
-                    'mean': float(df['Anxiety Value'].mean()),
-                    'distribution': df['Anxiety Label'].value_counts().to_dict()
-                },
-                'stress': {
-                    'mean': float(df['Stress Value'].mean()),
-                    'distribution': df['Stress Label'].value_counts().to_dict()
-                },
-                'depression': {
-                    'mean': float(df['Depression Value'].mean()),
-                    'distribution': df['Depression Label'].value_counts().to_dict()
-                }
-            },
-            'correlations': {
-                'cgpa_anxiety': float(df[['Current CGPA', 'Anxiety Value']].corr().iloc[0, 1]),
-                'cgpa_stress': float(df[['Current CGPA', 'Stress Value']].corr().iloc[0, 1]),
-                'cgpa_depression': float(df[['Current CGPA', 'Depression Value']].corr().iloc[0, 1])
-            },
-            'clusters': df['Cluster'].value_counts().to_dict()
-        }
+        filters = {dim: request.args.getlist(dim) for dim in request.args}
+        try:
+            with STATS_LOCK:
+                statistics = query_cube(STATS_CUBE, filters)
+                statistics['ingested_responses'] = INGESTED
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if filters:
+            statistics['filters'] = filters
         
         return jsonify(statistics)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/clusters')
+@app.route('/clusters/<int:cluster_id>')
+def clusters(cluster_id=None):
+    """Get per-cluster sizes, means, shares and label distributions"""
+    if CLUSTER_PROFILE is None:
+        return jsonify({'error': 'Cluster profile not found, run src/3_clustering_analysis.py'}), 503
+    if cluster_id is None:
+        return jsonify(CLUSTER_PROFILE)
+    if not 0 <= cluster_id < CLUSTER_PROFILE['n_clusters']:
+        return jsonify({'error': f"Unknown cluster {cluster_id} (0-{CLUSTER_PROFILE['n_clusters'] - 1})"}), 404
+    return jsonify(CLUSTER_PROFILE['clusters'][cluster_id])
+
+
+@app.route('/similar', methods=['POST'])
+def similar():
+    """
+    Aggregate mental-health outcomes of the k most similar students
+    
+    Request body (one student, or a batch under "students"):
+    {
+        "age": 20, "gender": 0, "cgpa": 3.5, "scholarship": 1, "academic_year": 2,
+        "k": 25  # Optional, default 25
+    }
+    {"students": [{...}, {...}], "k": 25}
+    """
+    if SIMILARITY_INDEX is None:
+        return jsonify({'error': 'Similarity index not found or built with another scikit-learn, '
+                                 'run src/3_clustering_analysis.py'}), 503
+    try:
+        data = request.json or {}
+        students = data.get('students', [data])
+        try:
+            results = query_similar(SIMILARITY_INDEX, students, k=data.get('k', DEFAULT_K))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({'results': results} if 'students' in data else results[0])
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/explain', methods=['POST'])
+def explain():
+    """
+    Why each model predicted what it did: exact per-feature contributions from the forests' tree paths
+    
+    Request body (one student, or a batch under "students"; same fields as /predict):
+    {"age": 20, "gender": 0, "cgpa": 3.5, "scholarship": 1, "academic_year": 2, "cluster": 1}
+    {"students": [{...}, {...}]}
+    """
+    try:
+        data = request.json or {}
+        students = data.get('students', [data])
+        try:
+            features = student_matrix(students, estimate_cluster)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        results = [{} for _ in students]
+        for name, explainer in EXPLAINERS.items():
+            proba, baseline, contributions = explain_rows(explainer, features)
+            for result, payload in zip(results, explanation_payloads(explainer, proba, baseline, contributions,
+                                                                     all_classes=True)):
+                result[name] = payload
         
+        return jsonify({'results': results} if 'students' in data else results[0])
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/drift')
+def drift():
+    """
+    Drift of /predict inputs from the training data: PSI and binned KS per feature
+    
+    The report is refreshed every minute in the background; ?refresh=1 recomputes it now.
+    """
+    if DRIFT_MONITOR is None:
+        return jsonify({'error': 'Drift reference not found, run src/4_classification_models.py'}), 503
+    try:
+        report = DRIFT_MONITOR['report']
+        if report is None or request.args.get('refresh') == '1':
+            report = drift_report(DRIFT_MONITOR)
+        return jsonify(report)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/eda')
+def eda():
+    """
+    The numbers behind the EDA figures: counts, histograms, correlations, group means, box and violin inputs
+    
+    ?section=histograms&section=groups returns only those sections (default: all).
+    """
+    if EDA_AGGREGATES is None:
+        return jsonify({'error': 'EDA aggregates not found, run src/2_exploratory_analysis.py'}), 503
+    try:
+        sections = request.args.getlist('section') or EDA_SECTIONS
+        unknown = [name for name in sections if name not in EDA_SECTIONS]
+        if unknown:
+            return jsonify({'error': f'Unknown section {unknown[0]!r}, expected one of {EDA_SECTIONS}'}), 400
+        payload = {key: EDA_AGGREGATES[key] for key in ('version', 'source', 'rows', 'exact', 'scores')}
+        payload.update({name: EDA_AGGREGATES[name] for name in sections})
+        return jsonify(payload)
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -225,39 +492,32 @@ def estimate_cluster(cgpa):
         return 2  # Medium risk
 
 
-def get_level(score, medium_threshold, high_threshold):
-    """Determine level based on score"""
-    if score < medium_threshold:
-        return 'Low'
-    elif score < high_threshold:
-        return 'Medium'
-    else:
-        return 'High'
+def score_tiered(name, features, tier, threshold=None):
+    """Probabilities and explanation of one model: the distilled tree on the fast tier unless it is unsure
+    
+    Returns (explainer, tier served, explain_rows output); a fast answer below the threshold escalates to 'full'.
+    """
+    if tier == 'fast':
+        scored = explain_rows(FAST_EXPLAINERS[name], features)
+        if scored[0].max() >= (FAST_THRESHOLDS[name] if threshold is None else threshold):
+            return FAST_EXPLAINERS[name], 'fast', scored
+    return EXPLAINERS[name], 'full', explain_rows(EXPLAINERS[name], features)
 
 
-def get_interpretation(category, score):
-    """Get interpretation for score"""
-    level = get_level(score, 18, 35)
-    
-    interpretations = {
-        'anxiety': {
-            'Low': 'You appear to have minimal anxiety related to academics.',
-            'Medium': 'You are experiencing moderate levels of academic anxiety.',
-            'High': 'You are experiencing high levels of academic anxiety.'
-        },
-        'stress': {
-            'Low': 'You appear to be managing academic stress well.',
-            'Medium': 'You are experiencing moderate levels of academic stress.',
-            'High': 'You are experiencing high levels of academic stress.'
-        },
-        'depression': {
-            'Low': 'You appear to have minimal depressive symptoms.',
-            'Medium': 'You are experiencing moderate depressive symptoms.',
-            'High': 'You are experiencing significant depressive symptoms.'
-        }
-    }
-    
-    return interpretations.get(category, {}).get(level, '')
+def checkpoint_if_due(force=False):
+    """Save the live aggregates every CHECKPOINT_EVERY_ROWS rows or CHECKPOINT_EVERY_SECONDS (caller holds STATS_LOCK)"""
+    pending = INGESTED - CHECKPOINT_STATE['saved_rows']
+    elapsed = time.monotonic() - CHECKPOINT_STATE['saved_at']
+    if pending and (force or pending >= CHECKPOINT_EVERY_ROWS or elapsed >= CHECKPOINT_EVERY_SECONDS):
+        save_checkpoint(STATS_CUBE, INGESTED, STATS_SOURCE)
+        CHECKPOINT_STATE.update(saved_rows=INGESTED, saved_at=time.monotonic())
+
+
+@atexit.register
+def final_checkpoint():
+    """Flush rows ingested since the last checkpoint on shutdown"""
+    with STATS_LOCK:
+        checkpoint_if_due(force=True)
 
 
 def generate_recommendations(predictions):
@@ -311,9 +571,17 @@ if __name__ == '__main__':
     print("\nAPI Endpoints:")
     print("  GET  /           - API information")
     print("  GET  /health     - Health check")
-    print("  POST /predict    - Predict mental health levels")
+    print("  POST /predict    - Predict mental health levels (tier: full/fast)")
     print("  POST /assess     - Complete assessment")
+    print("  GET  /percentile - Percentile ranks")
+    print("  POST /responses  - Ingest survey responses")
+    print("  GET  /responses  - Stored responses")
     print("  GET  /stats      - Dataset statistics")
+    print("  GET  /clusters   - Cluster profiles")
+    print("  POST /similar    - Similar students' outcomes")
+    print("  POST /explain    - Prediction explanations")
+    print("  GET  /drift      - Input drift monitor")
+    print("  GET  /eda        - EDA aggregates for dashboards")
     print("\nStarting server on http://localhost:5000")
     print("="*60 + "\n")
     
@@ -5,17 +5,20 @@ Author: Sakhi Patel
 
 import os
 import sys
+import argparse
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src import generate_data
-from src import utils as _  # Import to ensure module is available
+from src import utils
+from src import profiling
 import importlib
 
 
-def main():
-    """Execute complete analysis pipeline"""
+def main(plots=True, n_jobs=None, tune=False, cluster_engine='sklearn', select_k=None, source='csv',
+         profile=False, use_cprofile=False):
+    """Execute complete analysis pipeline (profile: time every stage and sub-step, see src/profiling.py)"""
     
     print("\n" + "="*70)
     print(" "*10 + "STUDENT MENTAL HEALTH PREDICTION - COMPLETE ANALYSIS")
@@ -31,9 +34,14 @@ def main():
     os.makedirs('outputs/models', exist_ok=True)
     os.makedirs('outputs/results', exist_ok=True)
     print("  ✓ Directories created")
+    if profile:
+        profiling.start(use_cprofile=use_cprofile)
+        print(f"  ✓ Profiling on (tracemalloc{' + cProfile' if use_cprofile else ''}; timings include its overhead)")
     
     # Check if data exists, if not generate it
-    if not os.path.exists('data/student_mental_health_survey.csv'):
+    if source == 'sqlite':
+        print("\n[Step 0/4] Reading responses from the SQLite store")
+    elif not os.path.exists('data/student_mental_health_survey.csv'):
         print("\n[Step 0/4] Generating synthetic dataset...")
         generate_data.generate_synthetic_data(500).to_csv('data/student_mental_health_survey.csv', index=False)
         print("  ✓ Dataset generated")
@@ -45,25 +53,42 @@ def main():
     print("[Step 1/4] Running Data Preprocessing...")
     print("="*70)
     preprocessing = importlib.import_module('src.1_data_preprocessing')
-    preprocessing.run()
+    with profiling.stage('1_data_preprocessing'):
+        n_rows = len(preprocessing.run(source=source))
     
     print("\n" + "="*70)
     print("[Step 2/4] Running Exploratory Data Analysis...")
     print("="*70)
     eda = importlib.import_module('src.2_exploratory_analysis')
-    eda.run()
+    with profiling.stage('2_exploratory_analysis'):
+        eda.run(plots=plots, n_jobs=n_jobs)
     
     print("\n" + "="*70)
     print("[Step 3/4] Running Clustering Analysis...")
     print("="*70)
     clustering = importlib.import_module('src.3_clustering_analysis')
-    clustering.run()
+    with profiling.stage('3_clustering_analysis'):
+        n_clusters = clustering.run(plots=plots, engine=cluster_engine, n_jobs=n_jobs, select_k=select_k)
+    
+    if tune:
+        print("\n" + "="*70)
+        print("[Step 4/4] Tuning Random Forest Hyperparameters...")
+        print("="*70)
+        tuning = importlib.import_module('src.hyperparameter_tuning')
+        with profiling.stage('hyperparameter_tuning'):
+            tuning.run(n_jobs=n_jobs or -1)
     
     print("\n" + "="*70)
     print("[Step 4/4] Running Classification Models...")
     print("="*70)
     classification = importlib.import_module('src.4_classification_models')
-    classification.run()
+    with profiling.stage('4_classification_models'):
+        classification.run(plots=plots, n_jobs=n_jobs)
+    
+    # Shallow trees fitted to the forests' probabilities, served by the API's fast tier
+    distillation = importlib.import_module('src.distillation')
+    with profiling.stage('distillation'):
+        distillation.run()
     
     # Final summary
     print("\n" + "="*70)
@@ -71,18 +96,39 @@ def main():
     print("="*70)
     
     print("\n📊 Results Summary:")
-    print("  ✓ Dataset: 500 student survey responses")
+    print(f"  ✓ Dataset: {n_rows:,} student survey responses")
     print("  ✓ Preprocessing: Data cleaned and encoded")
-    print("  ✓ Visualizations: 22+ plots created")
-    print("  ✓ Clustering: K-Means with 4 clusters")
-    print("  ✓ Models: 3 Random Forest classifiers trained")
+    if plots:
+        total_plots = utils.PLOT_STATS['rendered'] + utils.PLOT_STATS['reused']
+        print(f"  ✓ Visualizations: {utils.PLOT_STATS['rendered']} of {total_plots} rendered, "
+              f"{utils.PLOT_STATS['reused']} reused from cache")
+    else:
+        print("  ✓ Visualizations: skipped (--no-plots)")
+    print(f"  ✓ Clustering: K-Means with {n_clusters} clusters")
+    print("  ✓ Models: 3 Random Forest classifiers trained (distilled into shallow trees for the fast tier)")
+    
+    if profile:
+        report = profiling.write_report()
+        profiling.stop()
+        print("\n⏱ Profile (wall / CPU seconds, tracemalloc peak):")
+        for stage in report['stages']:
+            print(f"  {stage['name']:<26} {stage['wall_seconds']:>8.2f}s {stage['cpu_seconds']:>8.2f}s "
+                  f"{stage['peak_mb']:>8.1f} MB")
+        print(f"  ✓ Report: {profiling.REPORT_TXT} (JSON: {profiling.REPORT_JSON})")
+        if use_cprofile:
+            print(f"  ✓ cProfile dumps: {profiling.PROFILE_DIR}/<stage>.prof")
     
     print("\n📁 Output Files:")
     print("  • Cleaned Data: outputs/cleaned_data.csv")
     print("  • Clustered Data: outputs/clustered_data.csv")
-    print("  • Visualizations: outputs/visualizations/ (22+ PNG files)")
-    print("  • Models: outputs/models/ (3 .pkl files)")
-    print("  • Results: outputs/results/model_performance.txt")
+    if plots:
+        print(f"  • Visualizations: outputs/visualizations/ ({utils.PLOT_STATS['rendered']} rendered, "
+              f"{utils.PLOT_STATS['reused']} reused from cache)")
+    else:
+        print("  • Visualizations: outputs/visualizations/ (not updated, --no-plots)")
+    print("  • Models: outputs/models/ (3 forests + distilled_models.pkl)")
+    print("  • Results: outputs/results/model_performance.txt (bootstrap intervals: bootstrap_ci.json,")
+    print("    fast tier fidelity and latency: distillation_report.txt)")
     
     print("\n🔧 Next Steps:")
     print("  • Review visualizations in outputs/visualizations/")
@@ -95,8 +141,29 @@ def main():
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the complete analysis pipeline')
+    parser.add_argument('--no-plots', action='store_true',
+                        help='skip all figures and never import matplotlib/seaborn')
+    parser.add_argument('--n-jobs', type=int, default=None,
+                        help='core budget for EDA and model training (default: all cores)')
+    parser.add_argument('--cluster-engine', choices=['sklearn', 'mapreduce', 'minibatch'], default='sklearn',
+                        help='K-Means engine: in-memory sklearn or out-of-core map-reduce / mini-batch')
+    parser.add_argument('--select-k', choices=['silhouette', 'elbow'], default=None,
+                        help='sweep k=2..10 in parallel and pick the cluster count by this rule')
+    parser.add_argument('--source', choices=['csv', 'sqlite'], default='csv',
+                        help='read survey responses from data/*.csv or the SQLite response store')
+    parser.add_argument('--tune', action='store_true',
+                        help='run the hyperparameter search before training (resumes if interrupted)')
+    parser.add_argument('--profile', action='store_true',
+                        help='time every stage and sub-step (wall, CPU, tracemalloc peak) into outputs/results/')
+    parser.add_argument('--cprofile', action='store_true',
+                        help='with --profile, also dump cProfile stats per stage and report the hottest functions')
+    args = parser.parse_args()
+    
     try:
-        main()
+        main(plots=not args.no_plots, n_jobs=args.n_jobs, tune=args.tune,
+             cluster_engine=args.cluster_engine, select_k=args.select_k, source=args.source,
+             profile=args.profile or args.cprofile, use_cprofile=args.cprofile)
     except KeyboardInterrupt:
         print("\n\n⚠ Analysis interrupted by user")
         sys.exit(0)
@@ -5,46 +5,59 @@ Author: Sakhi Patel
 
 import pandas as pd
 import numpy as np
+import argparse
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.utils import convert_age, convert_cgpa, encode_categorical_variables, handle_missing_values
+from src.response_store import read_responses, STORE_PATH
+from src import profiling
 
 
-def run():
-    """Execute data preprocessing pipeline"""
+def run(source='csv'):
+    """Execute data preprocessing pipeline (source: 'csv' survey file or 'sqlite' response store)"""
     
     print("\n" + "="*60)
     print("STEP 1: DATA PREPROCESSING")
     print("="*60)
     
     # Load data
-    print("\n[1.1] Loading dataset...")
-    df = pd.read_csv('data/student_mental_health_survey.csv')
+    profiling.step('1.1 Loading dataset')
+    if source == 'sqlite':
+        print(f"\n[1.1] Loading dataset from the response store ({STORE_PATH})...")
+        df = read_responses()
+    else:
+        print("\n[1.1] Loading dataset...")
+        df = pd.read_csv('data/student_mental_health_survey.csv')
     print(f"  ✓ Loaded {len(df)} records with {len(df.columns)} columns")
     
     # Display basic info
+    profiling.step('1.2 Dataset Information')
     print("\n[1.2] Dataset Information:")
     print(f"  Shape: {df.shape}")
     print(f"  Missing values: {df.isna().sum().sum()}")
     print(f"\n  Data types:\n{df.dtypes.value_counts()}")
     
     # Convert Age
+    profiling.step('1.3 Converting Age column')
     print("\n[1.3] Converting Age column...")
     df['Age'] = df['Age'].apply(convert_age)
     print(f"  ✓ Age range: {df['Age'].min():.1f} - {df['Age'].max():.1f}")
     
     # Convert CGPA
+    profiling.step('1.4 Converting CGPA column')
     print("\n[1.4] Converting CGPA column...")
     df['Current CGPA'] = df['Current CGPA'].apply(convert_cgpa)
     print(f"  ✓ CGPA range: {df['Current CGPA'].min():.2f} - {df['Current CGPA'].max():.2f}")
     
     # Encode categorical variables
+    profiling.step('1.5 Encoding categorical variables')
     print("\n[1.5] Encoding categorical variables...")
     df = encode_categorical_variables(df)
     print("  ✓ Encoded: Gender, Scholarship, Academic Year")
     
     # Handle missing values
+    profiling.step('1.6 Handling missing values')
     print("\n[1.6] Handling missing values...")
     missing_before = df.isna().sum().sum()
     df = handle_missing_values(df)
@@ -52,12 +65,14 @@ def run():
     print(f"  ✓ Missing values: {missing_before} → {missing_after}")
     
     # Save cleaned data
+    profiling.step('1.7 Saving cleaned data')
     print("\n[1.7] Saving cleaned data...")
     os.makedirs('outputs', exist_ok=True)
     df.to_csv('outputs/cleaned_data.csv', index=False)
     print("  ✓ Saved to: outputs/cleaned_data.csv")
     
     # Summary statistics
+    profiling.step('1.8 Summary Statistics')
     print("\n[1.8] Summary Statistics:")
     print("\n" + "="*60)
     print("NUMERIC FEATURES")
@@ -75,6 +90,7 @@ def run():
     print(f"Stress Labels: {df['Stress Label'].value_counts().to_dict()}")
     print(f"Depression Labels: {df['Depression Label'].value_counts().to_dict()}")
     
+    profiling.step('1.9 First 10 rows of cleaned data')
     print("\n[1.9] First 10 rows of cleaned data:")
     print(df[['Age', 'Gender', 'Current CGPA', 'Scholarship', 'Academic Year', 
               'Anxiety Value', 'Stress Value', 'Depression Value']].head(10))
@@ -87,4 +103,9 @@ def run():
 
 
 if __name__ == '__main__':
-    run()
+    parser = argparse.ArgumentParser(description='Clean and encode the survey data')
+    parser.add_argument('--source', choices=['csv', 'sqlite'], default='csv',
+                        help=f'survey CSV in data/, or the SQLite response store ({STORE_PATH})')
+    args = parser.parse_args()
+    
+    run(source=args.source)
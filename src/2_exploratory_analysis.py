@@ -5,170 +5,195 @@ Author: Sakhi Patel
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.utils import save_plot
+from src.utils import save_plot, plot_cache_key, load_plotting
+from src import eda_aggregates
+from src import profiling
 
-# Set style
-sns.set_style('whitegrid')
-sns.set_palette('Set2')
+GENDER_LABELS = {0: 'Male', 1: 'Female'}
+YEAR_LABELS = {1: '1st Year', 2: '2nd Year', 3: '3rd Year', 4: '4th Year'}
+SCHOLARSHIP_LABELS = {0: 'No Scholarship', 1: 'Scholarship'}
 
 
-def run():
-    """Execute exploratory data analysis"""
+def histogram(ax, h, **style):
+    """Draw a stored histogram (bin edges and counts) as plt.hist would"""
+    ax.hist(h['edges'][:-1], bins=h['edges'], weights=h['counts'], **style)
+
+
+def violin(ax, position, v, width, color):
+    """Draw a stored density as a violin with a box of its quartiles and whiskers inside, as seaborn does"""
+    ax.fill_betweenx(v['grid'], position - width, position + width, facecolor=color, edgecolor='gray', linewidth=1.5)
+    ax.plot([position, position], [v['whislo'], v['whishi']], color='gray', linewidth=1.5)
+    ax.plot([position, position], [v['q1'], v['q3']], color='gray', linewidth=6, solid_capstyle='butt')
+    ax.scatter([position], [v['median']], color='white', s=25, zorder=3)
+
+
+def run(plots=True, chunked=None, n_jobs=None):
+    """Execute exploratory data analysis (plots=False skips all figures)
+    
+    chunked/n_jobs: stream the cleaned data in chunks over worker processes (see
+    eda_aggregates.run; by default only files too large to read whole are chunked).
+    """
     
     print("\n" + "="*60)
     print("STEP 2: EXPLORATORY DATA ANALYSIS")
     print("="*60)
     
-    # Load cleaned data
-    print("\n[2.1] Loading cleaned data...")
-    df = pd.read_csv('outputs/cleaned_data.csv')
-    print(f"  ✓ Loaded {len(df)} records")
+    # Every number the figures show is computed in one pass and saved for the API (/eda)
+    profiling.step('2.1 Loading cleaned data and building aggregates')
+    print("\n[2.1] Loading cleaned data and building aggregates...")
+    agg, arrays = eda_aggregates.run(chunked=chunked, n_jobs=n_jobs)
+    print(f"  ✓ Loaded {agg['rows']} records")
+    print(f"  ✓ Aggregates saved to: {eda_aggregates.AGGREGATES_JSON}")
+    counts, histograms, groups = agg['counts'], agg['histograms'], agg['groups']
     
     os.makedirs('outputs/visualizations', exist_ok=True)
+    if plots:
+        plt, sns = load_plotting(palette='Set2')
     
     # 1. CGPA Distribution
+    profiling.step('2.2 Creating frequency distributions')
     print("\n[2.2] Creating frequency distributions...")
-    plt.figure(figsize=(12, 6))
-    plt.hist(df['Current CGPA'], bins=30, edgecolor='black', alpha=0.7)
-    plt.title('Distribution of Student CGPA', fontsize=16, fontweight='bold')
-    plt.xlabel('CGPA', fontsize=12)
-    plt.ylabel('Frequency', fontsize=12)
-    plt.axvline(df['Current CGPA'].mean(), color='red', linestyle='--', label=f'Mean: {df["Current CGPA"].mean():.2f}')
-    plt.legend()
-    plt.tight_layout()
-    save_plot('01_cgpa_distribution.png')
+    cache_key = plot_cache_key('01_cgpa_distribution.png', histograms['Current CGPA'], __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(12, 6))
+        h = histograms['Current CGPA']
+        histogram(plt.gca(), h, edgecolor='black', alpha=0.7)
+        plt.title('Distribution of Student CGPA', fontsize=16, fontweight='bold')
+        plt.xlabel('CGPA', fontsize=12)
+        plt.ylabel('Frequency', fontsize=12)
+        plt.axvline(h['mean'], color='red', linestyle='--', label=f'Mean: {h["mean"]:.2f}')
+        plt.legend()
+        plt.tight_layout()
+        save_plot('01_cgpa_distribution.png', cache_key=cache_key)
     
     # 2. Age Distribution
-    plt.figure(figsize=(12, 6))
-    plt.hist(df['Age'], bins=15, edgecolor='black', alpha=0.7, color='skyblue')
-    plt.title('Distribution of Student Age', fontsize=16, fontweight='bold')
-    plt.xlabel('Age', fontsize=12)
-    plt.ylabel('Frequency', fontsize=12)
-    plt.tight_layout()
-    save_plot('02_age_distribution.png')
+    cache_key = plot_cache_key('02_age_distribution.png', histograms['Age'], __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(12, 6))
+        histogram(plt.gca(), histograms['Age'], edgecolor='black', alpha=0.7, color='skyblue')
+        plt.title('Distribution of Student Age', fontsize=16, fontweight='bold')
+        plt.xlabel('Age', fontsize=12)
+        plt.ylabel('Frequency', fontsize=12)
+        plt.tight_layout()
+        save_plot('02_age_distribution.png', cache_key=cache_key)
     
     # 3. Gender Distribution
-    plt.figure(figsize=(10, 6))
-    gender_counts = df['Gender'].value_counts()
-    gender_labels = ['Male', 'Female']
-    plt.bar(gender_labels, gender_counts.values, edgecolor='black', alpha=0.8)
-    plt.title('Gender Distribution', fontsize=16, fontweight='bold')
-    plt.xlabel('Gender', fontsize=12)
-    plt.ylabel('Count', fontsize=12)
-    for i, v in enumerate(gender_counts.values):
-        plt.text(i, v + 5, str(v), ha='center', fontweight='bold')
-    plt.tight_layout()
-    save_plot('03_gender_distribution.png')
+    cache_key = plot_cache_key('03_gender_distribution.png', counts['Gender'], __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(10, 6))
+        gender_counts = counts['Gender']
+        gender_labels = [GENDER_LABELS.get(v, str(v)) for v in gender_counts['values']]
+        plt.bar(gender_labels, gender_counts['counts'], edgecolor='black', alpha=0.8)
+        plt.title('Gender Distribution', fontsize=16, fontweight='bold')
+        plt.xlabel('Gender', fontsize=12)
+        plt.ylabel('Count', fontsize=12)
+        for i, v in enumerate(gender_counts['counts']):
+            plt.text(i, v + 5, str(v), ha='center', fontweight='bold')
+        plt.tight_layout()
+        save_plot('03_gender_distribution.png', cache_key=cache_key)
     
     # 4. University Distribution
-    plt.figure(figsize=(12, 6))
-    univ_counts = df['University'].value_counts()
-    plt.barh(univ_counts.index, univ_counts.values, edgecolor='black', alpha=0.8)
-    plt.title('University Distribution', fontsize=16, fontweight='bold')
-    plt.xlabel('Count', fontsize=12)
-    plt.ylabel('University', fontsize=12)
-    plt.tight_layout()
-    save_plot('04_university_distribution.png')
+    cache_key = plot_cache_key('04_university_distribution.png', counts['University'], __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(12, 6))
+        univ_counts = counts['University']
+        plt.barh(univ_counts['values'], univ_counts['counts'], edgecolor='black', alpha=0.8)
+        plt.title('University Distribution', fontsize=16, fontweight='bold')
+        plt.xlabel('Count', fontsize=12)
+        plt.ylabel('University', fontsize=12)
+        plt.tight_layout()
+        save_plot('04_university_distribution.png', cache_key=cache_key)
     
     # 5. Department Distribution
-    plt.figure(figsize=(12, 6))
-    dept_counts = df['Department'].value_counts()
-    plt.barh(dept_counts.index, dept_counts.values, edgecolor='black', alpha=0.8, color='coral')
-    plt.title('Department Distribution', fontsize=16, fontweight='bold')
-    plt.xlabel('Count', fontsize=12)
-    plt.ylabel('Department', fontsize=12)
-    plt.tight_layout()
-    save_plot('05_department_distribution.png')
+    cache_key = plot_cache_key('05_department_distribution.png', counts['Department'], __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(12, 6))
+        dept_counts = counts['Department']
+        plt.barh(dept_counts['values'], dept_counts['counts'], edgecolor='black', alpha=0.8, color='coral')
+        plt.title('Department Distribution', fontsize=16, fontweight='bold')
+        plt.xlabel('Count', fontsize=12)
+        plt.ylabel('Department', fontsize=12)
+        plt.tight_layout()
+        save_plot('05_department_distribution.png', cache_key=cache_key)
     
     # 6. Academic Year Distribution
-    plt.figure(figsize=(10, 6))
-    year_counts = df['Academic Year'].value_counts().sort_index()
-    year_labels = ['1st Year', '2nd Year', '3rd Year', '4th Year']
-    plt.bar(year_labels, year_counts.values, edgecolor='black', alpha=0.8, color='lightgreen')
-    plt.title('Academic Year Distribution', fontsize=16, fontweight='bold')
-    plt.xlabel('Academic Year', fontsize=12)
-    plt.ylabel('Count', fontsize=12)
-    plt.tight_layout()
-    save_plot('06_academic_year_distribution.png')
+    cache_key = plot_cache_key('06_academic_year_distribution.png', counts['Academic Year'], __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(10, 6))
+        year_counts = counts['Academic Year']
+        year_labels = [YEAR_LABELS.get(v, str(v)) for v in year_counts['values']]
+        plt.bar(year_labels, year_counts['counts'], edgecolor='black', alpha=0.8, color='lightgreen')
+        plt.title('Academic Year Distribution', fontsize=16, fontweight='bold')
+        plt.xlabel('Academic Year', fontsize=12)
+        plt.ylabel('Count', fontsize=12)
+        plt.tight_layout()
+        save_plot('06_academic_year_distribution.png', cache_key=cache_key)
     
     # 7. Scholarship Status
-    plt.figure(figsize=(8, 8))
-    scholarship_counts = df['Scholarship'].value_counts()
-    labels = ['No Scholarship', 'Scholarship']
-    colors = ['#ff9999', '#66b3ff']
-    plt.pie(scholarship_counts.values, labels=labels, autopct='%1.1f%%', colors=colors, startangle=90)
-    plt.title('Scholarship Status Distribution', fontsize=16, fontweight='bold')
-    plt.tight_layout()
-    save_plot('07_scholarship_distribution.png')
+    cache_key = plot_cache_key('07_scholarship_distribution.png', counts['Scholarship'], __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(8, 8))
+        scholarship_counts = counts['Scholarship']
+        labels = [SCHOLARSHIP_LABELS.get(v, str(v)) for v in scholarship_counts['values']]
+        colors = ['#ff9999', '#66b3ff']
+        plt.pie(scholarship_counts['counts'], labels=labels, autopct='%1.1f%%', colors=colors, startangle=90)
+        plt.title('Scholarship Status Distribution', fontsize=16, fontweight='bold')
+        plt.tight_layout()
+        save_plot('07_scholarship_distribution.png', cache_key=cache_key)
     
     # 8-10. Mental Health Label Distributions
+    profiling.step('2.3 Creating mental health distributions')
     print("\n[2.3] Creating mental health distributions...")
     
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-    
-    # Anxiety
-    anxiety_counts = df['Anxiety Label'].value_counts()
-    axes[0].bar(anxiety_counts.index, anxiety_counts.values, edgecolor='black', alpha=0.8, color=['green', 'orange', 'red'])
-    axes[0].set_title('Anxiety Label Distribution', fontsize=14, fontweight='bold')
-    axes[0].set_ylabel('Count', fontsize=12)
-    
-    # Stress
-    stress_counts = df['Stress Label'].value_counts()
-    axes[1].bar(stress_counts.index, stress_counts.values, edgecolor='black', alpha=0.8, color=['green', 'orange', 'red'])
-    axes[1].set_title('Stress Label Distribution', fontsize=14, fontweight='bold')
-    axes[1].set_ylabel('Count', fontsize=12)
-    
-    # Depression
-    depression_counts = df['Depression Label'].value_counts()
-    axes[2].bar(depression_counts.index, depression_counts.values, edgecolor='black', alpha=0.8, color=['green', 'orange', 'red'])
-    axes[2].set_title('Depression Label Distribution', fontsize=14, fontweight='bold')
-    axes[2].set_ylabel('Count', fontsize=12)
-    
-    plt.tight_layout()
-    save_plot('08_mental_health_labels.png')
+    label_counts = {col: counts[col] for col in ['Anxiety Label', 'Stress Label', 'Depression Label']}
+    cache_key = plot_cache_key('08_mental_health_labels.png', label_counts, __file__, enabled=plots)
+    if cache_key:
+        fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+        
+        # Levels in Low/Medium/High order, so the colors follow the severity
+        for ax, (col, c) in zip(axes, label_counts.items()):
+            present = [(v, n) for v, n in zip(c['values'], c['counts']) if n]
+            ax.bar([v for v, _ in present], [n for _, n in present], edgecolor='black', alpha=0.8,
+                   color=['green', 'orange', 'red'][:len(present)])
+            ax.set_title(f"{col.split()[0]} Label Distribution", fontsize=14, fontweight='bold')
+            ax.set_ylabel('Count', fontsize=12)
+        
+        plt.tight_layout()
+        save_plot('08_mental_health_labels.png', cache_key=cache_key)
     
     # 11. Mental Health Scores Distribution
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-    
-    axes[0].hist(df['Anxiety Value'], bins=30, edgecolor='black', alpha=0.7, color='salmon')
-    axes[0].set_title('Anxiety Score Distribution', fontsize=14, fontweight='bold')
-    axes[0].set_xlabel('Anxiety Value', fontsize=12)
-    axes[0].set_ylabel('Frequency', fontsize=12)
-    axes[0].axvline(df['Anxiety Value'].mean(), color='red', linestyle='--', label=f'Mean: {df["Anxiety Value"].mean():.1f}')
-    axes[0].legend()
-    
-    axes[1].hist(df['Stress Value'], bins=30, edgecolor='black', alpha=0.7, color='lightcoral')
-    axes[1].set_title('Stress Score Distribution', fontsize=14, fontweight='bold')
-    axes[1].set_xlabel('Stress Value', fontsize=12)
-    axes[1].set_ylabel('Frequency', fontsize=12)
-    axes[1].axvline(df['Stress Value'].mean(), color='red', linestyle='--', label=f'Mean: {df["Stress Value"].mean():.1f}')
-    axes[1].legend()
-    
-    axes[2].hist(df['Depression Value'], bins=30, edgecolor='black', alpha=0.7, color='plum')
-    axes[2].set_title('Depression Score Distribution', fontsize=14, fontweight='bold')
-    axes[2].set_xlabel('Depression Value', fontsize=12)
-    axes[2].set_ylabel('Frequency', fontsize=12)
-    axes[2].axvline(df['Depression Value'].mean(), color='red', linestyle='--', label=f'Mean: {df["Depression Value"].mean():.1f}')
-    axes[2].legend()
-    
-    plt.tight_layout()
-    save_plot('09_mental_health_scores.png')
+    score_histograms = {col: histograms[col] for col in agg['scores']}
+    cache_key = plot_cache_key('09_mental_health_scores.png', score_histograms, __file__, enabled=plots)
+    if cache_key:
+        fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+        
+        for ax, (col, h), color in zip(axes, score_histograms.items(), ['salmon', 'lightcoral', 'plum']):
+            histogram(ax, h, edgecolor='black', alpha=0.7, color=color)
+            ax.set_title(f"{col.split()[0]} Score Distribution", fontsize=14, fontweight='bold')
+            ax.set_xlabel(col, fontsize=12)
+            ax.set_ylabel('Frequency', fontsize=12)
+            ax.axvline(h['mean'], color='red', linestyle='--', label=f'Mean: {h["mean"]:.1f}')
+            ax.legend()
+        
+        plt.tight_layout()
+        save_plot('09_mental_health_scores.png', cache_key=cache_key)
     
     # 12. Correlation Heatmap
+    profiling.step('2.4 Creating correlation analysis')
     print("\n[2.4] Creating correlation analysis...")
-    plt.figure(figsize=(10, 8))
-    corr_features = ['Current CGPA', 'Anxiety Value', 'Stress Value', 'Depression Value']
-    corr_matrix = df[corr_features].corr()
-    sns.heatmap(corr_matrix, annot=True, fmt='.3f', cmap='coolwarm', center=0, 
-                square=True, linewidths=1, cbar_kws={"shrink": 0.8})
-    plt.title('Correlation Matrix: CGPA vs Mental Health', fontsize=16, fontweight='bold')
-    plt.tight_layout()
-    save_plot('10_correlation_heatmap.png')
+    corr_features = agg['correlation']['columns']
+    corr_matrix = pd.DataFrame(agg['correlation']['matrix'], index=corr_features, columns=corr_features)
+    cache_key = plot_cache_key('10_correlation_heatmap.png', corr_matrix, __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(10, 8))
+        sns.heatmap(corr_matrix, annot=True, fmt='.3f', cmap='coolwarm', center=0, 
+                    square=True, linewidths=1, cbar_kws={"shrink": 0.8})
+        plt.title('Correlation Matrix: CGPA vs Mental Health', fontsize=16, fontweight='bold')
+        plt.tight_layout()
+        save_plot('10_correlation_heatmap.png', cache_key=cache_key)
     
     print("\n  Correlation Insights:")
     print(f"    CGPA vs Anxiety:    {corr_matrix.loc['Current CGPA', 'Anxiety Value']:.3f}")
@@ -176,140 +201,146 @@ def run():
     print(f"    CGPA vs Depression: {corr_matrix.loc['Current CGPA', 'Depression Value']:.3f}")
     
     # 13-15. Scatter plots
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-    
-    axes[0].scatter(df['Current CGPA'], df['Anxiety Value'], alpha=0.5, c='red', edgecolors='black')
-    axes[0].set_title('CGPA vs Anxiety', fontsize=14, fontweight='bold')
-    axes[0].set_xlabel('CGPA', fontsize=12)
-    axes[0].set_ylabel('Anxiety Value', fontsize=12)
-    axes[0].grid(True, alpha=0.3)
-    
-    axes[1].scatter(df['Current CGPA'], df['Stress Value'], alpha=0.5, c='orange', edgecolors='black')
-    axes[1].set_title('CGPA vs Stress', fontsize=14, fontweight='bold')
-    axes[1].set_xlabel('CGPA', fontsize=12)
-    axes[1].set_ylabel('Stress Value', fontsize=12)
-    axes[1].grid(True, alpha=0.3)
-    
-    axes[2].scatter(df['Current CGPA'], df['Depression Value'], alpha=0.5, c='purple', edgecolors='black')
-    axes[2].set_title('CGPA vs Depression', fontsize=14, fontweight='bold')
-    axes[2].set_xlabel('CGPA', fontsize=12)
-    axes[2].set_ylabel('Depression Value', fontsize=12)
-    axes[2].grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    save_plot('11_cgpa_vs_mental_health.png')
+    # Scatter points come from the stored sample (every row up to eda_aggregates.SCATTER_POINTS)
+    cache_key = plot_cache_key('11_cgpa_vs_mental_health.png', arrays['scatter'], __file__, enabled=plots)
+    if cache_key:
+        fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+        
+        for k, (ax, color) in enumerate(zip(axes, ['red', 'orange', 'purple']), start=1):
+            name = corr_features[k].split()[0]
+            ax.scatter(arrays['scatter'][:, 0], arrays['scatter'][:, k], alpha=0.5, c=color, edgecolors='black')
+            ax.set_title(f'CGPA vs {name}', fontsize=14, fontweight='bold')
+            ax.set_xlabel('CGPA', fontsize=12)
+            ax.set_ylabel(corr_features[k], fontsize=12)
+            ax.grid(True, alpha=0.3)
+        
+        plt.tight_layout()
+        save_plot('11_cgpa_vs_mental_health.png', cache_key=cache_key)
     
     # 16. Mental Health by Gender
+    profiling.step('2.5 Creating demographic comparisons')
     print("\n[2.5] Creating demographic comparisons...")
-    gender_mental = df.groupby('Gender')[['Anxiety Value', 'Stress Value', 'Depression Value']].mean()
-    
-    fig, ax = plt.subplots(figsize=(12, 6))
-    x = np.arange(3)
-    width = 0.35
-    
-    ax.bar(x - width/2, gender_mental.iloc[0], width, label='Male', alpha=0.8, edgecolor='black')
-    ax.bar(x + width/2, gender_mental.iloc[1], width, label='Female', alpha=0.8, edgecolor='black')
-    
-    ax.set_title('Mean Mental Health Scores by Gender', fontsize=16, fontweight='bold')
-    ax.set_ylabel('Mean Score', fontsize=12)
-    ax.set_xticks(x)
-    ax.set_xticklabels(['Anxiety', 'Stress', 'Depression'])
-    ax.legend()
-    ax.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    save_plot('12_mental_health_by_gender.png')
+    gender_mental = groups['Gender']
+    
+    cache_key = plot_cache_key('12_mental_health_by_gender.png', gender_mental, __file__, enabled=plots)
+    if cache_key:
+        fig, ax = plt.subplots(figsize=(12, 6))
+        x = np.arange(3)
+        width = 0.35
+        
+        ax.bar(x - width/2, gender_mental['mean'][0], width, label=GENDER_LABELS[gender_mental['values'][0]], alpha=0.8, edgecolor='black')
+        ax.bar(x + width/2, gender_mental['mean'][1], width, label=GENDER_LABELS[gender_mental['values'][1]], alpha=0.8, edgecolor='black')
+        
+        ax.set_title('Mean Mental Health Scores by Gender', fontsize=16, fontweight='bold')
+        ax.set_ylabel('Mean Score', fontsize=12)
+        ax.set_xticks(x)
+        ax.set_xticklabels(['Anxiety', 'Stress', 'Depression'])
+        ax.legend()
+        ax.grid(True, alpha=0.3, axis='y')
+        plt.tight_layout()
+        save_plot('12_mental_health_by_gender.png', cache_key=cache_key)
     
     # 17. Mental Health by Academic Year
-    year_mental = df.groupby('Academic Year')[['Anxiety Value', 'Stress Value', 'Depression Value']].mean()
-    
-    fig, ax = plt.subplots(figsize=(12, 6))
-    x = np.arange(len(year_mental))
-    width = 0.25
-    
-    ax.bar(x - width, year_mental['Anxiety Value'], width, label='Anxiety', alpha=0.8, edgecolor='black')
-    ax.bar(x, year_mental['Stress Value'], width, label='Stress', alpha=0.8, edgecolor='black')
-    ax.bar(x + width, year_mental['Depression Value'], width, label='Depression', alpha=0.8, edgecolor='black')
-    
-    ax.set_title('Mean Mental Health Scores by Academic Year', fontsize=16, fontweight='bold')
-    ax.set_ylabel('Mean Score', fontsize=12)
-    ax.set_xlabel('Academic Year', fontsize=12)
-    ax.set_xticks(x)
-    ax.set_xticklabels(['1st Year', '2nd Year', '3rd Year', '4th Year'])
-    ax.legend()
-    ax.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    save_plot('13_mental_health_by_year.png')
+    year_mental = groups['Academic Year']
+    
+    cache_key = plot_cache_key('13_mental_health_by_year.png', year_mental, __file__, enabled=plots)
+    if cache_key:
+        fig, ax = plt.subplots(figsize=(12, 6))
+        x = np.arange(len(year_mental['values']))
+        width = 0.25
+        means = np.array(year_mental['mean'])
+        
+        ax.bar(x - width, means[:, 0], width, label='Anxiety', alpha=0.8, edgecolor='black')
+        ax.bar(x, means[:, 1], width, label='Stress', alpha=0.8, edgecolor='black')
+        ax.bar(x + width, means[:, 2], width, label='Depression', alpha=0.8, edgecolor='black')
+        
+        ax.set_title('Mean Mental Health Scores by Academic Year', fontsize=16, fontweight='bold')
+        ax.set_ylabel('Mean Score', fontsize=12)
+        ax.set_xlabel('Academic Year', fontsize=12)
+        ax.set_xticks(x)
+        ax.set_xticklabels([YEAR_LABELS.get(v, str(v)) for v in year_mental['values']])
+        ax.legend()
+        ax.grid(True, alpha=0.3, axis='y')
+        plt.tight_layout()
+        save_plot('13_mental_health_by_year.png', cache_key=cache_key)
     
     # 18. Mental Health by Scholarship
-    scholarship_mental = df.groupby('Scholarship')[['Anxiety Value', 'Stress Value', 'Depression Value']].mean()
-    
-    fig, ax = plt.subplots(figsize=(12, 6))
-    x = np.arange(3)
-    width = 0.35
-    
-    ax.bar(x - width/2, scholarship_mental.iloc[0], width, label='No Scholarship', alpha=0.8, edgecolor='black')
-    ax.bar(x + width/2, scholarship_mental.iloc[1], width, label='Scholarship', alpha=0.8, edgecolor='black')
-    
-    ax.set_title('Mean Mental Health Scores by Scholarship Status', fontsize=16, fontweight='bold')
-    ax.set_ylabel('Mean Score', fontsize=12)
-    ax.set_xticks(x)
-    ax.set_xticklabels(['Anxiety', 'Stress', 'Depression'])
-    ax.legend()
-    ax.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    save_plot('14_mental_health_by_scholarship.png')
+    scholarship_mental = groups['Scholarship']
+    
+    cache_key = plot_cache_key('14_mental_health_by_scholarship.png', scholarship_mental, __file__, enabled=plots)
+    if cache_key:
+        fig, ax = plt.subplots(figsize=(12, 6))
+        x = np.arange(3)
+        width = 0.35
+        
+        ax.bar(x - width/2, scholarship_mental['mean'][0], width, label=SCHOLARSHIP_LABELS[scholarship_mental['values'][0]], alpha=0.8, edgecolor='black')
+        ax.bar(x + width/2, scholarship_mental['mean'][1], width, label=SCHOLARSHIP_LABELS[scholarship_mental['values'][1]], alpha=0.8, edgecolor='black')
+        
+        ax.set_title('Mean Mental Health Scores by Scholarship Status', fontsize=16, fontweight='bold')
+        ax.set_ylabel('Mean Score', fontsize=12)
+        ax.set_xticks(x)
+        ax.set_xticklabels(['Anxiety', 'Stress', 'Depression'])
+        ax.legend()
+        ax.grid(True, alpha=0.3, axis='y')
+        plt.tight_layout()
+        save_plot('14_mental_health_by_scholarship.png', cache_key=cache_key)
     
     # 19. Box plots by CGPA ranges
-    df['CGPA_Range'] = pd.cut(df['Current CGPA'], bins=[0, 2.5, 3.0, 3.5, 4.0], 
-                               labels=['<2.5', '2.5-3.0', '3.0-3.5', '3.5-4.0'])
-    
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-    
-    df.boxplot(column='Anxiety Value', by='CGPA_Range', ax=axes[0])
-    axes[0].set_title('Anxiety by CGPA Range', fontsize=14, fontweight='bold')
-    axes[0].set_xlabel('CGPA Range', fontsize=12)
-    axes[0].set_ylabel('Anxiety Value', fontsize=12)
-    
-    df.boxplot(column='Stress Value', by='CGPA_Range', ax=axes[1])
-    axes[1].set_title('Stress by CGPA Range', fontsize=14, fontweight='bold')
-    axes[1].set_xlabel('CGPA Range', fontsize=12)
-    axes[1].set_ylabel('Stress Value', fontsize=12)
-    
-    df.boxplot(column='Depression Value', by='CGPA_Range', ax=axes[2])
-    axes[2].set_title('Depression by CGPA Range', fontsize=14, fontweight='bold')
-    axes[2].set_xlabel('CGPA Range', fontsize=12)
-    axes[2].set_ylabel('Depression Value', fontsize=12)
-    
-    plt.suptitle('')
-    plt.tight_layout()
-    save_plot('15_boxplots_by_cgpa.png')
+    # Quartiles, whiskers and outliers per CGPA range (<2.5, 2.5-3.0, 3.0-3.5, 3.5-4.0) are stored
+    cache_key = plot_cache_key('15_boxplots_by_cgpa.png', agg['boxplots'], __file__, enabled=plots)
+    if cache_key:
+        fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+        
+        for ax, (col, boxes) in zip(axes, agg['boxplots'].items()):
+            drawn = [(k + 1, b) for k, b in enumerate(boxes) if b['count']]
+            ax.bxp([{'med': b['median'], 'q1': b['q1'], 'q3': b['q3'], 'whislo': b['whislo'], 'whishi': b['whishi'],
+                     'fliers': b['fliers'], 'label': b['label']} for _, b in drawn],
+                   positions=[position for position, _ in drawn])
+            ax.grid(True)
+            ax.set_title(f"{col.split()[0]} by CGPA Range", fontsize=14, fontweight='bold')
+            ax.set_xlabel('CGPA Range', fontsize=12)
+            ax.set_ylabel(col, fontsize=12)
+        
+        plt.tight_layout()
+        save_plot('15_boxplots_by_cgpa.png', cache_key=cache_key)
     
     # 20. Violin plots
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-    
-    gender_labels = {0: 'Male', 1: 'Female'}
-    df['Gender_Label'] = df['Gender'].map(gender_labels)
-    
-    sns.violinplot(data=df, x='Gender_Label', y='Anxiety Value', ax=axes[0], palette='Set2')
-    axes[0].set_title('Anxiety Distribution by Gender', fontsize=14, fontweight='bold')
-    axes[0].set_xlabel('Gender', fontsize=12)
-    
-    sns.violinplot(data=df, x='Gender_Label', y='Stress Value', ax=axes[1], palette='Set2')
-    axes[1].set_title('Stress Distribution by Gender', fontsize=14, fontweight='bold')
-    axes[1].set_xlabel('Gender', fontsize=12)
-    
-    sns.violinplot(data=df, x='Gender_Label', y='Depression Value', ax=axes[2], palette='Set2')
-    axes[2].set_title('Depression Distribution by Gender', fontsize=14, fontweight='bold')
-    axes[2].set_xlabel('Gender', fontsize=12)
-    
-    plt.tight_layout()
-    save_plot('16_violin_plots_by_gender.png')
+    # Kernel densities per gender are stored on a grid; widths are scaled to equal area, as in seaborn
+    cache_key = plot_cache_key('16_violin_plots_by_gender.png', agg['violins'], __file__, enabled=plots)
+    if cache_key:
+        fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+        colors = sns.color_palette('Set2')
+        
+        for ax, (col, shapes) in zip(axes, agg['violins'].items()):
+            peak = max(max(v['density']) for v in shapes if v['count'])
+            for k, v in enumerate(shapes):
+                if v['count']:
+                    violin(ax, k, v, 0.4 * np.array(v['density']) / peak, colors[k])
+            ax.set_xticks(range(len(shapes)))
+            ax.set_xticklabels([GENDER_LABELS.get(v['value'], str(v['value'])) for v in shapes])
+            ax.set_title(f"{col.split()[0]} Distribution by Gender", fontsize=14, fontweight='bold')
+            ax.set_xlabel('Gender', fontsize=12)
+            ax.set_ylabel(col, fontsize=12)
+        
+        plt.tight_layout()
+        save_plot('16_violin_plots_by_gender.png', cache_key=cache_key)
     
     print("\n" + "="*60)
     print("✓ EXPLORATORY ANALYSIS COMPLETE")
-    print(f"✓ Created 16 visualizations in outputs/visualizations/")
+    if plots:
+        print(f"✓ Created 16 visualizations in outputs/visualizations/")
+    else:
+        print("✓ Plots skipped (--no-plots)")
     print("="*60)
 
 
 if __name__ == '__main__':
-    run()
+    import argparse
+    parser = argparse.ArgumentParser(description='Run exploratory data analysis')
+    parser.add_argument('--no-plots', action='store_true', help='skip all figures')
+    parser.add_argument('--chunked', action='store_true',
+                        help='aggregate the cleaned data chunk by chunk over a process pool')
+    parser.add_argument('--n-jobs', type=int, default=None, help='worker processes for chunked mode')
+    args = parser.parse_args()
+    
+    run(plots=not args.no_plots, chunked=args.chunked or None, n_jobs=args.n_jobs)
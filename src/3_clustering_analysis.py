@@ -5,156 +5,279 @@ Author: Sakhi Patel
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
+from sklearn.metrics import pairwise_distances_argmin
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.utils import save_plot
+from src.utils import save_plot, plot_cache_key, load_plotting
+from src.kmeans_engine import fit_streaming_kmeans, stream_to_scaled_matrix
+from src.cluster_quality import cluster_quality, format_silhouette, EXACT_SILHOUETTE_MAX_ROWS
+from src import k_selection
+from src import profiling
+from src.cluster_profile import build_cluster_profile, save_cluster_profile, profile_means, PROFILE_PATH
+from src.similarity_index import build_similarity_index, save_similarity_index, INDEX_PATH
 
-sns.set_style('whitegrid')
 
-
-def run():
-    """Execute clustering analysis"""
+def run(plots=True, exact_max_rows=EXACT_SILHOUETTE_MAX_ROWS, engine='sklearn', n_jobs=None,
+        n_clusters=4, select_k=None, k_values=k_selection.K_RANGE):
+    """Execute clustering analysis (plots=False skips all figures)
+    
+    engine: 'sklearn' (in-memory KMeans), 'mapreduce' (out-of-core Lloyd over a
+    process pool) or 'minibatch' (out-of-core mini-batch, for the largest inputs).
+    Only the fit is out-of-core; the stage still loads the cleaned data as a frame
+    to attach labels, save clustered_data.csv and build the profile and figures.
+    select_k: None (use n_clusters), or a rule from k_selection.SELECTION_RULES to
+    sweep k_values in parallel over a cached scaled matrix and pick k (in-memory only)
+    Returns the number of clusters used.
+    """
     
     print("\n" + "="*60)
     print("STEP 3: CLUSTERING ANALYSIS")
     print("="*60)
     
     # Load cleaned data
+    profiling.step('3.1 Loading cleaned data')
     print("\n[3.1] Loading cleaned data...")
     df = pd.read_csv('outputs/cleaned_data.csv')
     print(f"  ✓ Loaded {len(df)} records")
     
     # Select features for clustering
+    profiling.step('3.2 Selecting features for clustering')
     print("\n[3.2] Selecting features for clustering...")
     features = ['Age', 'Gender', 'Current CGPA', 'Scholarship', 'Academic Year']
     X = df[features].copy()
     print(f"  ✓ Selected features: {features}")
     
-    # Standardize features
-    print("\n[3.3] Standardizing features...")
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    print("  ✓ Features standardized using StandardScaler")
+    sweep = None
+    if select_k:
+        # Scale once into a cached matrix, then fit every candidate k in parallel on it
+        profiling.step('3.3 Standardizing features')
+        print("\n[3.3] Standardizing features (cached matrix)...")
+        matrix_path = k_selection.cached_scaled_matrix(df, features)
+        X_scaled = np.load(matrix_path, mmap_mode='r')
+        print(f"  ✓ Scaled matrix: {matrix_path}")
+        
+        profiling.step('3.4 K sweep')
+        print(f"\n[3.4] K sweep over k={list(k_values)} ({select_k} rule)...")
+        sweep = k_selection.sweep(matrix_path, k_values, n_jobs=n_jobs or -1, exact_max_rows=exact_max_rows)
+        n_clusters = k_selection.choose_k(sweep, select_k)
+        k_selection.write_report(sweep, n_clusters, select_k)
+        for r in sweep:
+            print(f"  k={r['k']:<3} inertia={r['inertia']:<12.2f} silhouette={r['silhouette']:.4f}")
+        print(f"  ✓ Chosen k={n_clusters} (report: outputs/results/k_selection.txt)")
+        
+        # Reuse the chosen fit's centers instead of refitting
+        centers = next(r['centers'] for r in sweep if r['k'] == n_clusters)
+        df['Cluster'] = pairwise_distances_argmin(X_scaled, centers)
+    elif engine == 'sklearn':
+        # Standardize features
+        profiling.step('3.3 Standardizing features')
+        print("\n[3.3] Standardizing features...")
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+        print("  ✓ Features standardized using StandardScaler")
+        
+        # Perform K-Means clustering
+        profiling.step('3.4 Performing K-Means clustering')
+        print(f"\n[3.4] Performing K-Means clustering (k={n_clusters})...")
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        df['Cluster'] = kmeans.fit_predict(X_scaled)
+        centers = kmeans.cluster_centers_
+        print("  ✓ Clustering complete")
+    else:
+        # Stream the CSV: one-pass scaling to an on-disk matrix, then chunked k-means
+        profiling.step('3.3 Standardizing features')
+        print("\n[3.3] Standardizing features (streamed, one pass)...")
+        scaled = stream_to_scaled_matrix('outputs/cleaned_data.csv', features)
+        print(f"  ✓ Scaled matrix: {scaled[0]}")
+        
+        profiling.step('3.4 Performing out-of-core K-Means clustering')
+        print(f"\n[3.4] Performing out-of-core K-Means clustering (k={n_clusters}, {engine})...")
+        result = fit_streaming_kmeans('outputs/cleaned_data.csv', features, n_clusters=n_clusters,
+                                      n_init=10, n_jobs=n_jobs, mode=engine, scaled=scaled)
+        X_scaled = np.load(result['matrix_path'], mmap_mode='r')
+        df['Cluster'] = result['labels']
+        centers = result['centers']
+        print(f"  ✓ Clustering complete in {result['seconds']:.2f}s ({result['n_iter']} iterations)")
     
-    # Perform K-Means clustering
-    print("\n[3.4] Performing K-Means clustering (k=4)...")
-    kmeans = KMeans(n_clusters=4, random_state=42, n_init=10)
-    df['Cluster'] = kmeans.fit_predict(X_scaled)
-    print("  ✓ Clustering complete")
-    
-    # Calculate Silhouette Score
-    silhouette = silhouette_score(X_scaled, df['Cluster'])
+    # Cluster quality (silhouette is sampled above exact_max_rows)
+    profiling.step('3.5 Cluster Quality')
+    quality = cluster_quality(X_scaled, df['Cluster'], exact_max_rows=exact_max_rows,
+                              centers=centers)
     print(f"\n[3.5] Cluster Quality:")
-    print(f"  Silhouette Score: {silhouette:.4f}")
+    print(f"  Silhouette Score: {format_silhouette(quality['silhouette'])}")
+    print(f"  Davies-Bouldin Index: {quality['davies_bouldin']:.4f}")
+    print(f"  Calinski-Harabasz Index: {quality['calinski_harabasz']:.2f}")
+    print(f"  Inertia: {quality['inertia']:.2f}")
     
     # Save clustered data
+    profiling.step('3.6 Saving clustered data')
     print("\n[3.6] Saving clustered data...")
     df.to_csv('outputs/clustered_data.csv', index=False)
     print("  ✓ Saved to: outputs/clustered_data.csv")
     
-    # Cluster statistics
-    print("\n[3.7] Cluster Statistics:")
+    # Nearest-neighbour index over the same standardized features, served by the API's /similar
+    profiling.step('3.7 Building similarity index')
+    print("\n[3.7] Building similarity index...")
+    save_similarity_index(build_similarity_index(df))
+    print(f"  ✓ Similarity index saved to: {INDEX_PATH}")
+    
+    # Cluster statistics (one grouped pass, persisted for the heatmap and the API)
+    profiling.step('3.8 Cluster Statistics')
+    profile = build_cluster_profile(df, n_clusters=n_clusters)
+    save_cluster_profile(profile)
+    print("\n[3.8] Cluster Statistics:")
     print("="*60)
-    for cluster in range(4):
-        cluster_data = df[df['Cluster'] == cluster]
-        print(f"\nCluster {cluster} (n={len(cluster_data)}):")
-        print(f"  Mean Age: {cluster_data['Age'].mean():.2f}")
-        print(f"  Mean CGPA: {cluster_data['Current CGPA'].mean():.2f}")
-        print(f"  Gender (Male%): {(cluster_data['Gender']==0).sum()/len(cluster_data)*100:.1f}%")
-        print(f"  Scholarship%: {cluster_data['Scholarship'].mean()*100:.1f}%")
-        print(f"  Mean Anxiety: {cluster_data['Anxiety Value'].mean():.2f}")
-        print(f"  Mean Stress: {cluster_data['Stress Value'].mean():.2f}")
-        print(f"  Mean Depression: {cluster_data['Depression Value'].mean():.2f}")
+    for c in profile['clusters']:
+        means, shares = c['means'], c['shares']
+        print(f"\nCluster {c['cluster']} (n={c['size']}):")
+        if c['size'] == 0:
+            continue
+        print(f"  Mean Age: {means['Age']:.2f}")
+        print(f"  Mean CGPA: {means['Current CGPA']:.2f}")
+        print(f"  Gender (Male%): {shares['male']*100:.1f}%")
+        print(f"  Scholarship%: {shares['scholarship']*100:.1f}%")
+        print(f"  Mean Anxiety: {means['Anxiety Value']:.2f}")
+        print(f"  Mean Stress: {means['Stress Value']:.2f}")
+        print(f"  Mean Depression: {means['Depression Value']:.2f}")
+    print(f"\n  ✓ Profile saved to: {PROFILE_PATH}")
     
     # Visualizations
-    print("\n[3.8] Creating cluster visualizations...")
+    profiling.step('3.9 Creating cluster visualizations')
+    print("\n[3.9] Creating cluster visualizations...")
+    if plots:
+        plt, sns = load_plotting()
     
     # 1. Cluster scatter: CGPA vs Anxiety
-    plt.figure(figsize=(12, 6))
-    scatter = plt.scatter(df['Current CGPA'], df['Anxiety Value'], 
-                         c=df['Cluster'], cmap='viridis', 
-                         alpha=0.6, edgecolors='black', s=50)
-    plt.colorbar(scatter, label='Cluster')
-    plt.title('K-Means Clusters: CGPA vs Anxiety Value', fontsize=16, fontweight='bold')
-    plt.xlabel('Current CGPA', fontsize=12)
-    plt.ylabel('Anxiety Value', fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    save_plot('17_clusters_cgpa_anxiety.png')
+    cache_key = plot_cache_key('17_clusters_cgpa_anxiety.png', df[['Current CGPA', 'Anxiety Value', 'Cluster']], __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(12, 6))
+        scatter = plt.scatter(df['Current CGPA'], df['Anxiety Value'], 
+                             c=df['Cluster'], cmap='viridis', 
+                             alpha=0.6, edgecolors='black', s=50)
+        plt.colorbar(scatter, label='Cluster')
+        plt.title('K-Means Clusters: CGPA vs Anxiety Value', fontsize=16, fontweight='bold')
+        plt.xlabel('Current CGPA', fontsize=12)
+        plt.ylabel('Anxiety Value', fontsize=12)
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        save_plot('17_clusters_cgpa_anxiety.png', cache_key=cache_key)
     
     # 2. Cluster scatter: CGPA vs Stress
-    plt.figure(figsize=(12, 6))
-    scatter = plt.scatter(df['Current CGPA'], df['Stress Value'], 
-                         c=df['Cluster'], cmap='viridis', 
-                         alpha=0.6, edgecolors='black', s=50)
-    plt.colorbar(scatter, label='Cluster')
-    plt.title('K-Means Clusters: CGPA vs Stress Value', fontsize=16, fontweight='bold')
-    plt.xlabel('Current CGPA', fontsize=12)
-    plt.ylabel('Stress Value', fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    save_plot('18_clusters_cgpa_stress.png')
+    cache_key = plot_cache_key('18_clusters_cgpa_stress.png', df[['Current CGPA', 'Stress Value', 'Cluster']], __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(12, 6))
+        scatter = plt.scatter(df['Current CGPA'], df['Stress Value'], 
+                             c=df['Cluster'], cmap='viridis', 
+                             alpha=0.6, edgecolors='black', s=50)
+        plt.colorbar(scatter, label='Cluster')
+        plt.title('K-Means Clusters: CGPA vs Stress Value', fontsize=16, fontweight='bold')
+        plt.xlabel('Current CGPA', fontsize=12)
+        plt.ylabel('Stress Value', fontsize=12)
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        save_plot('18_clusters_cgpa_stress.png', cache_key=cache_key)
     
     # 3. Cluster scatter: CGPA vs Depression
-    plt.figure(figsize=(12, 6))
-    scatter = plt.scatter(df['Current CGPA'], df['Depression Value'], 
-                         c=df['Cluster'], cmap='viridis', 
-                         alpha=0.6, edgecolors='black', s=50)
-    plt.colorbar(scatter, label='Cluster')
-    plt.title('K-Means Clusters: CGPA vs Depression Value', fontsize=16, fontweight='bold')
-    plt.xlabel('Current CGPA', fontsize=12)
-    plt.ylabel('Depression Value', fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    save_plot('19_clusters_cgpa_depression.png')
+    cache_key = plot_cache_key('19_clusters_cgpa_depression.png', df[['Current CGPA', 'Depression Value', 'Cluster']], __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(12, 6))
+        scatter = plt.scatter(df['Current CGPA'], df['Depression Value'], 
+                             c=df['Cluster'], cmap='viridis', 
+                             alpha=0.6, edgecolors='black', s=50)
+        plt.colorbar(scatter, label='Cluster')
+        plt.title('K-Means Clusters: CGPA vs Depression Value', fontsize=16, fontweight='bold')
+        plt.xlabel('Current CGPA', fontsize=12)
+        plt.ylabel('Depression Value', fontsize=12)
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        save_plot('19_clusters_cgpa_depression.png', cache_key=cache_key)
     
     # 4. Cluster size distribution
-    plt.figure(figsize=(10, 6))
-    cluster_counts = df['Cluster'].value_counts().sort_index()
-    plt.bar(cluster_counts.index, cluster_counts.values, 
-            edgecolor='black', alpha=0.8, color=['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728'])
-    plt.title('Cluster Size Distribution', fontsize=16, fontweight='bold')
-    plt.xlabel('Cluster', fontsize=12)
-    plt.ylabel('Number of Students', fontsize=12)
-    for i, v in enumerate(cluster_counts.values):
-        plt.text(i, v + 5, str(v), ha='center', fontweight='bold')
-    plt.tight_layout()
-    save_plot('20_cluster_sizes.png')
+    cache_key = plot_cache_key('20_cluster_sizes.png', df['Cluster'], __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(10, 6))
+        cluster_counts = df['Cluster'].value_counts().sort_index()
+        plt.bar(cluster_counts.index, cluster_counts.values, 
+                edgecolor='black', alpha=0.8, color=[plt.cm.tab10(i % 10) for i in cluster_counts.index])
+        plt.title('Cluster Size Distribution', fontsize=16, fontweight='bold')
+        plt.xlabel('Cluster', fontsize=12)
+        plt.ylabel('Number of Students', fontsize=12)
+        for i, v in zip(cluster_counts.index, cluster_counts.values):
+            plt.text(i, v + 5, str(v), ha='center', fontweight='bold')
+        plt.tight_layout()
+        save_plot('20_cluster_sizes.png', cache_key=cache_key)
     
     # 5. Cluster characteristics heatmap
-    cluster_features = df.groupby('Cluster')[['Age', 'Current CGPA', 'Anxiety Value', 
-                                               'Stress Value', 'Depression Value']].mean()
-    
-    plt.figure(figsize=(10, 6))
-    sns.heatmap(cluster_features.T, annot=True, fmt='.2f', cmap='YlOrRd', 
-                cbar_kws={'label': 'Mean Value'}, linewidths=1)
-    plt.title('Cluster Characteristics Heatmap', fontsize=16, fontweight='bold')
-    plt.xlabel('Cluster', fontsize=12)
-    plt.ylabel('Feature', fontsize=12)
-    plt.tight_layout()
-    save_plot('21_cluster_characteristics.png')
+    cluster_features = profile_means(profile, ['Age', 'Current CGPA', 'Anxiety Value',
+                                               'Stress Value', 'Depression Value']).dropna()
+    
+    cache_key = plot_cache_key('21_cluster_characteristics.png', cluster_features, __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(10, 6))
+        sns.heatmap(cluster_features.T, annot=True, fmt='.2f', cmap='YlOrRd', 
+                    cbar_kws={'label': 'Mean Value'}, linewidths=1)
+        plt.title('Cluster Characteristics Heatmap', fontsize=16, fontweight='bold')
+        plt.xlabel('Cluster', fontsize=12)
+        plt.ylabel('Feature', fontsize=12)
+        plt.tight_layout()
+        save_plot('21_cluster_characteristics.png', cache_key=cache_key)
+    
+    # 6. K sweep: elbow and silhouette per k (sweep mode only)
+    if sweep:
+        scores = pd.DataFrame([{'k': r['k'], 'inertia': r['inertia'], 'silhouette': r['silhouette']} for r in sweep])
+        cache_key = plot_cache_key('21b_k_selection.png', scores, __file__, enabled=plots, chosen_k=n_clusters)
+        if cache_key:
+            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+            ax1.plot(scores['k'], scores['inertia'], marker='o')
+            ax1.set_title('Elbow: Inertia vs k', fontsize=14, fontweight='bold')
+            ax1.set_xlabel('k', fontsize=12)
+            ax1.set_ylabel('Inertia', fontsize=12)
+            ax2.plot(scores['k'], scores['silhouette'], marker='o', color='#2ca02c')
+            ax2.set_title('Silhouette vs k', fontsize=14, fontweight='bold')
+            ax2.set_xlabel('k', fontsize=12)
+            ax2.set_ylabel('Silhouette Score', fontsize=12)
+            for ax in (ax1, ax2):
+                ax.axvline(n_clusters, color='red', linestyle='--', label=f'chosen k={n_clusters}')
+                ax.legend()
+            plt.tight_layout()
+            save_plot('21b_k_selection.png', cache_key=cache_key)
     
     # Mental health distribution by cluster
-    print("\n[3.9] Mental Health Distribution by Cluster:")
+    profiling.step('3.10 Mental Health Distribution by Cluster')
+    print("\n[3.10] Mental Health Distribution by Cluster:")
     print("="*60)
-    for cluster in range(4):
-        cluster_data = df[df['Cluster'] == cluster]
-        print(f"\nCluster {cluster}:")
-        print(f"  Anxiety:    {cluster_data['Anxiety Label'].value_counts().to_dict()}")
-        print(f"  Stress:     {cluster_data['Stress Label'].value_counts().to_dict()}")
-        print(f"  Depression: {cluster_data['Depression Label'].value_counts().to_dict()}")
+    for c in profile['clusters']:
+        print(f"\nCluster {c['cluster']}:")
+        for name, col in [('Anxiety', 'Anxiety Label'), ('Stress', 'Stress Label'), ('Depression', 'Depression Label')]:
+            counts = {label: n for label, n in sorted(c['labels'][col].items(), key=lambda item: -item[1]) if n}
+            print(f"  {name + ':':<11} {counts}")
     
     print("\n" + "="*60)
     print("✓ CLUSTERING ANALYSIS COMPLETE")
-    print(f"✓ Created 5 cluster visualizations")
+    if plots:
+        print(f"✓ Created {6 if sweep else 5} cluster visualizations")
     print("="*60)
+    
+    return n_clusters
 
 
 if __name__ == '__main__':
-    run()
+    import argparse
+    parser = argparse.ArgumentParser(description='Run K-Means clustering analysis')
+    parser.add_argument('--no-plots', action='store_true', help='skip all figures')
+    parser.add_argument('--engine', choices=['sklearn', 'mapreduce', 'minibatch'], default='sklearn',
+                        help='clustering engine (default: in-memory sklearn KMeans)')
+    parser.add_argument('--n-jobs', type=int, default=None,
+                        help='worker processes for out-of-core engines and the k sweep')
+    parser.add_argument('--k', type=int, default=4, help='number of clusters (default: 4)')
+    parser.add_argument('--select-k', choices=k_selection.SELECTION_RULES, default=None,
+                        help='sweep candidate k in parallel and pick one by this rule (overrides --k)')
+    parser.add_argument('--k-range', type=int, nargs=2, default=[2, 10], metavar=('MIN', 'MAX'),
+                        help='candidate k values for --select-k (default: 2 10)')
+    args = parser.parse_args()
+    
+    run(plots=not args.no_plots, engine=args.engine, n_jobs=args.n_jobs, n_clusters=args.k,
+        select_k=args.select_k, k_values=range(args.k_range[0], args.k_range[1] + 1))
@@ -5,8 +5,6 @@ Author: Sakhi Patel
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import confusion_matrix, classification_report, accuracy_score
@@ -14,13 +12,117 @@ from sklearn.preprocessing import LabelEncoder
 import joblib
 import os
 import sys
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.utils import save_plot
+from src.utils import save_plot, plot_cache_key, load_plotting
+from src import profiling
+from src.bootstrap_evaluation import bootstrap_targets, format_results, save_results, N_RESAMPLES
+from src.drift_monitor import build_reference, save_reference, REFERENCE_PATH
 
-sns.set_style('whitegrid')
 
+FEATURE_COLS = ['Age', 'Gender', 'Current CGPA', 'Scholarship', 'Academic Year', 'Cluster']
+TARGETS = [
+    ('Anxiety Label', 'Anxiety Prediction'),
+    ('Stress Label', 'Stress Prediction'),
+    ('Depression Label', 'Depression Prediction')
+]
+DEFAULT_RF_PARAMS = {'n_estimators': 100, 'max_depth': 10}
+TUNED_PARAMS_PATH = 'outputs/models/tuned_params.json'
+LABEL_CLASSES_PATH = 'outputs/models/label_classes.json'
 
-def train_model(df, target_col, model_name):
+
+def model_path(model_name):
+    """Path of the saved model for a target"""
+    return f'outputs/models/{model_name.lower().replace(" ", "_")}_model.pkl'
+
+
+def load_label_classes():
+    """Label names behind each saved model's encoded classes"""
+    if os.path.exists(LABEL_CLASSES_PATH):
+        with open(LABEL_CLASSES_PATH) as f:
+            return json.load(f)
+    return {}
+
+
+def load_tuned_params(target_col):
+    """Forest settings for a target: tuned if available, defaults otherwise"""
+    if os.path.exists(TUNED_PARAMS_PATH):
+        with open(TUNED_PARAMS_PATH) as f:
+            tuned = json.load(f)
+        if target_col in tuned:
+            return tuned[target_col]
+    return dict(DEFAULT_RF_PARAMS)
+
+
+def save_tuned_params(params_by_target):
+    """Persist tuned forest settings for train_model"""
+    os.makedirs(os.path.dirname(TUNED_PARAMS_PATH), exist_ok=True)
+    with open(TUNED_PARAMS_PATH, 'w') as f:
+        json.dump(params_by_target, f, indent=2, sort_keys=True)
+
+
+def build_feature_matrix(df):
+    """Build the float32 feature matrix shared by every target model"""
+    # Single float32 block: forests train in float32 anyway, so no per-fit conversion copy
+    return pd.DataFrame(df[FEATURE_COLS].to_numpy(dtype=np.float32), columns=FEATURE_COLS)
+
+
+def split_core_budget(n_cores, n_targets):
+    """Split a core budget between concurrent targets and trees within each forest"""
+    target_jobs = max(1, min(n_cores, n_targets))
+    tree_jobs = [max(1, n_cores // target_jobs + (i < n_cores % target_jobs)) for i in range(n_targets)]
+    return target_jobs, tree_jobs
+
+
+def split_indices(y):
+    """80/20 train/test row indices for an encoded target (same split every run)"""
+    # Split on row indices so every target reuses the same matrix
+    # (stratify only when every class has two rows, e.g. a lone 'High' in a small sample)
+    stratify = y if np.bincount(y).min() >= 2 else None
+    return train_test_split(np.arange(len(y)), test_size=0.2, random_state=42, stratify=stratify)
+
+
+def fit_model(X, labels, n_jobs=1, params=None):
+    """Encode, split and fit one target on the shared feature matrix"""
+    le = LabelEncoder()
+    y = le.fit_transform(labels)
+    train_idx, test_idx = split_indices(y)
+    
+    params = params or DEFAULT_RF_PARAMS
+    rf = RandomForestClassifier(**params, class_weight='balanced', random_state=42, n_jobs=n_jobs)
+    start = time.perf_counter()
+    rf.fit(X.iloc[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - start
+    y_pred = rf.predict(X.iloc[test_idx])
+    
+    # Core budget only applies to training; saved models predict single-threaded
+    rf.set_params(n_jobs=None)
+    
+    return {
+        'encoder': le, 'y': y, 'train_idx': train_idx, 'test_idx': test_idx,
+        'model': rf, 'y_pred': y_pred, 'fit_seconds': fit_seconds, 'n_jobs': n_jobs,
+        'params': params
+    }
+
+
+def fit_all_targets(df, X=None, n_cores=None):
+    """Fit all target models concurrently within a core budget"""
+    if X is None:
+        X = build_feature_matrix(df)
+    n_cores = n_cores or os.cpu_count() or 1
+    target_jobs, tree_jobs = split_core_budget(n_cores, len(TARGETS))
+    
+    # Threads share X without copying; tree building releases the GIL
+    with ThreadPoolExecutor(max_workers=target_jobs) as pool:
+        futures = {target_col: pool.submit(fit_model, X, df[target_col].to_numpy(), jobs,
+                                           load_tuned_params(target_col))
+                   for (target_col, _), jobs in zip(TARGETS, tree_jobs)}
+    return {target_col: future.result() for target_col, future in futures.items()}
+
+
+def train_model(df, target_col, model_name, plots=True, X=None, n_jobs=1, fitted=None):
     """Train Random Forest model for a specific mental health category"""
     
     print(f"\n{'='*60}")
@@ -28,12 +130,15 @@ def train_model(df, target_col, model_name):
     print('='*60)
     
     # Prepare features
-    feature_cols = ['Age', 'Gender', 'Current CGPA', 'Scholarship', 'Academic Year', 'Cluster']
-    X = df[feature_cols]
+    feature_cols = FEATURE_COLS
+    if X is None:
+        X = build_feature_matrix(df)
     
-    # Encode target
-    le = LabelEncoder()
-    y = le.fit_transform(df[target_col])
+    # Fit unless already trained by fit_all_targets
+    if fitted is None:
+        fitted = fit_model(X, df[target_col].to_numpy(), n_jobs, load_tuned_params(target_col))
+    le, y, rf = fitted['encoder'], fitted['y'], fitted['model']
+    y_test, y_pred = y[fitted['test_idx']], fitted['y_pred']
     
     print(f"\n[1] Dataset prepared:")
     print(f"  Features: {feature_cols}")
@@ -42,20 +147,14 @@ def train_model(df, target_col, model_name):
     print(f"  Class distribution: {pd.Series(y).value_counts().to_dict()}")
     
     # Train-test split
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
     print(f"\n[2] Train-test split:")
-    print(f"  Training samples: {len(X_train)}")
-    print(f"  Testing samples: {len(X_test)}")
+    print(f"  Training samples: {len(fitted['train_idx'])}")
+    print(f"  Testing samples: {len(fitted['test_idx'])}")
     
     # Train Random Forest
     print(f"\n[3] Training Random Forest...")
-    rf = RandomForestClassifier(n_estimators=100, max_depth=10, 
-                                class_weight='balanced', random_state=42)
-    rf.fit(X_train, y_train)
-    print("  ✓ Model trained")
-    
-    # Predictions
-    y_pred = rf.predict(X_test)
+    print(f"  Parameters: {fitted['params']}")
+    print(f"  ✓ Model trained in {fitted['fit_seconds']:.2f}s (n_jobs={fitted['n_jobs']})")
     
     # Metrics
     accuracy = accuracy_score(y_test, y_pred)
@@ -63,20 +162,27 @@ def train_model(df, target_col, model_name):
     print(f"  Accuracy: {accuracy:.4f}")
     
     print(f"\n[5] Classification Report:")
-    print(classification_report(y_test, y_pred, target_names=le.classes_))
+    # labels= keeps every class in the report even if the test split misses a rare one
+    class_ids = np.arange(len(le.classes_))
+    print(classification_report(y_test, y_pred, labels=class_ids, target_names=le.classes_, zero_division=0))
     
     # Confusion Matrix
-    cm = confusion_matrix(y_test, y_pred)
-    
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', 
-                xticklabels=le.classes_, yticklabels=le.classes_,
-                cbar_kws={'label': 'Count'})
-    plt.title(f'{model_name} - Confusion Matrix', fontsize=16, fontweight='bold')
-    plt.xlabel('Predicted Label', fontsize=12)
-    plt.ylabel('True Label', fontsize=12)
-    plt.tight_layout()
-    save_plot(f'{model_name.lower().replace(" ", "_")}_confusion_matrix.png')
+    cm = confusion_matrix(y_test, y_pred, labels=class_ids)
+    plot_prefix = model_name.lower().replace(" ", "_")
+    if plots:
+        plt, sns = load_plotting()
+    
+    cache_key = plot_cache_key(f'{plot_prefix}_confusion_matrix.png', cm, __file__, enabled=plots, model_name=model_name, classes=list(le.classes_))
+    if cache_key:
+        plt.figure(figsize=(8, 6))
+        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', 
+                    xticklabels=le.classes_, yticklabels=le.classes_,
+                    cbar_kws={'label': 'Count'})
+        plt.title(f'{model_name} - Confusion Matrix', fontsize=16, fontweight='bold')
+        plt.xlabel('Predicted Label', fontsize=12)
+        plt.ylabel('True Label', fontsize=12)
+        plt.tight_layout()
+        save_plot(f'{plot_prefix}_confusion_matrix.png', cache_key=cache_key)
     
     # Feature Importance
     feature_importance = pd.DataFrame({
@@ -87,68 +193,145 @@ def train_model(df, target_col, model_name):
     print(f"\n[6] Feature Importance:")
     print(feature_importance.to_string(index=False))
     
-    plt.figure(figsize=(10, 6))
-    plt.barh(feature_importance['Feature'], feature_importance['Importance'], 
-             edgecolor='black', alpha=0.8)
-    plt.title(f'{model_name} - Feature Importance', fontsize=16, fontweight='bold')
-    plt.xlabel('Importance', fontsize=12)
-    plt.ylabel('Feature', fontsize=12)
-    plt.gca().invert_yaxis()
-    plt.tight_layout()
-    save_plot(f'{model_name.lower().replace(" ", "_")}_feature_importance.png')
-    
-    # Save model
+    cache_key = plot_cache_key(f'{plot_prefix}_feature_importance.png', feature_importance, __file__, enabled=plots, model_name=model_name)
+    if cache_key:
+        plt.figure(figsize=(10, 6))
+        plt.barh(feature_importance['Feature'], feature_importance['Importance'], 
+                 edgecolor='black', alpha=0.8)
+        plt.title(f'{model_name} - Feature Importance', fontsize=16, fontweight='bold')
+        plt.xlabel('Importance', fontsize=12)
+        plt.ylabel('Feature', fontsize=12)
+        plt.gca().invert_yaxis()
+        plt.tight_layout()
+        save_plot(f'{plot_prefix}_feature_importance.png', cache_key=cache_key)
+    
+    # Save model and the label names behind its encoded classes
     os.makedirs('outputs/models', exist_ok=True)
-    model_path = f'outputs/models/{model_name.lower().replace(" ", "_")}_model.pkl'
-    joblib.dump(rf, model_path)
-    print(f"\n[7] Model saved to: {model_path}")
+    path = model_path(model_name)
+    joblib.dump(rf, path)
+    label_classes = load_label_classes()
+    label_classes[target_col] = [str(c) for c in le.classes_]
+    with open(LABEL_CLASSES_PATH, 'w') as f:
+        json.dump(label_classes, f, indent=2, sort_keys=True)
+    print(f"\n[7] Model saved to: {path}")
     
     return accuracy, cm, feature_importance
 
 
-def run():
-    """Execute classification pipeline for all mental health categories"""
+def report_scaling(df, max_cores=None):
+    """Time multi-target training from 1 to max_cores cores and check determinism"""
+    max_cores = max_cores or os.cpu_count() or 1
+    core_counts = sorted({2**i for i in range(max_cores.bit_length()) if 2**i <= max_cores} | {max_cores})
+    X = build_feature_matrix(df)
+    
+    print("\n[Scaling] Training time vs cores:")
+    lines = []
+    baseline_seconds, baseline_preds = None, None
+    for n_cores in core_counts:
+        start = time.perf_counter()
+        fits = fit_all_targets(df, X=X, n_cores=n_cores)
+        seconds = time.perf_counter() - start
+        preds = [fits[target_col]['model'].predict_proba(X) for target_col, _ in TARGETS]
+        if baseline_seconds is None:
+            baseline_seconds, baseline_preds = seconds, preds
+        identical = all(np.array_equal(a, b) for a, b in zip(preds, baseline_preds))
+        target_jobs, tree_jobs = split_core_budget(n_cores, len(TARGETS))
+        line = (f"  cores={n_cores:<3} targets={target_jobs} trees/target={tree_jobs} "
+                f"time={seconds:.2f}s speedup={baseline_seconds / seconds:.2f}x "
+                f"identical={'yes' if identical else 'NO'}")
+        print(line)
+        lines.append(line)
+    
+    os.makedirs('outputs/results', exist_ok=True)
+    with open('outputs/results/training_scaling.txt', 'w') as f:
+        f.write("="*60 + "\n")
+        f.write(f"MULTI-TARGET TRAINING SCALING ({len(df)} rows)\n")
+        f.write("="*60 + "\n\n")
+        f.write("\n".join(lines) + "\n")
+    print("  ✓ Saved to: outputs/results/training_scaling.txt")
+
+
+def run(plots=True, n_jobs=None, n_resamples=N_RESAMPLES):
+    """Execute classification pipeline for all mental health categories (plots=False skips all figures)"""
     
     print("\n" + "="*60)
     print("STEP 4: CLASSIFICATION MODELS")
     print("="*60)
     
     # Load clustered data
+    profiling.step('4.1 Loading clustered data')
     print("\n[4.1] Loading clustered data...")
     df = pd.read_csv('outputs/clustered_data.csv')
     print(f"  ✓ Loaded {len(df)} records")
     
-    # Train models for each mental health category
+    # Train all targets concurrently over one shared feature matrix
+    n_cores = n_jobs or os.cpu_count() or 1
+    profiling.step('4.2 Training targets in parallel')
+    print(f"\n[4.2] Training {len(TARGETS)} targets in parallel ({n_cores} cores)...")
+    X = build_feature_matrix(df)
+    start = time.perf_counter()
+    fits = fit_all_targets(df, X=X, n_cores=n_cores)
+    print(f"  ✓ All models trained in {time.perf_counter() - start:.2f}s")
+    
+    # Feature histograms of the training data, the baseline for the API's drift monitor
+    save_reference(build_reference(X))
+    print(f"  ✓ Drift reference histograms saved to: {REFERENCE_PATH}")
+    
+    # Report models for each mental health category
     results = {}
     
     # 1. Anxiety Model
+    profiling.step('Anxiety model report')
     print("\n" + "="*60)
     print("MODEL 1: ANXIETY PREDICTION")
     print("="*60)
-    acc_anxiety, cm_anxiety, fi_anxiety = train_model(df, 'Anxiety Label', 'Anxiety Prediction')
+    acc_anxiety, cm_anxiety, fi_anxiety = train_model(df, 'Anxiety Label', 'Anxiety Prediction', plots=plots,
+                                                      X=X, fitted=fits['Anxiety Label'])
     results['Anxiety'] = {'accuracy': acc_anxiety, 'confusion_matrix': cm_anxiety}
     
     # 2. Stress Model
+    profiling.step('Stress model report')
     print("\n" + "="*60)
     print("MODEL 2: STRESS PREDICTION")
     print("="*60)
-    acc_stress, cm_stress, fi_stress = train_model(df, 'Stress Label', 'Stress Prediction')
+    acc_stress, cm_stress, fi_stress = train_model(df, 'Stress Label', 'Stress Prediction', plots=plots,
+                                                   X=X, fitted=fits['Stress Label'])
     results['Stress'] = {'accuracy': acc_stress, 'confusion_matrix': cm_stress}
     
     # 3. Depression Model
+    profiling.step('Depression model report')
     print("\n" + "="*60)
     print("MODEL 3: DEPRESSION PREDICTION")
     print("="*60)
-    acc_depression, cm_depression, fi_depression = train_model(df, 'Depression Label', 'Depression Prediction')
+    acc_depression, cm_depression, fi_depression = train_model(df, 'Depression Label', 'Depression Prediction', plots=plots,
+                                                               X=X, fitted=fits['Depression Label'])
     results['Depression'] = {'accuracy': acc_depression, 'confusion_matrix': cm_depression}
     
+    # Bootstrap intervals on each model's test split (one process pool for all three)
+    profiling.step('4.3 Bootstrap confidence intervals')
+    print(f"\n[4.3] Bootstrap confidence intervals ({n_resamples:,} resamples per model)...")
+    start = time.perf_counter()
+    intervals = bootstrap_targets({model_name: {'y_true': fits[target_col]['y'][fits[target_col]['test_idx']],
+                                                'y_pred': fits[target_col]['y_pred'],
+                                                'classes': [str(c) for c in fits[target_col]['encoder'].classes_]}
+                                   for target_col, model_name in TARGETS}, n_resamples=n_resamples, n_jobs=n_cores)
+    seconds = time.perf_counter() - start
+    print(format_results(intervals, n_resamples))
+    save_results(intervals, n_resamples)
+    print(f"  ✓ {n_resamples * len(TARGETS):,} resamples in {seconds:.2f}s, saved to: outputs/results/bootstrap_ci.json")
+    
+    def with_interval(model_name):
+        accuracy = intervals[model_name]['accuracy']
+        return f"{accuracy['estimate']:.4f}  (95% CI {accuracy['low']:.4f}-{accuracy['high']:.4f})"
+    
     # Summary
+    profiling.step('Performance summary and comparison plot')
     print("\n" + "="*60)
     print("MODEL PERFORMANCE SUMMARY")
     print("="*60)
-    print(f"\nAnxiety Model Accuracy:    {acc_anxiety:.4f}")
-    print(f"Stress Model Accuracy:     {acc_stress:.4f}")
-    print(f"Depression Model Accuracy: {acc_depression:.4f}")
+    print(f"\nAnxiety Model Accuracy:    {with_interval('Anxiety Prediction')}")
+    print(f"Stress Model Accuracy:     {with_interval('Stress Prediction')}")
+    print(f"Depression Model Accuracy: {with_interval('Depression Prediction')}")
     
     # Save results
     os.makedirs('outputs/results', exist_ok=True)
@@ -156,39 +339,58 @@ def run():
         f.write("="*60 + "\n")
         f.write("MENTAL HEALTH PREDICTION - MODEL PERFORMANCE\n")
         f.write("="*60 + "\n\n")
-        f.write(f"Anxiety Model Accuracy:    {acc_anxiety:.4f}\n")
-        f.write(f"Stress Model Accuracy:     {acc_stress:.4f}\n")
-        f.write(f"Depression Model Accuracy: {acc_depression:.4f}\n")
+        f.write(f"Anxiety Model Accuracy:    {with_interval('Anxiety Prediction')}\n")
+        f.write(f"Stress Model Accuracy:     {with_interval('Stress Prediction')}\n")
+        f.write(f"Depression Model Accuracy: {with_interval('Depression Prediction')}\n")
+        f.write("\n" + format_results(intervals, n_resamples) + "\n")
         f.write("\n" + "="*60 + "\n")
     
     print("\n✓ Results saved to: outputs/results/model_performance.txt")
     
     # Comparison plot
-    plt.figure(figsize=(10, 6))
+    if plots:
+        plt, sns = load_plotting()
     models = ['Anxiety', 'Stress', 'Depression']
     accuracies = [acc_anxiety, acc_stress, acc_depression]
     colors = ['#ff6b6b', '#feca57', '#48dbfb']
-    
-    bars = plt.bar(models, accuracies, edgecolor='black', alpha=0.8, color=colors)
-    plt.title('Model Performance Comparison', fontsize=16, fontweight='bold')
-    plt.ylabel('Accuracy', fontsize=12)
-    plt.ylim(0, 1.0)
-    plt.grid(True, alpha=0.3, axis='y')
-    
-    for bar, acc in zip(bars, accuracies):
-        height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height + 0.02,
-                f'{acc:.3f}', ha='center', va='bottom', fontweight='bold')
-    
-    plt.tight_layout()
-    save_plot('22_model_comparison.png')
+    cache_key = plot_cache_key('22_model_comparison.png', np.array(accuracies), __file__, enabled=plots)
+    if cache_key:
+        plt.figure(figsize=(10, 6))
+        
+        bars = plt.bar(models, accuracies, edgecolor='black', alpha=0.8, color=colors)
+        plt.title('Model Performance Comparison', fontsize=16, fontweight='bold')
+        plt.ylabel('Accuracy', fontsize=12)
+        plt.ylim(0, 1.0)
+        plt.grid(True, alpha=0.3, axis='y')
+        
+        for bar, acc in zip(bars, accuracies):
+            height = bar.get_height()
+            plt.text(bar.get_x() + bar.get_width()/2., height + 0.02,
+                    f'{acc:.3f}', ha='center', va='bottom', fontweight='bold')
+        
+        plt.tight_layout()
+        save_plot('22_model_comparison.png', cache_key=cache_key)
     
     print("\n" + "="*60)
     print("✓ CLASSIFICATION COMPLETE")
     print(f"✓ Trained 3 Random Forest models")
-    print(f"✓ Created 7 visualizations")
+    if plots:
+        print(f"✓ Created 7 visualizations")
     print("="*60)
 
 
 if __name__ == '__main__':
-    run()
+    import argparse
+    parser = argparse.ArgumentParser(description='Train the Random Forest classifiers')
+    parser.add_argument('--no-plots', action='store_true', help='skip all figures')
+    parser.add_argument('--n-jobs', type=int, default=None, help='core budget (default: all cores)')
+    parser.add_argument('--scaling', action='store_true',
+                        help='report training time scaling from 1 to --n-jobs cores instead of training')
+    parser.add_argument('--resamples', type=int, default=N_RESAMPLES,
+                        help=f'bootstrap resamples per model for the accuracy/recall/F1 intervals (default: {N_RESAMPLES})')
+    args = parser.parse_args()
+    
+    if args.scaling:
+        report_scaling(pd.read_csv('outputs/clustered_data.csv'), args.n_jobs)
+    else:
+        run(plots=not args.no_plots, n_jobs=args.n_jobs, n_resamples=args.resamples)
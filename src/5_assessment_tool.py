@@ -3,7 +3,14 @@ Interactive Mental Health Self-Assessment Tool
 Author: Sakhi Patel
 """
 
+import os
 import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import instruments
+from src.instruments import INSTRUMENTS, SCALE_MIN, SCALE_MAX
+
+# Display names and markers for each level
+LEVEL_DISPLAY = {'Low': ('LOW', '✓'), 'Medium': ('MODERATE', '⚠'), 'High': ('HIGH', '⚠⚠')}
 
 
 def get_valid_input(question, min_val=0, max_val=4):
@@ -19,184 +26,41 @@ def get_valid_input(question, min_val=0, max_val=4):
             print("  ⚠ Please enter a valid number")
 
 
-def stress_assessment():
-    """Conduct stress assessment"""
-    
-    questions = [
-        "How often have you felt upset due to something in your academic affairs?",
-        "How often you felt unable to control important things in your academic affairs?",
-        "How often you felt nervous and stressed because of academic pressure?",
-        "How often you felt you could not cope with all mandatory academic activities?",
-        "How often you felt confident about your ability to handle academic problems? (reverse)",
-        "How often you felt things in your academic life are going your way? (reverse)",
-        "How often are you able to control irritations in your academic affairs? (reverse)",
-        "How often you felt your academic performance was on top? (reverse)",
-        "How often you got angered due to bad performance beyond your control?",
-        "How often you felt academic difficulties are piling up too high to overcome?"
-    ]
+def run_assessment(key):
+    """Ask an instrument's questions and score them with the shared scoring engine"""
+    instrument = INSTRUMENTS[key]
+    title = instrument['name'].upper()
+    items = instrument['items']
     
     print("\n" + "="*70)
-    print("STRESS ASSESSMENT")
+    print(f"{title} ASSESSMENT")
     print("="*70)
-    print("\nRate each question on a scale of 0-4:")
+    print(f"\nRate each question on a scale of {SCALE_MIN}-{SCALE_MAX}:")
     print("  0 = Never  |  1 = Rarely  |  2 = Sometimes  |  3 = Often  |  4 = Very Often")
     print("\n" + "-"*70)
     
-    total_score = 0
     responses = []
+    for i, (_, prompt, reverse) in enumerate(items, 1):
+        print(f"\n[Question {i}/{len(items)}]")
+        question = f"{prompt} (reverse)" if reverse else prompt
+        responses.append(get_valid_input(f"{question}\nYour answer ({SCALE_MIN}-{SCALE_MAX}): ", SCALE_MIN, SCALE_MAX))
     
-    for i, question in enumerate(questions, 1):
-        print(f"\n[Question {i}/10]")
-        score = get_valid_input(f"{question}\nYour answer (0-4): ")
-        responses.append(score)
-        total_score += score
+    result = instruments.assess(key, responses)
     
     # Interpret results
     print("\n" + "="*70)
-    print("STRESS ASSESSMENT RESULTS")
+    print(f"{title} ASSESSMENT RESULTS")
     print("="*70)
-    print(f"\nTotal Score: {total_score} / 40")
+    print(f"\nTotal Score: {result['score']} / {result['max_score']}")
     
-    if total_score < 18:
-        level = "LOW STRESS"
-        color = "✓"
-        interpretation = "You appear to be managing academic stress well."
-        recommendation = "Continue your current coping strategies and maintain work-life balance."
-    elif total_score < 35:
-        level = "MODERATE STRESS"
-        color = "⚠"
-        interpretation = "You're experiencing moderate levels of academic stress."
-        recommendation = "Consider stress management techniques like time management, exercise, and talking to friends or counselors."
-    else:
-        level = "HIGH STRESS"
-        color = "⚠⚠"
-        interpretation = "You're experiencing high levels of academic stress."
-        recommendation = "It's important to seek support. Consider talking to a counselor, academic advisor, or mental health professional."
-    
-    print(f"\nStress Level: {color} {level}")
-    print(f"\nInterpretation: {interpretation}")
-    print(f"\nRecommendation: {recommendation}")
-    
-    return total_score, level
-
-
-def anxiety_assessment():
-    """Conduct anxiety assessment"""
-    
-    questions = [
-        "How often you felt nervous, anxious or on edge due to academic pressure?",
-        "How often have you been unable to stop worrying about your academic affairs?",
-        "How often have you had trouble relaxing due to academic pressure?",
-        "How often have you been easily annoyed or irritated because of academic pressure?",
-        "How often have you worried too much about academic affairs?",
-        "How often have you been so restless that it is hard to sit still?",
-        "How often have you felt afraid, as if something awful might happen?"
-    ]
-    
-    print("\n" + "="*70)
-    print("ANXIETY ASSESSMENT")
-    print("="*70)
-    print("\nRate each question on a scale of 0-4:")
-    print("  0 = Never  |  1 = Rarely  |  2 = Sometimes  |  3 = Often  |  4 = Very Often")
-    print("\n" + "-"*70)
-    
-    total_score = 0
-    responses = []
-    
-    for i, question in enumerate(questions, 1):
-        print(f"\n[Question {i}/7]")
-        score = get_valid_input(f"{question}\nYour answer (0-4): ")
-        responses.append(score)
-        total_score += score
-    
-    # Interpret results
-    print("\n" + "="*70)
-    print("ANXIETY ASSESSMENT RESULTS")
-    print("="*70)
-    print(f"\nTotal Score: {total_score} / 28")
-    
-    if total_score < 18:
-        level = "LOW ANXIETY"
-        color = "✓"
-        interpretation = "You appear to have minimal anxiety related to academics."
-        recommendation = "Keep up your positive mindset and healthy habits."
-    elif total_score < 35:
-        level = "MODERATE ANXIETY"
-        color = "⚠"
-        interpretation = "You're experiencing moderate levels of academic anxiety."
-        recommendation = "Try relaxation techniques, mindfulness, or breathing exercises. Consider talking to someone you trust."
-    else:
-        level = "HIGH ANXIETY"
-        color = "⚠⚠"
-        interpretation = "You're experiencing high levels of academic anxiety."
-        recommendation = "Please consider seeking professional help from a counselor or mental health professional."
-    
-    print(f"\nAnxiety Level: {color} {level}")
-    print(f"\nInterpretation: {interpretation}")
-    print(f"\nRecommendation: {recommendation}")
-    
-    return total_score, level
-
-
-def depression_assessment():
-    """Conduct depression assessment"""
-    
-    questions = [
-        "How often have you had little interest or pleasure in doing things?",
-        "How often have you been feeling down, depressed or hopeless?",
-        "How often have you had trouble falling or staying asleep, or sleeping too much?",
-        "How often have you been feeling tired or having little energy?",
-        "How often have you had poor appetite or overeating?",
-        "How often have you been feeling bad about yourself or that you are a failure?",
-        "How often have you been having trouble concentrating on things?",
-        "How often have you moved or spoke too slowly for others to notice?",
-        "How often have you had thoughts that you would be better off dead?"
-    ]
-    
-    print("\n" + "="*70)
-    print("DEPRESSION ASSESSMENT")
-    print("="*70)
-    print("\nRate each question on a scale of 0-4:")
-    print("  0 = Never  |  1 = Rarely  |  2 = Sometimes  |  3 = Often  |  4 = Very Often")
-    print("\n" + "-"*70)
-    
-    total_score = 0
-    responses = []
-    
-    for i, question in enumerate(questions, 1):
-        print(f"\n[Question {i}/9]")
-        score = get_valid_input(f"{question}\nYour answer (0-4): ")
-        responses.append(score)
-        total_score += score
-    
-    # Interpret results
-    print("\n" + "="*70)
-    print("DEPRESSION ASSESSMENT RESULTS")
-    print("="*70)
-    print(f"\nTotal Score: {total_score} / 36")
-    
-    if total_score < 18:
-        level = "LOW DEPRESSION"
-        color = "✓"
-        interpretation = "You appear to have minimal depressive symptoms."
-        recommendation = "Continue taking care of your mental health through self-care and social connections."
-    elif total_score < 35:
-        level = "MODERATE DEPRESSION"
-        color = "⚠"
-        interpretation = "You're experiencing moderate depressive symptoms."
-        recommendation = "Consider reaching out to a counselor, therapist, or trusted person. Professional support can be very helpful."
-    else:
-        level = "HIGH DEPRESSION"
-        color = "⚠⚠"
-        interpretation = "You're experiencing significant depressive symptoms."
-        recommendation = "Please seek professional help immediately. Contact a mental health professional or crisis helpline."
-    
-    print(f"\nDepression Level: {color} {level}")
-    print(f"\nInterpretation: {interpretation}")
-    print(f"\nRecommendation: {recommendation}")
+    display, color = LEVEL_DISPLAY[result['level']]
+    level = f"{display} {title}"
+    print(f"\n{instrument['name']} Level: {color} {level}")
+    print(f"\nInterpretation: {result['interpretation']}")
+    print(f"\nRecommendation: {result['recommendation']}")
     
     # Special warning for suicidal thoughts
-    if responses[-1] >= 2:
+    if result['crisis']:
         print("\n" + "!"*70)
         print("IMPORTANT: You indicated thoughts of self-harm.")
         print("Please reach out for help immediately:")
@@ -205,7 +69,22 @@ def depression_assessment():
         print("  • Campus Counseling Center")
         print("!"*70)
     
-    return total_score, level
+    return result['score'], level
+
+
+def stress_assessment():
+    """Conduct stress assessment"""
+    return run_assessment('stress')
+
+
+def anxiety_assessment():
+    """Conduct anxiety assessment"""
+    return run_assessment('anxiety')
+
+
+def depression_assessment():
+    """Conduct depression assessment"""
+    return run_assessment('depression')
 
 
 def complete_assessment():
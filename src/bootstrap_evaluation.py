@@ -0,0 +1,192 @@
+"""
+Bootstrap Confidence Intervals for the Classification Models (bulk resampling over a process pool)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import importlib
+import joblib
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_RESAMPLES = 2000
+CONFIDENCE = 0.95
+SHARD_RESAMPLES = 250       # resamples per task; seeds are per shard, so results never depend on n_jobs
+BLOCK_DRAWS = 1 << 22       # index draws held in memory at once (resamples x test rows)
+RESULTS_PATH = 'outputs/results/bootstrap_ci.json'
+REPORT_PATH = 'outputs/results/bootstrap_ci.txt'
+
+
+def shard_seed(seed, target_index, shard_index):
+    """Independent seed for one shard of one target's resamples"""
+    return np.random.SeedSequence(seed, spawn_key=(target_index, shard_index))
+
+
+def confusion_matrices(y_true, y_pred, n_classes, rows):
+    """Confusion matrix of every resample at once: rows is a (resamples, n) index array
+    
+    Each resampled row becomes one flat cell id (resample, true, predicted), so a single
+    bincount accumulates all the matrices.
+    """
+    cells = (y_true * n_classes + y_pred)[rows]
+    cells += (np.arange(len(rows)) * n_classes * n_classes)[:, None]
+    return np.bincount(cells.ravel(), minlength=len(rows) * n_classes * n_classes).reshape(
+        len(rows), n_classes, n_classes)
+
+
+def matrix_metrics(cm):
+    """Accuracy, per-class recall and macro-F1 from a stack of confusion matrices (..., K, K)
+    
+    Recall of a class with no true rows is NaN; F1 follows sklearn's zero_division=0.
+    """
+    tp = np.diagonal(cm, axis1=-2, axis2=-1).astype(np.float64)
+    actual, predicted = cm.sum(axis=-1), cm.sum(axis=-2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        recall = np.where(actual > 0, tp / actual, np.nan)
+        f1 = np.where(actual + predicted > 0, 2 * tp / (actual + predicted), 0.0)
+    return {'accuracy': tp.sum(axis=-1) / cm.sum(axis=(-2, -1)), 'recall': recall, 'macro_f1': f1.mean(axis=-1)}
+
+
+def resample_shard(y_true, y_pred, n_classes, n_resamples, seed):
+    """Metrics for one shard of bootstrap resamples (index arrays drawn in bulk, in bounded blocks)"""
+    rng = np.random.default_rng(seed)
+    n = len(y_true)
+    block = max(1, min(n_resamples, BLOCK_DRAWS // n))
+    matrices = []
+    for start in range(0, n_resamples, block):
+        rows = rng.integers(0, n, size=(min(block, n_resamples - start), n))
+        matrices.append(confusion_matrices(y_true, y_pred, n_classes, rows))
+    return matrix_metrics(np.concatenate(matrices))
+
+
+def interval(values, confidence=CONFIDENCE):
+    """Percentile interval, standard error and number of resamples where the metric is defined"""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {'low': None, 'high': None, 'std_error': None, 'resamples': 0}
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(values, [tail, 100 - tail])
+    return {'low': round(float(low), 4), 'high': round(float(high), 4),
+            'std_error': round(float(values.std(ddof=1)) if len(values) > 1 else 0.0, 4), 'resamples': len(values)}
+
+
+def bootstrap_targets(targets, n_resamples=N_RESAMPLES, n_jobs=None, seed=42, confidence=CONFIDENCE):
+    """Bootstrap intervals for several models at once; every target's shards share one process pool
+    
+    targets: {name: {'y_true', 'y_pred', 'classes'}} with label-encoded arrays.
+    Returns {name: {'test_rows', 'accuracy', 'macro_f1', 'recall': {class: ...}}}, each metric
+    with its point estimate on the test set and its interval.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    shards, tasks = [], []
+    for i, (name, t) in enumerate(targets.items()):
+        for shard, start in enumerate(range(0, n_resamples, SHARD_RESAMPLES)):
+            shards.append(name)
+            tasks.append((np.asarray(t['y_true']), np.asarray(t['y_pred']), len(t['classes']),
+                          min(SHARD_RESAMPLES, n_resamples - start), shard_seed(seed, i, shard)))
+    if n_jobs == 1:
+        outputs = [resample_shard(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            outputs = list(pool.map(resample_shard, *zip(*tasks)))
+    
+    results = {}
+    for name, t in targets.items():
+        parts = [out for shard_name, out in zip(shards, outputs) if shard_name == name]
+        samples = {metric: np.concatenate([part[metric] for part in parts]) for metric in parts[0]}
+        n_classes = len(t['classes'])
+        point = matrix_metrics(confusion_matrices(np.asarray(t['y_true']), np.asarray(t['y_pred']), n_classes,
+                                                  np.arange(len(t['y_true']))[None, :]))
+        results[name] = {'test_rows': len(t['y_true'])}
+        for metric in ['accuracy', 'macro_f1']:
+            results[name][metric] = {'estimate': round(float(point[metric][0]), 4),
+                                     **interval(samples[metric], confidence)}
+        results[name]['recall'] = {}
+        for k, cls in enumerate(t['classes']):
+            estimate = point['recall'][0, k]
+            results[name]['recall'][str(cls)] = {'estimate': None if np.isnan(estimate) else round(float(estimate), 4),
+                                                 **interval(samples['recall'][:, k], confidence)}
+    return results
+
+
+def format_results(results, n_resamples, confidence=CONFIDENCE):
+    """Text table of every metric with its interval"""
+    lines = [f"Bootstrap {confidence:.0%} intervals ({n_resamples:,} resamples of each test set)"]
+    for name, result in results.items():
+        lines.append(f"\n{name} (test rows: {result['test_rows']:,})")
+        metrics = [('Accuracy', result['accuracy']), ('Macro-F1', result['macro_f1'])]
+        metrics += [(f'Recall {cls}', m) for cls, m in result['recall'].items()]
+        for label, m in metrics:
+            if m['low'] is None:
+                lines.append(f"  {label:<18} n/a (class absent from the test set)")
+            else:
+                lines.append(f"  {label:<18} {m['estimate']:.4f}  [{m['low']:.4f}, {m['high']:.4f}]  "
+                             f"± {m['std_error']:.4f} SE")
+    return '\n'.join(lines)
+
+
+def save_results(results, n_resamples, confidence=CONFIDENCE):
+    """Write the intervals as JSON and as the text table (no timings, so reruns reproduce the files)"""
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    with open(RESULTS_PATH, 'w') as f:
+        json.dump({'resamples': n_resamples, 'confidence': confidence, 'models': results}, f, indent=2)
+    with open(REPORT_PATH, 'w') as f:
+        f.write(format_results(results, n_resamples, confidence) + '\n')
+
+
+def run(n_resamples=N_RESAMPLES, n_jobs=None, seed=42, confidence=CONFIDENCE):
+    """Re-evaluate the saved models on their test split with bootstrap intervals"""
+    
+    print("\n" + "="*60)
+    print("BOOTSTRAP MODEL EVALUATION")
+    print("="*60)
+    
+    # Imported here: 4_classification_models itself imports this module for its [4.3] step
+    classification = importlib.import_module('src.4_classification_models')
+    
+    print("\n[B.1] Loading clustered data and saved models...")
+    df = pd.read_csv('outputs/clustered_data.csv')
+    X = classification.build_feature_matrix(df)
+    label_classes = classification.load_label_classes()
+    targets = {}
+    for target_col, model_name in classification.TARGETS:
+        classes = label_classes.get(target_col) or sorted(str(c) for c in df[target_col].unique())
+        y = pd.Categorical(df[target_col].astype(str), categories=classes).codes.astype(np.int64)
+        _, test_idx = classification.split_indices(y)
+        model = joblib.load(classification.model_path(model_name))
+        targets[model_name] = {'y_true': y[test_idx], 'y_pred': model.predict(X.iloc[test_idx]).astype(np.int64),
+                               'classes': classes}
+    print(f"  ✓ {len(targets)} models, {len(test_idx):,} test rows each")
+    
+    print(f"\n[B.2] Resampling {n_resamples:,} times per model...")
+    start = time.perf_counter()
+    results = bootstrap_targets(targets, n_resamples=n_resamples, n_jobs=n_jobs, seed=seed, confidence=confidence)
+    seconds = time.perf_counter() - start
+    print(f"  ✓ {n_resamples * len(targets):,} resamples in {seconds:.2f}s")
+    
+    print("\n[B.3] Confidence intervals:")
+    print(format_results(results, n_resamples, confidence))
+    save_results(results, n_resamples, confidence)
+    print(f"\n✓ Results saved to: {RESULTS_PATH}")
+    
+    print("\n" + "="*60)
+    print("✓ BOOTSTRAP EVALUATION COMPLETE")
+    print("="*60)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bootstrap confidence intervals for the saved classification models')
+    parser.add_argument('--resamples', type=int, default=N_RESAMPLES, help=f'resamples per model (default: {N_RESAMPLES})')
+    parser.add_argument('--n-jobs', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--confidence', type=float, default=CONFIDENCE, help='interval level (default: 0.95)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed (same seed, same intervals)')
+    args = parser.parse_args()
+    
+    run(n_resamples=args.resamples, n_jobs=args.n_jobs, seed=args.seed, confidence=args.confidence)
@@ -0,0 +1,141 @@
+"""
+Offline Bulk Assessment (score raw survey CSVs across cores)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import instruments
+
+BLOCK_BYTES = 8 * 1024 * 1024
+
+
+def read_blocks(path, block_bytes=BLOCK_BYTES):
+    """Header line, then raw text blocks that always end on a row boundary"""
+    with open(path, newline='') as f:
+        header = f.readline()
+        yield header
+        while True:
+            block = f.read(block_bytes)
+            if not block:
+                break
+            # Finish the partial last row so every block parses on its own
+            yield block + f.readline()
+
+
+def output_columns(keep):
+    """Columns of the scored output file"""
+    cols = list(keep)
+    for key in instruments.INSTRUMENTS:
+        cols += [f'{key}_total', f'{key}_level']
+    return cols + ['crisis']
+
+
+def score_block(text, names, keep):
+    """Worker: parse one block, score every instrument, render the output rows as CSV"""
+    usecols = list(keep) + [col for key in instruments.INSTRUMENTS for col in instruments.columns(key)]
+    df = pd.read_csv(io.StringIO(text), header=None, names=names, usecols=usecols)
+    out = {col: df[col].to_numpy() for col in keep}
+    counts = {}
+    crisis = np.zeros(len(df), dtype=bool)
+    for key in instruments.INSTRUMENTS:
+        answers = df[instruments.columns(key)].to_numpy(dtype=np.float64)
+        # Rows with a missing, out-of-range or fractional answer are left unscored for that instrument
+        valid = np.isfinite(answers).all(axis=1) & (answers >= instruments.SCALE_MIN).all(axis=1) \
+            & (answers <= instruments.SCALE_MAX).all(axis=1) & (answers == np.round(answers)).all(axis=1)
+        result = instruments.score(key, answers[valid].astype(np.int64))
+        total = pd.array(np.zeros(len(df), dtype=np.int64), dtype='Int64')
+        total[valid] = result['total']
+        total[~valid] = pd.NA
+        level = np.full(len(df), 'Invalid', dtype=object)
+        level[valid] = result['level']
+        crisis[valid] |= result['crisis']
+        out[f'{key}_total'] = total
+        out[f'{key}_level'] = level
+        counts[key] = pd.Series(level).value_counts().to_dict()
+    out['crisis'] = crisis
+    body = pd.DataFrame(out).to_csv(index=False, header=False)
+    return len(df), body, counts, int(crisis.sum())
+
+
+def run(input_path, output_path, keep=(), n_jobs=None, block_bytes=BLOCK_BYTES):
+    """Score every row of a raw survey CSV and write totals, levels and crisis flags"""
+    
+    print("\n" + "="*60)
+    print("BULK ASSESSMENT")
+    print("="*60)
+    
+    start = time.perf_counter()
+    blocks = read_blocks(input_path, block_bytes)
+    names = next(csv.reader([next(blocks)]))
+    required = list(keep) + [col for key in instruments.INSTRUMENTS for col in instruments.columns(key)]
+    missing = [col for col in required if col not in names]
+    if missing:
+        raise ValueError(f"{input_path} is missing {len(missing)} required columns, e.g. {missing[0]!r}")
+    print(f"\n[A.1] Mapped {len(required) - len(keep)} question columns to "
+          f"{len(instruments.INSTRUMENTS)} instruments")
+    
+    n_jobs = n_jobs or os.cpu_count()
+    n_rows = 0
+    n_crisis = 0
+    levels = {key: {} for key in instruments.INSTRUMENTS}
+    
+    def collect(future, out):
+        nonlocal n_rows, n_crisis
+        rows, body, counts, crisis = future.result()
+        out.write(body)
+        n_rows += rows
+        n_crisis += crisis
+        for key, level_counts in counts.items():
+            for level, n in level_counts.items():
+                levels[key][level] = levels[key].get(level, 0) + n
+    
+    # Bounded window of in-flight blocks, written back in input order
+    print(f"\n[A.2] Scoring {input_path} with {n_jobs} workers...")
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool, open(output_path, 'w', newline='') as out:
+        out.write(','.join(output_columns(keep)) + '\n')
+        pending = deque()
+        for block in blocks:
+            pending.append(pool.submit(score_block, block, names, list(keep)))
+            if len(pending) >= 2 * n_jobs:
+                collect(pending.popleft(), out)
+        while pending:
+            collect(pending.popleft(), out)
+    
+    seconds = time.perf_counter() - start
+    print(f"  ✓ Scored {n_rows:,} rows in {seconds:.2f}s ({n_rows / seconds * 60:,.0f} rows/min)")
+    print(f"  ✓ Saved to: {output_path}")
+    
+    print("\n[A.3] Level distribution:")
+    for key, level_counts in levels.items():
+        print(f"  {instruments.INSTRUMENTS[key]['name']:<11} {dict(sorted(level_counts.items()))}")
+    print(f"  Crisis flags: {n_crisis:,}")
+    
+    print("\n" + "="*60)
+    print("✓ BULK ASSESSMENT COMPLETE")
+    print("="*60)
+    
+    return {'rows': n_rows, 'seconds': seconds, 'levels': levels, 'crisis': n_crisis}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Score raw survey CSVs offline across cores')
+    parser.add_argument('input', help='raw survey CSV with the 26 question columns')
+    parser.add_argument('output', help='output CSV: totals, levels and crisis flag per row')
+    parser.add_argument('--keep', nargs='+', default=[], metavar='COLUMN',
+                        help='input columns copied to the output (e.g. an ID column)')
+    parser.add_argument('--n-jobs', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--block-mb', type=float, default=BLOCK_BYTES / 1024**2,
+                        help='input read per task in MB (bounds memory; default: 8)')
+    args = parser.parse_args()
+    
+    run(args.input, args.output, keep=args.keep, n_jobs=args.n_jobs, block_bytes=int(args.block_mb * 1024**2))
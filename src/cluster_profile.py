@@ -0,0 +1,78 @@
+"""
+Cluster Profiling (single grouped pass, persisted profile artifact)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import os
+
+PROFILE_PATH = 'outputs/results/cluster_profile.json'
+PROFILE_VERSION = 1
+MEAN_COLS = ['Age', 'Current CGPA', 'Academic Year', 'Anxiety Value', 'Stress Value', 'Depression Value']
+SHARE_COLS = {'male': ('Gender', 0), 'scholarship': ('Scholarship', 1)}
+LABEL_COLS = ['Anxiety Label', 'Stress Label', 'Depression Label']
+
+
+def build_cluster_profile(df, cluster_col='Cluster', n_clusters=None):
+    """Per-cluster sizes, means, shares and label distributions from one grouped aggregation"""
+    codes = df[cluster_col].to_numpy()
+    k = n_clusters or int(codes.max()) + 1
+    sizes = np.bincount(codes, minlength=k)
+    
+    # One weighted bincount per column over the same cluster codes
+    sums = np.stack([np.bincount(codes, weights=df[col].to_numpy(dtype=np.float64), minlength=k)
+                     for col in MEAN_COLS], axis=1)
+    hits = np.stack([np.bincount(codes, weights=(df[col].to_numpy() == value), minlength=k)
+                     for col, value in SHARE_COLS.values()], axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / sizes[:, None]
+        shares = hits / sizes[:, None]
+    
+    # Label counts: bincount over the joint (cluster, label) code
+    label_counts = {}
+    for col in LABEL_COLS:
+        label_codes, labels = pd.factorize(df[col], sort=True)
+        counts = np.bincount(codes * len(labels) + label_codes, minlength=k * len(labels)).reshape(k, len(labels))
+        label_counts[col] = (list(labels), counts)
+    
+    clusters = []
+    for c in range(k):
+        clusters.append({
+            'cluster': c,
+            'size': int(sizes[c]),
+            'fraction': float(sizes[c] / len(codes)),
+            'means': {col: _json_float(means[c, i]) for i, col in enumerate(MEAN_COLS)},
+            'shares': {name: _json_float(shares[c, i]) for i, name in enumerate(SHARE_COLS)},
+            'labels': {col: {label: int(n) for label, n in zip(labels, counts[c])}
+                       for col, (labels, counts) in label_counts.items()}
+        })
+    return {'version': PROFILE_VERSION, 'n_rows': int(len(codes)), 'n_clusters': k, 'clusters': clusters}
+
+
+def _json_float(value):
+    """float for JSON, with NaN (empty cluster) as None"""
+    return None if np.isnan(value) else float(value)
+
+
+def save_cluster_profile(profile, path=PROFILE_PATH):
+    """Persist the profile as JSON"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(profile, f, indent=2)
+
+
+def load_cluster_profile(path=PROFILE_PATH):
+    """Load a persisted profile (None if the clustering stage has not been run)"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def profile_means(profile, columns=MEAN_COLS):
+    """Cluster × feature table of means (index: Cluster)"""
+    frame = pd.DataFrame([{col: c['means'][col] for col in columns} for c in profile['clusters']],
+                         index=pd.Index([c['cluster'] for c in profile['clusters']], name='Cluster'))
+    return frame.astype(float)
@@ -0,0 +1,138 @@
+"""
+Cluster Quality Metrics (exact, sampled and O(n·k) approximations)
+Author: Sakhi Patel
+"""
+
+import numpy as np
+from scipy import stats
+from sklearn.metrics import silhouette_score, davies_bouldin_score, calinski_harabasz_score
+import argparse
+import os
+import time
+import tracemalloc
+
+# Exact silhouette is O(n²); above this many rows it is estimated from samples
+EXACT_SILHOUETTE_MAX_ROWS = 10000
+SAMPLE_SIZE = 4000
+N_REPEATS = 5
+
+
+def stratified_sample(labels, sample_size, rng):
+    """Row indices of a sample that keeps each cluster's share of the data"""
+    labels = np.asarray(labels)
+    n = len(labels)
+    if sample_size >= n:
+        return np.arange(n)
+    idx = []
+    for cluster in np.unique(labels):
+        members = np.flatnonzero(labels == cluster)
+        take = min(len(members), max(1, int(round(sample_size * len(members) / n))))
+        idx.append(rng.choice(members, size=take, replace=False))
+    return np.concatenate(idx)
+
+
+def sampled_silhouette(X, labels, sample_size=SAMPLE_SIZE, n_repeats=N_REPEATS, confidence=0.95, seed=42):
+    """Silhouette estimated on repeated stratified samples, with a t-based confidence interval"""
+    rng = np.random.default_rng(seed)
+    labels = np.asarray(labels)
+    scores = np.array([
+        silhouette_score(X[idx], labels[idx])
+        for idx in (stratified_sample(labels, sample_size, rng) for _ in range(n_repeats))
+    ])
+    mean = float(scores.mean())
+    if n_repeats > 1:
+        half_width = float(stats.t.ppf((1 + confidence) / 2, n_repeats - 1) * scores.std(ddof=1) / np.sqrt(n_repeats))
+    else:
+        half_width = float('nan')
+    return {'value': mean, 'ci_low': mean - half_width, 'ci_high': mean + half_width,
+            'confidence': confidence, 'sample_size': min(sample_size, len(labels)), 'n_repeats': n_repeats}
+
+
+def inertia(X, labels, centers=None):
+    """Within-cluster sum of squared distances in O(n·k)"""
+    labels = np.asarray(labels)
+    if centers is None:
+        centers = np.array([X[labels == c].mean(axis=0) for c in np.unique(labels)])
+        labels = np.searchsorted(np.unique(labels), labels)
+    return float(((X - centers[labels]) ** 2).sum())
+
+
+def cluster_quality(X, labels, exact_max_rows=EXACT_SILHOUETTE_MAX_ROWS, centers=None, **sample_kwargs):
+    """Cluster quality report: silhouette (exact or sampled) plus Davies-Bouldin, Calinski-Harabasz and inertia"""
+    X = np.asarray(X)
+    labels = np.asarray(labels)
+    if len(labels) <= exact_max_rows:
+        silhouette = {'value': float(silhouette_score(X, labels)), 'method': 'exact'}
+    else:
+        silhouette = dict(sampled_silhouette(X, labels, **sample_kwargs), method='sampled')
+    return {
+        'n_rows': int(len(labels)),
+        'silhouette': silhouette,
+        'davies_bouldin': float(davies_bouldin_score(X, labels)),
+        'calinski_harabasz': float(calinski_harabasz_score(X, labels)),
+        'inertia': inertia(X, labels, centers)
+    }
+
+
+def format_silhouette(silhouette):
+    """One-line description of an exact or sampled silhouette"""
+    if silhouette['method'] == 'exact':
+        return f"{silhouette['value']:.4f} (exact)"
+    return (f"{silhouette['value']:.4f} "
+            f"[{silhouette['ci_low']:.4f}, {silhouette['ci_high']:.4f}] "
+            f"({silhouette['confidence']:.0%} CI, {silhouette['n_repeats']} × "
+            f"{silhouette['sample_size']}-row stratified samples)")
+
+
+def _measure(func, *args, **kwargs):
+    """Wall time and tracemalloc peak (MB) of one call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024**2
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def benchmark(row_counts=(1000, 10000, 100000, 1000000), exact_max_rows=EXACT_SILHOUETTE_MAX_ROWS):
+    """Runtime and memory of exact, sampled and O(n·k) metrics versus row count"""
+    from sklearn.datasets import make_blobs
+    
+    print("\n" + "="*60)
+    print("CLUSTER QUALITY BENCHMARK")
+    print("="*60)
+    
+    lines = [f"{'rows':>9} | {'metric':<22} | {'value':>10} | {'time (s)':>9} | {'peak MB':>8}"]
+    for n in row_counts:
+        X, labels = make_blobs(n_samples=n, n_features=5, centers=4, random_state=42)
+        runs = [('davies_bouldin', davies_bouldin_score, (X, labels)),
+                ('calinski_harabasz', calinski_harabasz_score, (X, labels)),
+                ('inertia', inertia, (X, labels)),
+                ('silhouette (sampled)', lambda *a: sampled_silhouette(*a)['value'], (X, labels))]
+        # Exact silhouette only where it is still affordable
+        if n <= exact_max_rows:
+            runs.append(('silhouette (exact)', silhouette_score, (X, labels)))
+        for name, func, args in runs:
+            value, seconds, peak = _measure(func, *args)
+            line = f"{n:>9} | {name:<22} | {value:>10.4f} | {seconds:>9.3f} | {peak:>8.1f}"
+            print(f"  {line}")
+            lines.append(line)
+    
+    os.makedirs('outputs/results', exist_ok=True)
+    with open('outputs/results/cluster_quality_benchmark.txt', 'w') as f:
+        f.write("="*60 + "\n")
+        f.write("CLUSTER QUALITY METRICS - RUNTIME AND MEMORY VS ROWS\n")
+        f.write("="*60 + "\n\n")
+        f.write("\n".join(lines) + "\n")
+    print("\n✓ Saved to: outputs/results/cluster_quality_benchmark.txt")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark cluster quality metrics')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000, 1000000],
+                        help='row counts to benchmark')
+    parser.add_argument('--exact-max-rows', type=int, default=EXACT_SILHOUETTE_MAX_ROWS,
+                        help='largest row count for the exact O(n²) silhouette')
+    args = parser.parse_args()
+    benchmark(args.rows, args.exact_max_rows)
@@ -0,0 +1,200 @@
+"""
+Distilled Low-Latency Model Tier (shallow trees fitted to the forests' soft labels)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+from sklearn.tree import DecisionTreeRegressor
+import argparse
+import importlib
+import joblib
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.explanations import build_explainer, explain_rows, class_names
+
+classification = importlib.import_module('src.4_classification_models')
+
+DISTILLED_PATH = 'outputs/models/distilled_models.pkl'
+RESULTS_PATH = 'outputs/results/distillation_report.json'   # fidelity only, reproducible across machines
+REPORT_PATH = 'outputs/results/distillation_report.txt'     # fidelity and this machine's latency
+STUDENT_PARAMS = {'max_depth': 6, 'min_samples_leaf': 5}
+THRESHOLDS = [0.5, 0.6, 0.7, 0.8, 0.9, 0.95]
+TARGET_AGREEMENT = 0.98     # escalation threshold: lowest one whose tiered answers match the forest this often
+LATENCY_REPEATS = 200
+LATENCY_BATCH = 1000
+
+
+def fit_student(X, soft_labels, params=None):
+    """Shallow multi-output regression tree on the forest's class probabilities"""
+    return DecisionTreeRegressor(**(params or STUDENT_PARAMS), random_state=42).fit(X, soft_labels)
+
+
+def tiered(fast, full, threshold):
+    """Fast-tier answers with rows below the confidence threshold escalated to the forest
+    
+    fast, full: class probabilities (rows, classes). Returns (probabilities, escalated mask).
+    """
+    escalated = fast.max(axis=1) < threshold
+    return np.where(escalated[:, None], full, fast), escalated
+
+
+def choose_threshold(fast, full, target=TARGET_AGREEMENT):
+    """Lowest candidate threshold whose tiered predictions agree with the forest at least target of the time"""
+    for threshold in THRESHOLDS:
+        probabilities, _ = tiered(fast, full, threshold)
+        if (probabilities.argmax(axis=1) == full.argmax(axis=1)).mean() >= target:
+            return threshold
+    return 1.0  # always escalate
+
+
+def latency_us(explainer, rows, repeats=LATENCY_REPEATS):
+    """Median microseconds to score (and explain) a batch of rows"""
+    explain_rows(explainer, rows)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        explain_rows(explainer, rows)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times) * 1e6)
+
+
+def latencies(fast_explainer, full_explainer, X, escalated_rate):
+    """Single-row and batch latency of each tier; the tiered cost adds the forest for the escalated share"""
+    batch = X[np.arange(LATENCY_BATCH) % len(X)]
+    result = {}
+    for key, rows, repeats in [('row_us', X[:1], LATENCY_REPEATS), ('batch_us', batch, LATENCY_REPEATS // 20)]:
+        fast, full = latency_us(fast_explainer, rows, repeats), latency_us(full_explainer, rows, repeats)
+        result[key] = {'fast': round(fast, 1), 'full': round(full, 1),
+                       'tiered': round(fast + escalated_rate * full, 1)}
+    return result
+
+
+def distill_target(X, y, forest, classes, params=None):
+    """Fit one student on the training split and measure both tiers on the held-out split
+    
+    The escalation threshold is chosen on a validation slice of the training split that the
+    student does not see, so the fidelity reported on the held-out split is out-of-sample.
+    """
+    train_idx, test_idx = classification.split_indices(y)
+    fit_pos, val_pos = classification.split_indices(y[train_idx])
+    fit_idx, val_idx = train_idx[fit_pos], train_idx[val_pos]
+    forest_explainer = build_explainer(forest, classes)
+    full, _, _ = explain_rows(forest_explainer, X)
+    
+    student = fit_student(X[fit_idx], full[fit_idx], params)
+    student_explainer = build_explainer(student, classes)
+    threshold = choose_threshold(explain_rows(student_explainer, X[val_idx])[0], full[val_idx])
+    
+    fast, _, _ = explain_rows(student_explainer, X[test_idx])
+    full, y_test = full[test_idx], y[test_idx]
+    sweep = []
+    for t in THRESHOLDS:
+        probabilities, escalated = tiered(fast, full, t)
+        sweep.append({'threshold': t, 'escalated': round(float(escalated.mean()), 4),
+                      'agreement': round(float((probabilities.argmax(axis=1) == full.argmax(axis=1)).mean()), 4),
+                      'accuracy': round(float((probabilities.argmax(axis=1) == y_test).mean()), 4)})
+    _, escalated = tiered(fast, full, threshold)
+    
+    result = {
+        'classes': list(classes), 'validation_rows': len(val_idx), 'test_rows': len(test_idx),
+        'student': {'nodes': int(student.tree_.node_count), 'depth': int(student.get_depth()),
+                    'forest_nodes': int(len(forest_explainer['feature']))},
+        'agreement': round(float((fast.argmax(axis=1) == full.argmax(axis=1)).mean()), 4),
+        'mean_probability_gap': round(float(np.abs(fast - full).sum(axis=1).mean() / 2), 4),
+        'accuracy': {'forest': round(float((full.argmax(axis=1) == y_test).mean()), 4),
+                     'student': round(float((fast.argmax(axis=1) == y_test).mean()), 4)},
+        'threshold': threshold,
+        'escalated': round(float(escalated.mean()), 4),
+        'latency': latencies(student_explainer, forest_explainer, X, float(escalated.mean())),
+        'thresholds': sweep
+    }
+    return student, result
+
+
+def format_report(results):
+    """Text summary of fidelity, escalation and latency per target"""
+    lines = []
+    for name, r in results.items():
+        lines.append(f"\n{name} (student: {r['student']['nodes']} nodes, depth {r['student']['depth']}; "
+                     f"forest: {r['student']['forest_nodes']:,} nodes)")
+        lines.append(f"  Agreement with forest:  {r['agreement']:.2%}   mean probability gap {r['mean_probability_gap']:.4f}")
+        lines.append(f"  Accuracy:               forest {r['accuracy']['forest']:.4f}   "
+                     f"student {r['accuracy']['student']:.4f}   "
+                     f"(fidelity gap {r['accuracy']['forest'] - r['accuracy']['student']:+.4f})")
+        lines.append(f"  Escalation threshold:   {r['threshold']:.2f} (chosen on {r['validation_rows']} validation rows; "
+                     f"{r['escalated']:.1%} of test rows go to the forest)")
+        row, batch = r['latency']['row_us'], r['latency']['batch_us']
+        lines.append(f"  Latency, one row:       fast {row['fast']:.0f} µs   full {row['full']:.0f} µs   "
+                     f"tiered ~{row['tiered']:.0f} µs")
+        lines.append(f"  Latency, {LATENCY_BATCH} rows:     fast {batch['fast'] / 1000:.1f} ms   "
+                     f"full {batch['full'] / 1000:.1f} ms   tiered ~{batch['tiered'] / 1000:.1f} ms")
+        lines.append("  Threshold  escalated  agreement  accuracy")
+        for row in r['thresholds']:
+            lines.append(f"  {row['threshold']:>9.2f}  {row['escalated']:>9.1%}  {row['agreement']:>9.1%}  {row['accuracy']:>8.4f}")
+    return '\n'.join(lines)
+
+
+def load_distilled(path=DISTILLED_PATH):
+    """Saved students {target_col: {'model', 'classes', 'threshold'}} (None if distillation has not run)"""
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path)
+
+
+def run(params=None):
+    """Distil every saved forest into a shallow student and report fidelity, escalation and latency"""
+    
+    print("\n" + "="*60)
+    print("MODEL DISTILLATION (FAST TIER)")
+    print("="*60)
+    
+    print("\n[D.1] Loading clustered data and forests...")
+    df = pd.read_csv('outputs/clustered_data.csv')
+    X = classification.build_feature_matrix(df).to_numpy()
+    print(f"  ✓ Loaded {len(df)} records")
+    
+    print(f"\n[D.2] Fitting students on the forests' soft labels ({params or STUDENT_PARAMS})...")
+    students, results = {}, {}
+    for target_col, model_name in classification.TARGETS:
+        classes = class_names(target_col, df)
+        y = pd.Categorical(df[target_col].astype(str), categories=classes).codes.astype(np.int64)
+        forest = joblib.load(classification.model_path(model_name))
+        student, result = distill_target(X, y, forest, classes, params)
+        students[target_col] = {'model': student, 'classes': classes, 'threshold': result['threshold']}
+        results[model_name] = result
+        print(f"  ✓ {model_name}: {result['agreement']:.1%} agreement, threshold {result['threshold']:.2f}")
+    
+    print("\n[D.3] Fidelity and latency:")
+    report = format_report(results)
+    print(report)
+    
+    os.makedirs(os.path.dirname(DISTILLED_PATH), exist_ok=True)
+    joblib.dump(students, DISTILLED_PATH)
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    with open(RESULTS_PATH, 'w') as f:
+        json.dump({'params': params or STUDENT_PARAMS, 'target_agreement': TARGET_AGREEMENT,
+                   'models': {name: {k: v for k, v in r.items() if k != 'latency'} for name, r in results.items()}},
+                  f, indent=2)
+    with open(REPORT_PATH, 'w') as f:
+        f.write("="*60 + "\nDISTILLED FAST TIER - FIDELITY AND LATENCY\n" + "="*60 + "\n" + report + "\n")
+    print(f"\n✓ Students saved to: {DISTILLED_PATH}")
+    print(f"✓ Report saved to: {REPORT_PATH}")
+    
+    print("\n" + "="*60)
+    print("✓ DISTILLATION COMPLETE")
+    print("="*60)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Distil the forests into shallow trees for the API fast tier')
+    parser.add_argument('--max-depth', type=int, default=STUDENT_PARAMS['max_depth'], help='student tree depth')
+    parser.add_argument('--min-samples-leaf', type=int, default=STUDENT_PARAMS['min_samples_leaf'],
+                        help='smallest student leaf')
+    args = parser.parse_args()
+    
+    run(params={'max_depth': args.max_depth, 'min_samples_leaf': args.min_samples_leaf})
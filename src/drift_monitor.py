@@ -0,0 +1,168 @@
+"""
+Streaming Feature-Drift Monitor (fixed-bin histograms, PSI and binned KS against the training data)
+Author: Sakhi Patel
+"""
+
+import numpy as np
+import collections
+import itertools
+import json
+import os
+import threading
+import time
+
+REFERENCE_PATH = 'outputs/models/drift_reference.json'
+REFERENCE_VERSION = 1
+N_SLOTS = 16                 # per-worker counter slots; threads are spread round-robin over them
+QUANTILE_BINS = 10           # continuous features: decile bins of the training data
+MAX_CATEGORIES = 12          # features with at most this many values get one bin per value
+SNAPSHOT_SECONDS = 60        # how often totals are snapshotted and the report recomputed
+WINDOW_SNAPSHOTS = 60        # recent window = last 60 snapshots (one hour)
+MIN_OBSERVATIONS = 100       # below this, drift statistics are reported but not judged
+PSI_BANDS = [(0.1, 'stable'), (0.25, 'moderate'), (np.inf, 'significant')]
+KS_ALPHA_COEFFICIENT = 1.358  # two-sample KS critical value coefficient at alpha = 0.05
+FEATURE_SPACING = 1e6        # features are laid end to end on one axis, this far apart (values clipped to fit)
+
+
+def bin_edges(values):
+    """Inner bin edges for one feature: one bin per value for coded features, deciles otherwise"""
+    values = np.asarray(values, dtype=np.float64)
+    distinct = np.unique(values)
+    if len(distinct) <= MAX_CATEGORIES:
+        return (distinct[:-1] + distinct[1:]) / 2, 'categorical'
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, QUANTILE_BINS + 1)[1:-1]))
+    return edges, 'continuous'
+
+
+def build_reference(X):
+    """Reference histograms of the training feature matrix (DataFrame); values outside the edges go to the end bins"""
+    features = {}
+    for col in X.columns:
+        values = X[col].to_numpy(dtype=np.float64)
+        edges, kind = bin_edges(values)
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        features[col] = {'kind': kind, 'edges': edges.tolist(), 'counts': counts.tolist()}
+    return {'version': REFERENCE_VERSION, 'rows': len(X), 'features': features}
+
+
+def save_reference(reference, path=REFERENCE_PATH):
+    """Persist the reference histograms next to the models"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(reference, f, indent=2)
+
+
+def load_reference(path=REFERENCE_PATH):
+    """Load the reference histograms (None if 4_classification_models has not saved them)"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        reference = json.load(f)
+    return reference if reference.get('version') == REFERENCE_VERSION else None
+
+
+def create_monitor(reference, slots=N_SLOTS, snapshot_seconds=SNAPSHOT_SECONDS, window_snapshots=WINDOW_SNAPSHOTS):
+    """Counters for live traffic plus a background thread that snapshots them and refreshes the report
+    
+    Memory is fixed at slots x features x bins counters plus window_snapshots totals,
+    whatever the traffic.
+    """
+    columns = list(reference['features'])
+    edges = [np.array(reference['features'][col]['edges']) for col in columns]
+    # One sorted edge array for all features: feature j's values and edges are shifted by j * FEATURE_SPACING,
+    # so a single searchsorted bins a whole row, and position + j is the flat (feature, bin) counter
+    offsets = np.arange(len(columns)) * FEATURE_SPACING
+    n_bins = [len(e) + 1 for e in edges]
+    monitor = {
+        'reference': reference, 'columns': columns, 'offsets': offsets,
+        'edges': np.concatenate([e + offset for e, offset in zip(edges, offsets)]),
+        'starts': np.concatenate([[0], np.cumsum(n_bins)]),
+        'counts': np.zeros((slots, sum(n_bins)), dtype=np.int64),
+        'local': threading.local(), 'next_slot': itertools.count(),
+        'started': time.time(), 'snapshot_seconds': snapshot_seconds,
+        'snapshots': collections.deque(maxlen=window_snapshots), 'report': None
+    }
+    monitor['snapshots'].append((time.time(), totals(monitor)))
+    threading.Thread(target=_snapshot_loop, args=(monitor,), name='drift-monitor', daemon=True).start()
+    return monitor
+
+
+def observe(monitor, X):
+    """Count a batch of feature rows (columns in reference order) into this thread's slot, without locking
+    
+    Each thread keeps to one slot, so increments only race if more than N_SLOTS requests
+    run at once; a lost increment then only nudges a histogram.
+    """
+    local = monitor['local']
+    if not hasattr(local, 'counts'):
+        local.counts = monitor['counts'][next(monitor['next_slot']) % len(monitor['counts'])]
+    shifted = np.clip(np.asarray(X, dtype=np.float64), -0.4 * FEATURE_SPACING, 0.4 * FEATURE_SPACING)
+    cells = np.searchsorted(monitor['edges'], shifted + monitor['offsets'], side='right')
+    cells += np.arange(len(monitor['offsets']))
+    local.counts += np.bincount(cells.ravel(), minlength=len(local.counts))
+
+
+def totals(monitor):
+    """Counts summed over every slot, one array of bins per feature"""
+    flat, starts = monitor['counts'].sum(axis=0), monitor['starts']
+    return [flat[starts[j]:starts[j + 1]] for j in range(len(starts) - 1)]
+
+
+def psi(expected, actual, floor=1e-4):
+    """Population stability index between two histograms (proportions floored to avoid log(0))"""
+    p = np.maximum(expected / max(expected.sum(), 1), floor)
+    q = np.maximum(actual / max(actual.sum(), 1), floor)
+    return float(((q - p) * np.log(q / p)).sum())
+
+
+def binned_ks(expected, actual):
+    """Largest gap between the two cumulative distributions at the bin edges (a lower bound on KS)"""
+    return float(np.abs(np.cumsum(expected) / max(expected.sum(), 1) - np.cumsum(actual) / max(actual.sum(), 1)).max())
+
+
+def compare(reference, columns, counts):
+    """PSI, binned KS and a verdict for every feature of a traffic histogram"""
+    n = int(counts[0].sum())
+    features = {}
+    for j, col in enumerate(columns):
+        expected = np.array(reference['features'][col]['counts'], dtype=np.float64)
+        actual = counts[j].astype(np.float64)
+        value_psi, ks = psi(expected, actual), binned_ks(expected, actual)
+        critical = KS_ALPHA_COEFFICIENT * np.sqrt((reference['rows'] + n) / (reference['rows'] * n)) if n else None
+        status = 'insufficient data' if n < MIN_OBSERVATIONS else next(label for bound, label in PSI_BANDS
+                                                                          if value_psi < bound)
+        features[col] = {
+            'psi': round(value_psi, 4), 'ks': round(ks, 4),
+            'ks_critical': None if critical is None else round(float(critical), 4),
+            'ks_exceeded': bool(critical is not None and n >= MIN_OBSERVATIONS and ks > critical),
+            'status': status,
+            'reference': (expected / expected.sum()).round(4).tolist(),
+            'observed': (actual / n).round(4).tolist() if n else None
+        }
+    return {'observations': n, 'features': features}
+
+
+def drift_report(monitor):
+    """Compare the recent window and all traffic since start-up against the reference"""
+    now, current = time.time(), totals(monitor)
+    since, oldest = monitor['snapshots'][0]
+    report = {
+        'computed_at': now,
+        'reference_rows': monitor['reference']['rows'],
+        'window': {'seconds': round(now - since, 1), **compare(monitor['reference'], monitor['columns'],
+                                                                [c - o for c, o in zip(current, oldest)])},
+        'all': {'seconds': round(now - monitor['started'], 1), **compare(monitor['reference'], monitor['columns'],
+                                                                          current)}
+    }
+    statuses = [f['status'] for f in report['window']['features'].values()]
+    ranks = ['insufficient data'] + [label for _, label in PSI_BANDS]
+    report['status'] = max(statuses, key=ranks.index)
+    return report
+
+
+def _snapshot_loop(monitor):
+    """Every snapshot_seconds: record totals (the sliding window's start points) and refresh the report"""
+    while True:
+        time.sleep(monitor['snapshot_seconds'])
+        monitor['snapshots'].append((time.time(), totals(monitor)))
+        monitor['report'] = drift_report(monitor)
@@ -0,0 +1,339 @@
+"""
+EDA Aggregate Store (every exploratory statistic in one grouped pass, saved as versioned JSON + NumPy)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import io
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.stats_cube import pool_moments, plain_value
+from src.response_ingest import source_fingerprint
+from src import streaming_stats
+from src import instruments
+
+AGGREGATES_JSON = 'outputs/results/eda_aggregates.json'
+AGGREGATES_NPZ = 'outputs/results/eda_aggregates.npz'
+AGGREGATES_VERSION = 1
+SOURCE_PATH = 'outputs/cleaned_data.csv'
+
+SCORES = ['Anxiety Value', 'Stress Value', 'Depression Value']
+METRICS = ['Current CGPA'] + SCORES
+GROUPS = ['Gender', 'Academic Year', 'Scholarship']
+CATEGORICAL = ['Gender', 'University', 'Department', 'Academic Year', 'Scholarship',
+               'Anxiety Label', 'Stress Label', 'Depression Label']
+HISTOGRAM_BINS = {'Current CGPA': 30, 'Age': 15, 'Anxiety Value': 30, 'Stress Value': 30, 'Depression Value': 30}
+CGPA_BINS = [0, 2.5, 3.0, 3.5, 4.0]
+CGPA_RANGES = ['<2.5', '2.5-3.0', '3.0-3.5', '3.5-4.0']
+VIOLIN_GRID = 100            # density points per violin (seaborn's gridsize)
+VIOLIN_CUT = 2               # density extends this many bandwidths past the data (seaborn's cut)
+SCATTER_POINTS = 5000        # scatter plots draw at most this many rows (chosen by row hash beyond)
+CHUNK_BYTES = 64 << 20       # chunked mode: CSV bytes parsed per task
+CHUNKED_ABOVE_BYTES = 256 << 20  # larger inputs are processed in chunks automatically
+SECTIONS = ['counts', 'histograms', 'correlation', 'groups', 'cgpa_ranges', 'boxplots', 'violins']
+COLUMNS = sorted(set(METRICS) | set(GROUPS) | set(CATEGORICAL) | set(HISTOGRAM_BINS))
+
+
+def ordered_counts(counts, order=None):
+    """Value counts as parallel lists: in the given order (unseen values kept at 0), else most frequent first"""
+    if order is not None:
+        names = list(order) + sorted(set(counts) - set(order), key=str)
+        return {'values': names, 'counts': [counts.get(v, 0) for v in names]}
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return {'values': [v for v, _ in ranked], 'counts': [c for _, c in ranked]}
+
+
+def box_stats(s):
+    """Quartiles, 1.5 IQR whiskers and the distinct outliers of one group's sketch (what a box plot draws)"""
+    q1, median, q3 = streaming_stats.quantiles(s, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = (s['points'] >= q1 - 1.5 * iqr) & (s['points'] <= q3 + 1.5 * iqr)
+    return {'count': s['n'], 'mean': streaming_stats.mean_std(s)[0], 'q1': float(q1), 'median': float(median),
+            'q3': float(q3), 'whislo': float(s['points'][inside].min()), 'whishi': float(s['points'][inside].max()),
+            'fliers': s['points'][~inside].tolist()}
+
+
+def kde(s):
+    """Gaussian kernel density with Scott's bandwidth on a grid cut bandwidths past the data (seaborn's defaults)
+    
+    Each distinct value is smoothed once with its count as the weight, so the cost follows the
+    number of distinct values, not rows.
+    """
+    n = s['n']
+    bandwidth = streaming_stats.mean_std(s)[1] * n ** (-1 / 5)
+    if not bandwidth > 0:
+        return {'grid': [s['min']], 'density': [1.0], 'bandwidth': 0.0}
+    grid = np.linspace(s['min'] - VIOLIN_CUT * bandwidth, s['max'] + VIOLIN_CUT * bandwidth, VIOLIN_GRID)
+    z = (grid[:, None] - s['points'][None, :]) / bandwidth
+    density = np.exp(-0.5 * z ** 2) @ s['counts'] / (n * bandwidth * np.sqrt(2 * np.pi))
+    return {'grid': grid.tolist(), 'density': density.tolist(), 'bandwidth': float(bandwidth)}
+
+
+def group_sketches(codes, values):
+    """Sketch of values for every group code present (code -1 is skipped)"""
+    return {plain_value(code): streaming_stats.sketch(values[codes == code]) for code in np.unique(codes) if code >= 0}
+
+
+def accumulate(df, chunk=0):
+    """Mergeable accumulators of one chunk of cleaned rows (chunk orders the chunks in the file)"""
+    metrics = df[METRICS].to_numpy(dtype=np.float64)
+    cgpa_range = pd.cut(df['Current CGPA'], bins=CGPA_BINS, labels=CGPA_RANGES).cat.codes.to_numpy().astype(np.int64)
+    # Grouped moments per (gender, year, scholarship, CGPA range) cell; out-of-range CGPA gets its own code
+    keys = np.column_stack([df[col].to_numpy() for col in GROUPS] +
+                           [np.where(cgpa_range < 0, len(CGPA_RANGES), cgpa_range)])
+    gender = df['Gender'].to_numpy()
+    return {
+        'chunks': {chunk: len(df)},
+        'cells': streaming_stats.group_moments(keys, metrics),
+        'counts': {col: streaming_stats.value_counts(df[col]) for col in CATEGORICAL if col not in GROUPS},
+        'columns': {col: streaming_stats.sketch(df[col]) for col in HISTOGRAM_BINS},
+        'boxplots': {col: group_sketches(cgpa_range, metrics[:, METRICS.index(col)]) for col in SCORES},
+        'violins': {col: group_sketches(gender, metrics[:, METRICS.index(col)]) for col in SCORES},
+        'scatter': streaming_stats.row_sample(df[METRICS], chunk, SCATTER_POINTS)
+    }
+
+
+def merge_states(a, b):
+    """Combine the accumulators of two chunks (or of two merged runs of chunks)"""
+    if a is None or b is None:
+        return b if a is None else a
+    
+    def merge_dicts(x, y, merge):
+        return {key: merge(x.get(key), y.get(key)) for key in {**x, **y}}
+    
+    return {
+        'chunks': {**a['chunks'], **b['chunks']},
+        'cells': streaming_stats.merge_group_moments(a['cells'], b['cells']),
+        'counts': merge_dicts(a['counts'], b['counts'], streaming_stats.merge_value_counts),
+        'columns': merge_dicts(a['columns'], b['columns'], streaming_stats.merge_sketches),
+        'boxplots': {col: merge_dicts(a['boxplots'][col], b['boxplots'][col], streaming_stats.merge_sketches)
+                     for col in SCORES},
+        'violins': {col: merge_dicts(a['violins'][col], b['violins'][col], streaming_stats.merge_sketches)
+                    for col in SCORES},
+        'scatter': streaming_stats.merge_row_samples(a['scatter'], b['scatter'], SCATTER_POINTS)
+    }
+
+
+def finalize(state):
+    """The JSON store and its arrays from merged accumulators
+    
+    Returns (aggregates, arrays): a JSON-ready dict and the NumPy arrays saved next to it
+    (per-cell moments, and the rows sampled for the scatter plots).
+    """
+    n = sum(state['chunks'].values())
+    
+    # Dense (gender, year, scholarship, CGPA range) cube from the grouped moments. Group means,
+    # value counts of the grouping columns and the correlation matrix are all merged from it
+    cells = state['cells']
+    categories = [np.unique(cells['keys'][:, axis]) for axis in range(len(GROUPS))]
+    categories.append(np.arange(len(CGPA_RANGES) + 1))
+    shape = tuple(len(c) for c in categories)
+    index = np.ravel_multi_index([np.searchsorted(c, cells['keys'][:, axis]) for axis, c in enumerate(categories)],
+                                 shape)
+    count = np.zeros(int(np.prod(shape)), dtype=np.int64)
+    mean = np.zeros((count.size, len(METRICS)))
+    comoment = np.zeros((count.size, len(METRICS), len(METRICS)))
+    count[index], mean[index], comoment[index] = cells['count'], cells['mean'], cells['comoment']
+    count = count.reshape(shape)
+    mean = mean.reshape(shape + (len(METRICS),))
+    comoment = comoment.reshape(shape + (len(METRICS), len(METRICS)))
+    categories = [[plain_value(v) for v in c] for c in categories[:-1]] + [CGPA_RANGES + [None]]
+    
+    def pooled(axis, index):
+        """Moments of every cell whose code on one axis is index"""
+        take = lambda a: np.take(a, index, axis=axis)
+        return pool_moments(take(count).ravel(), take(mean).reshape(-1, len(METRICS)),
+                            take(comoment).reshape(-1, len(METRICS), len(METRICS)))
+    
+    _, overall_mean, overall_cov, corr = pool_moments(count.ravel(), mean.reshape(-1, len(METRICS)),
+                                                      comoment.reshape(-1, len(METRICS), len(METRICS)))
+    scores = [METRICS.index(col) for col in SCORES]
+    groups = {}
+    for axis, col in enumerate(GROUPS):
+        moments = [pooled(axis, k) for k in range(shape[axis])]
+        groups[col] = {'values': categories[axis], 'count': [int(m[0]) for m in moments],
+                       'mean': [m[1][scores].tolist() for m in moments],
+                       'std': [np.sqrt(np.diag(m[2]))[scores].tolist() for m in moments]}
+    
+    counts = {}
+    for col in CATEGORICAL:
+        if col in GROUPS:
+            axis = GROUPS.index(col)
+            counts[col] = {'values': categories[axis],
+                           'counts': count.sum(axis=tuple(a for a in range(len(shape)) if a != axis)).tolist()}
+        else:
+            counts[col] = ordered_counts(state['counts'][col], instruments.LEVELS if col.endswith('Label') else None)
+    
+    histograms = {}
+    for col, bins in HISTOGRAM_BINS.items():
+        hist, edges = streaming_stats.histogram(state['columns'][col], bins)
+        histograms[col] = {'edges': edges.tolist(), 'counts': hist.tolist(),
+                           'mean': streaming_stats.mean_std(state['columns'][col])[0]}
+    
+    range_counts = count.sum(axis=(0, 1, 2))
+    boxplots = {}
+    for col in SCORES:
+        sketches = state['boxplots'][col]
+        boxplots[col] = [dict(label=label, **box_stats(sketches[k])) if k in sketches else {'label': label, 'count': 0}
+                         for k, label in enumerate(CGPA_RANGES)]
+    violins = {}
+    for col in SCORES:
+        sketches = state['violins'][col]
+        violins[col] = [dict(value=value, count=sketches[value]['n'], **kde(sketches[value]),
+                             **{k: v for k, v in box_stats(sketches[value]).items() if k in ('q1', 'median', 'q3',
+                                                                                             'whislo', 'whishi')})
+                        for value in categories[GROUPS.index('Gender')]]
+    
+    # Scatter sample rows as positions in the whole file
+    offsets = dict(zip(sorted(state['chunks']), np.cumsum([0] + [state['chunks'][c] for c in sorted(state['chunks'])])))
+    sample = state['scatter']
+    rows = np.array([offsets[c] for c in sample['chunk'].tolist()], dtype=np.int64) + sample['row']
+    
+    all_sketches = list(state['columns'].values()) + [s for section in ('boxplots', 'violins') for col in SCORES
+                                                      for s in state[section][col].values()]
+    aggregates = {
+        'version': AGGREGATES_VERSION,
+        'rows': n,
+        'exact': not any(s['compressed'] for s in all_sketches),
+        'scores': SCORES,
+        'counts': counts,
+        'histograms': histograms,
+        'correlation': {'columns': METRICS, 'matrix': corr.tolist(), 'mean': overall_mean.tolist(),
+                        'std': np.sqrt(np.diag(overall_cov)).tolist()},
+        'groups': groups,
+        'cgpa_ranges': {'bins': CGPA_BINS, 'labels': CGPA_RANGES, 'counts': range_counts[:len(CGPA_RANGES)].tolist(),
+                        'outside': int(range_counts[-1])},
+        'boxplots': boxplots,
+        'violins': violins
+    }
+    arrays = {
+        'cell_count': count, 'cell_mean': mean, 'cell_comoment': comoment,
+        'scatter_rows': rows, 'scatter': sample['values']
+    }
+    return aggregates, arrays
+
+
+def build_aggregates(df):
+    """Every statistic the EDA figures and the /eda endpoint use, from one pass over an in-memory frame"""
+    return finalize(accumulate(df))
+
+
+def csv_chunks(path, chunk_bytes=CHUNK_BYTES):
+    """Byte ranges of a CSV's data rows, each ending on a line boundary (fields must not contain newlines)"""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.readline()
+        start = f.tell()
+        bounds = [start]
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            start = min(f.tell(), size)
+            bounds.append(start)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _accumulate_csv(path, start, stop, chunk):
+    """Worker: parse one byte range of the CSV (with the header line) and accumulate it"""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(start)
+        data = f.read(stop - start)
+    return accumulate(pd.read_csv(io.BytesIO(header + data), usecols=COLUMNS), chunk)
+
+
+def _accumulate_parquet(path, row_group, chunk):
+    """Worker: read one row group of a Parquet file and accumulate it"""
+    import pyarrow.parquet as pq
+    return accumulate(pq.ParquetFile(path).read_row_group(row_group, columns=COLUMNS).to_pandas(), chunk)
+
+
+def build_aggregates_chunked(path, n_jobs=None, chunk_bytes=CHUNK_BYTES):
+    """The same statistics from a CSV or Parquet file that need not fit in memory
+    
+    The file is split into byte ranges (CSV) or row groups (Parquet). Workers parse and
+    accumulate their chunks in parallel, and only the small accumulators travel back, so memory
+    stays around n_jobs chunks. Returns (aggregates, arrays, number of chunks).
+    """
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('Parquet input needs pyarrow (pip install pyarrow)')
+        worker = _accumulate_parquet
+        tasks = [(path, group, group) for group in range(pq.ParquetFile(path).num_row_groups)]
+    else:
+        worker = _accumulate_csv
+        tasks = [(path, start, stop, chunk) for chunk, (start, stop) in enumerate(csv_chunks(path, chunk_bytes))]
+    
+    n_jobs = n_jobs or os.cpu_count() or 1
+    state = None
+    if n_jobs == 1 or len(tasks) == 1:
+        for task in tasks:
+            state = merge_states(state, worker(*task))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            for partial in pool.map(worker, *zip(*tasks)):
+                state = merge_states(state, partial)
+    return finalize(state) + (len(tasks),)
+
+
+def save_aggregates(aggregates, arrays, source=None, json_path=AGGREGATES_JSON, npz_path=AGGREGATES_NPZ):
+    """Write the JSON store and its NumPy arrays; both carry the version and the source data's hash"""
+    aggregates = {**aggregates, 'source': source}
+    os.makedirs(os.path.dirname(json_path), exist_ok=True)
+    with open(json_path, 'w') as f:
+        json.dump(aggregates, f, indent=2)
+    cell_axes = json.dumps({'axes': GROUPS + ['CGPA Range'], 'metrics': METRICS})
+    np.savez_compressed(npz_path, version=AGGREGATES_VERSION, source=str(source), cell_axes=cell_axes, **arrays)
+
+
+def load_aggregates(json_path=AGGREGATES_JSON, npz_path=None):
+    """Saved aggregates (None if missing or written by another version); npz_path also loads the arrays"""
+    if not os.path.exists(json_path):
+        return None
+    with open(json_path) as f:
+        aggregates = json.load(f)
+    if aggregates.get('version') != AGGREGATES_VERSION:
+        return None
+    if npz_path is None:
+        return aggregates
+    if not os.path.exists(npz_path):
+        return None
+    with np.load(npz_path) as data:
+        if int(data['version']) != AGGREGATES_VERSION or str(data['source']) != str(aggregates['source']):
+            return None
+        return aggregates, {key: data[key] for key in data.files if key not in ('version', 'source', 'cell_axes')}
+
+
+def run(path=SOURCE_PATH, chunked=None, n_jobs=None, chunk_bytes=CHUNK_BYTES):
+    """Build and save the aggregates of the cleaned data
+    
+    chunked=None reads the file whole unless it is Parquet or larger than CHUNKED_ABOVE_BYTES.
+    """
+    if chunked is None:
+        chunked = path.endswith('.parquet') or os.path.getsize(path) > CHUNKED_ABOVE_BYTES
+    if chunked:
+        aggregates, arrays, n_chunks = build_aggregates_chunked(path, n_jobs=n_jobs, chunk_bytes=chunk_bytes)
+        print(f"  ✓ Aggregated {n_chunks} chunk(s) over worker processes")
+    else:
+        aggregates, arrays = build_aggregates(pd.read_csv(path, usecols=COLUMNS))
+    save_aggregates(aggregates, arrays, source=source_fingerprint(path))
+    return aggregates, arrays
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the EDA aggregate store')
+    parser.add_argument('path', nargs='?', default=SOURCE_PATH, help='cleaned CSV or Parquet file')
+    parser.add_argument('--chunked', action='store_true', help='stream the file in chunks over a process pool')
+    parser.add_argument('--n-jobs', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--chunk-mb', type=int, default=CHUNK_BYTES >> 20, help='CSV megabytes per chunk')
+    args = parser.parse_args()
+    
+    aggregates, _ = run(args.path, chunked=args.chunked or None, n_jobs=args.n_jobs, chunk_bytes=args.chunk_mb << 20)
+    print(f"✓ Aggregates of {aggregates['rows']:,} rows saved to: {AGGREGATES_JSON} (arrays: {AGGREGATES_NPZ})")
@@ -0,0 +1,164 @@
+"""
+Per-Prediction Explanations (exact tree-path contributions, vectorized across trees and rows)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+import importlib
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.response_ingest import FIELD_RANGES, CODED_FIELDS
+
+classification = importlib.import_module('src.4_classification_models')
+
+# Request key -> model feature column (same order as 4_classification_models.FEATURE_COLS)
+FEATURES = {
+    'age': 'Age',
+    'gender': 'Gender',
+    'cgpa': 'Current CGPA',
+    'scholarship': 'Scholarship',
+    'academic_year': 'Academic Year',
+    'cluster': 'Cluster'
+}
+MAX_BATCH = 10000
+
+
+def class_names(target_col, df):
+    """Label behind each encoded class: label_classes.json, else the LabelEncoder order of the training data"""
+    saved = classification.load_label_classes().get(target_col)
+    return saved or sorted(str(label) for label in df[target_col].unique())
+
+
+def build_explainer(model, classes):
+    """Flatten a fitted forest (or a single tree) into one node table (feature, threshold, children, class distribution)
+    
+    Node ids are offset per tree, so one array lookup advances every tree at once. Leaves point
+    to themselves, so descending past a leaf changes nothing. A multi-output regression tree fitted
+    on class probabilities (the distilled models) is read the same way, one output per class.
+    """
+    estimators = getattr(model, 'estimators_', [model])
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        ids = np.arange(tree.node_count) + offset
+        leaf = tree.children_left < 0
+        features.append(np.where(leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(leaf, ids, tree.children_left + offset))
+        rights.append(np.where(leaf, ids, tree.children_right + offset))
+        # Class distribution at every node (weighted counts or fractions, depending on the sklearn version);
+        # classifiers store (nodes, 1, classes), probability regressors (nodes, classes, 1)
+        value = tree.value.reshape(tree.node_count, -1)
+        values.append(value / value.sum(axis=1, keepdims=True))
+        roots.append(offset)
+        offset += tree.node_count
+    columns = list(getattr(model, 'feature_names_in_', FEATURES.values()))
+    return {
+        'feature': np.concatenate(features), 'threshold': np.concatenate(thresholds),
+        'left': np.concatenate(lefts), 'right': np.concatenate(rights),
+        'value': np.concatenate(values), 'roots': np.array(roots),
+        'max_depth': max(estimator.tree_.max_depth for estimator in estimators),
+        'columns': columns, 'classes': list(classes)
+    }
+
+
+def explain_rows(explainer, X):
+    """Class probabilities and exact per-feature contributions for a batch of rows
+    
+    Every tree is walked at once, one level per step. Each split moves the class distribution
+    from the parent node to the child, and that change is credited to the split feature.
+    Summed over the path and averaged over trees, the changes give
+    probabilities = baseline + contributions.sum(axis=1).
+    Returns (probabilities (rows, classes), baseline (classes), contributions (rows, features, classes)).
+    """
+    X = np.asarray(X, dtype=np.float32)  # trees split on float32 features, as in sklearn
+    n_rows, n_features = X.shape
+    n_trees, n_classes = len(explainer['roots']), explainer['value'].shape[1]
+    value = explainer['value']
+    
+    node = np.broadcast_to(explainer['roots'], (n_rows, n_trees)).copy()
+    row = np.broadcast_to(np.arange(n_rows)[:, None], (n_rows, n_trees))
+    contributions = np.zeros((n_classes, n_rows * n_features))
+    for _ in range(explainer['max_depth']):
+        feature = explainer['feature'][node]
+        go_left = X[row, feature] <= explainer['threshold'][node]
+        child = np.where(go_left, explainer['left'][node], explainer['right'][node])
+        delta = value[child] - value[node]
+        # Scatter-add each (row, feature) pair's change in one bincount per class
+        slot = (row * n_features + feature).ravel()
+        for c in range(n_classes):
+            contributions[c] += np.bincount(slot, weights=delta[..., c].ravel(), minlength=n_rows * n_features)
+        node = child
+    
+    probabilities = value[node].mean(axis=1)
+    baseline = value[explainer['roots']].mean(axis=0)
+    contributions = contributions.reshape(n_classes, n_rows, n_features).transpose(1, 2, 0) / n_trees
+    return probabilities, baseline, contributions
+
+
+def student_matrix(students, cluster_rule):
+    """Feature matrix for a list of student dicts; a missing 'cluster' is filled by cluster_rule(cgpa)
+    
+    Missing required fields, non-numeric or out-of-range values (response_ingest.FIELD_RANGES;
+    codes and clusters must be whole numbers) or an empty/oversized batch raise ValueError.
+    """
+    if not isinstance(students, list) or not students:
+        raise ValueError('No students given')
+    if len(students) > MAX_BATCH:
+        raise ValueError(f'At most {MAX_BATCH} students per request')
+    required = [key for key in FEATURES if key != 'cluster']
+    missing = sorted({key for s in students for key in required if not isinstance(s, dict) or key not in s})
+    if missing:
+        raise ValueError(f'Missing required fields: {missing}')
+    try:
+        X = np.array([[float(s[key]) for key in required] + [float(s['cluster']) if 'cluster' in s
+                                                             else float(cluster_rule(float(s['cgpa'])))]
+                      for s in students])
+    except (TypeError, ValueError):
+        raise ValueError('Student features must be numbers')
+    if not np.isfinite(X).all():
+        raise ValueError('Student features must be finite numbers')
+    for j, key in enumerate(FEATURES):
+        low, high = FIELD_RANGES.get(key, (0, np.inf))  # clusters: any non-negative id
+        if ((X[:, j] < low) | (X[:, j] > high)).any():
+            raise ValueError(f'{key} must be between {low} and {high}' if high < np.inf
+                             else f'{key} must be at least {low}')
+        if (key in CODED_FIELDS or key == 'cluster') and (X[:, j] != np.round(X[:, j])).any():
+            raise ValueError(f'{key} must be a whole number')
+    return pd.DataFrame(X, columns=list(FEATURES.values()))
+
+
+def explanation_payloads(explainer, probabilities, baseline, contributions, all_classes=False):
+    """JSON-ready explanation of each row: predicted level, baseline and per-feature contributions to it
+    
+    Contributions are listed largest effect first. all_classes adds the breakdown for every class.
+    """
+    classes = explainer['classes']
+    keys = {col: key for key, col in FEATURES.items()}
+    names = np.array([keys.get(col, col) for col in explainer['columns']], dtype=object)
+    top = probabilities.argmax(axis=1)
+    # Sort every row's features by effect once, then only build the JSON in Python
+    order = np.argsort(-np.abs(contributions), axis=1, kind='stable')
+    ranked = np.take_along_axis(contributions, order, axis=1).round(6)
+    features = names[order]
+    
+    def breakdown(i, c):
+        return [{'feature': f, 'contribution': v} for f, v in zip(features[i, :, c], ranked[i, :, c].tolist())]
+    
+    payloads = []
+    for i, c in enumerate(top.tolist()):
+        payload = {
+            'level': classes[c],
+            'probability': round(float(probabilities[i, c]), 6),
+            'baseline': round(float(baseline[c]), 6),
+            'contributions': breakdown(i, c)
+        }
+        if all_classes:
+            payload['probabilities'] = dict(zip(classes, probabilities[i].round(6).tolist()))
+            payload['by_class'] = {cls: {'baseline': round(float(baseline[k]), 6), 'contributions': breakdown(i, k)}
+                                   for k, cls in enumerate(classes)}
+        payloads.append(payload)
+    return payloads
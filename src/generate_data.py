@@ -5,123 +5,192 @@ Author: Sakhi Patel
 
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import instruments
 
-np.random.seed(42)
+CHUNKSIZE = 100000
 
-def generate_synthetic_data(n_samples=500):
-    """Generate realistic synthetic survey data"""
+AGE_CHOICES = (['18-20', '19', '20', '21', '22', '21-23', '23-25'], [0.15, 0.20, 0.20, 0.20, 0.15, 0.07, 0.03])
+GENDER_CHOICES = (['Male', 'Female'], [0.5, 0.5])
+UNIVERSITY_CHOICES = (['NC State University', 'Duke University', 'UNC Chapel Hill', 'Wake Forest'], [0.4, 0.25, 0.25, 0.1])
+DEPARTMENT_CHOICES = (['Computer Science', 'Engineering', 'Business', 'Psychology', 'Biology', 'Arts'],
+                      [0.25, 0.25, 0.15, 0.15, 0.12, 0.08])
+YEAR_CHOICES = (['1st Year', '2nd Year', '3rd Year', '4th Year'], [0.25, 0.25, 0.25, 0.25])
+SCHOLARSHIP_CHOICES = (['Yes', 'No'], [0.3, 0.7])
+
+# Pre-formatted strings, indexed rather than formatted per row
+CGPA_RANGES = np.array([f"{i / 10:.1f}-{(i + 5) / 10:.1f}" for i in range(50)], dtype=object)
+CGPA_EXACT = np.array([f"{i / 100:.2f}" for i in range(500)], dtype=object)
+
+
+def chunk_seed(seed, chunk_index):
+    """Independent seed for one chunk (same chunk, same numbers, whatever the worker count)"""
+    return np.random.SeedSequence(seed, spawn_key=(chunk_index,))
+
+
+def draw(rng, choices, n_samples):
+    """Weighted categorical draw as an object array of the choice strings"""
+    options, p = choices
+    return np.array(options, dtype=object)[rng.choice(len(options), n_samples, p=p)]
+
+
+def instrument_responses(rng, key, cgpa_numeric, noise_sd, data):
+    """Answers for one instrument (symptom level inversely related to CGPA), scored by the shared engine"""
+    reverse = instruments.reverse_mask(key)
+    base = 4 - (cgpa_numeric - 2) / 2 * 4
+    noise = rng.normal(0, noise_sd, (len(cgpa_numeric), len(reverse)))
+    symptoms = np.clip(base[:, None] + noise, 0, 4).astype(int)
+    # Positively worded (reverse-keyed) items are answered inversely to the symptom level
+    answers = np.where(reverse, instruments.SCALE_MAX - symptoms, symptoms)
+    data.update(zip(instruments.columns(key), answers.T))
     
+    result = instruments.score(key, answers)
+    instrument = instruments.INSTRUMENTS[key]
+    data[instrument['value_col']] = result['total']
+    data[instrument['label_col']] = result['level']
+
+
+def generate_chunk(n_samples, seed):
+    """Generate one chunk of survey responses (vectorized, local Generator)"""
+    rng = np.random.default_rng(seed)
     data = {}
     
     # Demographics
-    data['Age'] = np.random.choice(['18-20', '19', '20', '21', '22', '21-23', '23-25'], n_samples, 
-                                    p=[0.15, 0.20, 0.20, 0.20, 0.15, 0.07, 0.03])
-    data['Gender'] = np.random.choice(['Male', 'Female'], n_samples, p=[0.5, 0.5])
-    data['University'] = np.random.choice(['NC State University', 'Duke University', 'UNC Chapel Hill', 'Wake Forest'], 
-                                          n_samples, p=[0.4, 0.25, 0.25, 0.1])
-    data['Department'] = np.random.choice(['Computer Science', 'Engineering', 'Business', 'Psychology', 'Biology', 'Arts'], 
-                                          n_samples, p=[0.25, 0.25, 0.15, 0.15, 0.12, 0.08])
-    data['Academic Year'] = np.random.choice(['1st Year', '2nd Year', '3rd Year', '4th Year'], 
-                                             n_samples, p=[0.25, 0.25, 0.25, 0.25])
-    
-    # CGPA - some as ranges, some as exact
-    cgpa_values = []
-    for _ in range(n_samples):
-        if np.random.random() < 0.3:
-            base = np.random.uniform(2.0, 3.8)
-            cgpa_values.append(f"{base:.1f}-{base+0.5:.1f}")
-        else:
-            cgpa_values.append(f"{np.random.uniform(2.0, 4.0):.2f}")
-    data['Current CGPA'] = cgpa_values
-    
-    data['Did you receive a waiver or scholarship at your university?'] = np.random.choice(['Yes', 'No'], 
-                                                                                           n_samples, p=[0.3, 0.7])
-    
-    # Convert CGPA to numeric for correlation
-    cgpa_numeric = []
-    for cgpa in cgpa_values:
-        if '-' in cgpa:
-            parts = cgpa.split('-')
-            cgpa_numeric.append((float(parts[0]) + float(parts[1])) / 2)
-        else:
-            cgpa_numeric.append(float(cgpa))
-    cgpa_numeric = np.array(cgpa_numeric)
-    
-    # Anxiety questions (7 questions) - correlated with CGPA (lower CGPA = higher anxiety)
-    anxiety_questions = []
-    for i in range(7):
-        base_anxiety = 4 - (cgpa_numeric - 2) / 2 * 4  # Inverse relationship
-        noise = np.random.normal(0, 0.8, n_samples)
-        scores = np.clip(base_anxiety + noise, 0, 4).astype(int)
-        anxiety_questions.append(scores)
-    
-    data['In a semester, how often you felt nervous, anxious or on edge due to academic pressure?'] = anxiety_questions[0]
-    data['In a semester, how often have you been unable to stop worrying about your academic affairs?'] = anxiety_questions[1]
-    data['In a semester, how often have you had trouble relaxing due to academic pressure?'] = anxiety_questions[2]
-    data['In a semester, how often have you been easily annoyed or irritated because of academic pressure?'] = anxiety_questions[3]
-    data['In a semester, how often have you worried too much about academic affairs?'] = anxiety_questions[4]
-    data['In a semester, how often have you been so restless due to academic pressure that it is hard to sit still?'] = anxiety_questions[5]
-    data['In a semester, how often have you felt afraid, as if something awful might happen?'] = anxiety_questions[6]
-    
-    # Anxiety Value and Label
-    anxiety_values = sum(anxiety_questions)
-    data['Anxiety Value'] = anxiety_values
-    data['Anxiety Label'] = ['Low' if v < 18 else 'Medium' if v < 35 else 'High' for v in anxiety_values]
+    data['Age'] = draw(rng, AGE_CHOICES, n_samples)
+    data['Gender'] = draw(rng, GENDER_CHOICES, n_samples)
+    data['University'] = draw(rng, UNIVERSITY_CHOICES, n_samples)
+    data['Department'] = draw(rng, DEPARTMENT_CHOICES, n_samples)
+    data['Academic Year'] = draw(rng, YEAR_CHOICES, n_samples)
     
-    # Stress questions (10 questions)
-    stress_questions = []
-    for i in range(10):
-        base_stress = 4 - (cgpa_numeric - 2) / 2 * 4
-        noise = np.random.normal(0, 0.9, n_samples)
-        scores = np.clip(base_stress + noise, 0, 4).astype(int)
-        stress_questions.append(scores)
+    # CGPA - some as ranges, some as exact (numeric value matches the formatted string)
+    is_range = rng.random(n_samples) < 0.3
+    low = np.rint(rng.uniform(2.0, 3.8, n_samples) * 10).astype(int)
+    exact = np.rint(rng.uniform(2.0, 4.0, n_samples) * 100).astype(int)
+    data['Current CGPA'] = np.where(is_range, CGPA_RANGES[low], CGPA_EXACT[exact])
+    cgpa_numeric = np.where(is_range, (2 * low + 5) / 20, exact / 100)
     
-    data['In a semester, how often have you felt upset due to something that happened in your academic affairs?'] = stress_questions[0]
-    data['In a semester, how often you felt as if you were unable to control important things in your academic affairs?'] = stress_questions[1]
-    data['In a semester, how often you felt nervous and stressed because of academic pressure?'] = stress_questions[2]
-    data['In a semester, how often you felt as if you could not cope with all the mandatory academic activities?'] = stress_questions[3]
-    data['In a semester, how often you felt confident about your ability to handle your academic problems?'] = 4 - stress_questions[4]  # Reverse
-    data['In a semester, how often you felt as if things in your academic life are going your way?'] = 4 - stress_questions[5]  # Reverse
-    data['In a semester, how often are you able to control irritations in your academic affairs?'] = 4 - stress_questions[6]  # Reverse
-    data['In a semester, how often you felt as if your academic performance was on top?'] = 4 - stress_questions[7]  # Reverse
-    data['In a semester, how often you got angered due to bad performance or low grades that are beyond your control?'] = stress_questions[8]
-    data['In a semester, how often you felt as if academic difficulties are piling up so high that you could not overcome them?'] = stress_questions[9]
+    data['Did you receive a waiver or scholarship at your university?'] = draw(rng, SCHOLARSHIP_CHOICES, n_samples)
     
-    stress_values = sum(stress_questions)
-    data['Stress Value'] = stress_values
-    data['Stress Label'] = ['Low' if v < 18 else 'Medium' if v < 35 else 'High' for v in stress_values]
+    # Questionnaires: 7 anxiety, 10 stress (4 reverse-keyed) and 9 depression items
+    instrument_responses(rng, 'anxiety', cgpa_numeric, 0.8, data)
+    instrument_responses(rng, 'stress', cgpa_numeric, 0.9, data)
+    instrument_responses(rng, 'depression', cgpa_numeric, 1.0, data)
     
-    # Depression questions (9 questions)
-    depression_questions = []
-    for i in range(9):
-        base_depression = 4 - (cgpa_numeric - 2) / 2 * 4
-        noise = np.random.normal(0, 1.0, n_samples)
-        scores = np.clip(base_depression + noise, 0, 4).astype(int)
-        depression_questions.append(scores)
+    return pd.DataFrame(data)
+
+
+def chunk_bounds(n_samples, chunksize):
+    """(chunk index, row count) for every chunk"""
+    return [(i, min(chunksize, n_samples - start)) for i, start in enumerate(range(0, n_samples, chunksize))]
+
+
+def generate_synthetic_data(n_samples=500, seed=42, chunksize=CHUNKSIZE):
+    """Generate realistic synthetic survey data in memory"""
+    return pd.concat([generate_chunk(rows, chunk_seed(seed, i)) for i, rows in chunk_bounds(n_samples, chunksize)],
+                     ignore_index=True)
+
+
+def _csv_chunk(rows, seed, header):
+    """Worker: generate a chunk and render it as CSV text"""
+    return generate_chunk(rows, seed).to_csv(index=False, header=header)
+
+
+def _columnar_chunk(rows, seed, path, start):
+    """Worker: generate a chunk and write it into the preallocated column files"""
+    chunk = generate_chunk(rows, seed)
+    for i, col in enumerate(chunk.columns):
+        column = np.load(os.path.join(path, f'{i:02d}.npy'), mmap_mode='r+')
+        column[start:start + rows] = chunk[col].to_numpy()
+        column.flush()
+    return rows
+
+
+def _columnar_layout(seed):
+    """Column names and dtypes (text columns fixed-width, sized to their longest value)"""
+    sample = generate_chunk(100, chunk_seed(seed, 0))
+    widths = {'Age': AGE_CHOICES, 'Gender': GENDER_CHOICES, 'University': UNIVERSITY_CHOICES,
+              'Department': DEPARTMENT_CHOICES, 'Academic Year': YEAR_CHOICES,
+              'Did you receive a waiver or scholarship at your university?': SCHOLARSHIP_CHOICES}
+    widths = {col: max(len(choice) for choice in choices) for col, (choices, _) in widths.items()}
+    widths['Current CGPA'] = len('3.8-4.3')
+    layout = []
+    for col in sample.columns:
+        if sample[col].dtype == object:
+            layout.append((col, f"<U{widths.get(col, len('Medium'))}"))
+        else:
+            layout.append((col, sample[col].dtype.str))
+    return layout
+
+
+def write_synthetic_data(path, n_samples, seed=42, chunksize=CHUNKSIZE, n_jobs=None, fmt='csv'):
+    """Generate chunks in a process pool and stream them to CSV or a columnar directory
     
-    data['In a semester, how often have you had little interest or pleasure in doing things?'] = depression_questions[0]
-    data['In a semester, how often have you been feeling down, depressed or hopeless?'] = depression_questions[1]
-    data['In a semester, how often have you had trouble falling or staying asleep, or sleeping too much?'] = depression_questions[2]
-    data['In a semester, how often have you been feeling tired or having little energy?'] = depression_questions[3]
-    data['In a semester, how often have you had poor appetite or overeating?'] = depression_questions[4]
-    data['In a semester, how often have you been feeling bad about yourself - or that you are a failure or have let yourself or your family down?'] = depression_questions[5]
-    data['In a semester, how often have you been having trouble concentrating on things, such as reading books or watching television?'] = depression_questions[6]
-    data['In a semester, how often have you moved or spoke too slowly for other people to notice?'] = depression_questions[7]
-    data['In a semester, how often have you had thoughts that you would be better off dead, or of hurting yourself?'] = depression_questions[8]
+    fmt='csv': one CSV file, chunks rendered to text in the workers and appended in order.
+    fmt='columnar': a directory with one memory-mappable .npy per column plus columns.json;
+    workers write their rows straight into the preallocated files.
+    Output depends only on (n_samples, seed, chunksize), never on n_jobs.
+    """
+    chunks = chunk_bounds(n_samples, chunksize)
+    n_jobs = n_jobs or os.cpu_count()
     
-    depression_values = sum(depression_questions)
-    data['Depression Value'] = depression_values
-    data['Depression Label'] = ['Low' if v < 18 else 'Medium' if v < 35 else 'High' for v in depression_values]
+    if fmt == 'columnar':
+        os.makedirs(path, exist_ok=True)
+        layout = _columnar_layout(seed)
+        for i, (_, dtype) in enumerate(layout):
+            np.lib.format.open_memmap(os.path.join(path, f'{i:02d}.npy'), mode='w+',
+                                      dtype=dtype, shape=(n_samples,)).flush()
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            starts = np.cumsum([0] + [rows for _, rows in chunks])
+            futures = [pool.submit(_columnar_chunk, rows, chunk_seed(seed, i), path, int(starts[i]))
+                       for i, rows in chunks]
+            for f in futures:
+                f.result()
+        with open(os.path.join(path, 'columns.json'), 'w') as f:
+            json.dump({'n_rows': n_samples, 'seed': seed, 'chunksize': chunksize,
+                       'columns': [col for col, _ in layout]}, f, indent=2)
+        return
     
-    df = pd.DataFrame(data)
-    return df
+    # CSV: bounded window of in-flight chunks, written in chunk order
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool, open(path, 'w', newline='') as out:
+        pending = deque()
+        for i, rows in chunks:
+            pending.append(pool.submit(_csv_chunk, rows, chunk_seed(seed, i), i == 0))
+            if len(pending) >= 2 * n_jobs:
+                out.write(pending.popleft().result())
+        while pending:
+            out.write(pending.popleft().result())
+
+
+def read_columnar(path, columns=None):
+    """Load a columnar dataset written by write_synthetic_data as a DataFrame"""
+    with open(os.path.join(path, 'columns.json')) as f:
+        names = json.load(f)['columns']
+    wanted = columns or names
+    return pd.DataFrame({col: np.load(os.path.join(path, f'{names.index(col):02d}.npy'), mmap_mode='r')
+                         for col in wanted})[wanted]
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate synthetic student mental health survey data')
+    parser.add_argument('--rows', type=int, default=500, help='number of responses (default: 500)')
+    parser.add_argument('--output', default='data/student_mental_health_survey.csv', help='output path')
+    parser.add_argument('--format', choices=['csv', 'columnar'], default='csv',
+                        help='CSV file, or a directory of per-column .npy files')
+    parser.add_argument('--seed', type=int, default=42, help='root seed (default: 42)')
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE, help='rows per chunk (default: 100000)')
+    parser.add_argument('--n-jobs', type=int, default=None, help='worker processes (default: all cores)')
+    args = parser.parse_args()
+    
     print("Generating synthetic student mental health survey data...")
-    df = generate_synthetic_data(500)
-    df.to_csv('data/student_mental_health_survey.csv', index=False)
-    print(f"✓ Generated {len(df)} survey responses")
-    print(f"✓ Saved to: data/student_mental_health_survey.csv")
-    print(f"\nDataset shape: {df.shape}")
-    print(f"Columns: {len(df.columns)}")
+    start = time.perf_counter()
+    write_synthetic_data(args.output, args.rows, seed=args.seed, chunksize=args.chunksize,
+                         n_jobs=args.n_jobs, fmt=args.format)
+    print(f"✓ Generated {args.rows} survey responses in {time.perf_counter() - start:.2f}s")
+    print(f"✓ Saved to: {args.output}")
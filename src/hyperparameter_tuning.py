@@ -0,0 +1,224 @@
+"""
+Random Forest Hyperparameter Tuning (successive halving over cached CV folds)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder
+from joblib import Parallel, delayed
+import hashlib
+import itertools
+import importlib
+import json
+import math
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import profiling
+
+classification = importlib.import_module('src.4_classification_models')
+
+SEARCH_PATH = 'outputs/results/hyperparameter_search.json'
+FOLDS_PATH = 'outputs/results/cv_folds.npz'
+
+# Candidate grid (tree count is the halving resource, not a hyperparameter)
+PARAM_GRID = {
+    'max_depth': [4, 6, 8, 10, 14, None],
+    'min_samples_leaf': [1, 2, 5],
+    'max_features': ['sqrt', None]
+}
+N_SPLITS = 5
+ETA = 3
+MAX_TREES = 100
+MIN_TREES = 10
+MIN_SAMPLES = 30
+
+
+def candidate_grid():
+    """Expand PARAM_GRID into a list of parameter dicts"""
+    keys = sorted(PARAM_GRID)
+    return [dict(zip(keys, values)) for values in itertools.product(*(PARAM_GRID[k] for k in keys))]
+
+
+def candidate_key(params):
+    """Stable string key for a parameter dict"""
+    return json.dumps(params, sort_keys=True)
+
+
+def build_folds(df, seed=42):
+    """Stratified CV folds shared by every target, with a fixed shuffle for subsampling"""
+    # Stratify on the joint label so folds are balanced for all three targets
+    strata = df[[target_col for target_col, _ in classification.TARGETS]].astype(str).agg('|'.join, axis=1)
+    counts = strata.value_counts()
+    strata = strata.where(strata.map(counts) >= N_SPLITS, 'other')
+    
+    skf = StratifiedKFold(n_splits=N_SPLITS, shuffle=True, random_state=seed)
+    rng = np.random.default_rng(seed)
+    folds = []
+    for train_idx, val_idx in skf.split(np.zeros(len(df)), strata):
+        # Shuffled once, so any prefix of train_idx is a random subsample
+        folds.append((rng.permutation(train_idx), val_idx))
+    return folds
+
+
+def load_or_build_folds(df, signature):
+    """Reuse cached folds when the data is unchanged, otherwise rebuild them"""
+    if os.path.exists(FOLDS_PATH):
+        cached = np.load(FOLDS_PATH)
+        if str(cached['signature']) == signature:
+            return [(cached[f'train_{i}'], cached[f'val_{i}']) for i in range(N_SPLITS)]
+    
+    folds = build_folds(df)
+    arrays = {'signature': np.array(signature)}
+    for i, (train_idx, val_idx) in enumerate(folds):
+        arrays[f'train_{i}'] = train_idx
+        arrays[f'val_{i}'] = val_idx
+    os.makedirs(os.path.dirname(FOLDS_PATH), exist_ok=True)
+    np.savez(FOLDS_PATH, **arrays)
+    return folds
+
+
+def data_signature(X, df):
+    """Hash of the feature matrix, labels and search settings"""
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    for target_col, _ in classification.TARGETS:
+        h.update(pd.util.hash_pandas_object(df[target_col], index=False).values.tobytes())
+    h.update(json.dumps([PARAM_GRID, N_SPLITS, ETA, MAX_TREES, MIN_TREES, MIN_SAMPLES], default=str).encode())
+    return h.hexdigest()
+
+
+def halving_schedule(n_candidates, n_train):
+    """Resources (training rows, trees) and survivors for each rung"""
+    n_rungs = 1 + int(math.floor(math.log(n_candidates, ETA)))
+    schedule = []
+    for rung in range(n_rungs):
+        fraction = ETA ** (rung - (n_rungs - 1))
+        n_samples = min(n_train, max(MIN_SAMPLES, int(n_train * fraction)))
+        n_trees = max(MIN_TREES, int(MAX_TREES * fraction))
+        schedule.append((n_samples, n_trees))
+    return schedule
+
+
+def evaluate(X, y, train_idx, val_idx, params, n_trees):
+    """Accuracy of one candidate on one fold"""
+    rf = RandomForestClassifier(n_estimators=n_trees, class_weight='balanced',
+                                random_state=42, **params)
+    rf.fit(X[train_idx], y[train_idx])
+    return float((rf.predict(X[val_idx]) == y[val_idx]).mean())
+
+
+def load_search():
+    """Load persisted search state"""
+    if os.path.exists(SEARCH_PATH):
+        with open(SEARCH_PATH) as f:
+            return json.load(f)
+    return {}
+
+
+def save_search(state):
+    """Persist search state so reruns resume"""
+    os.makedirs(os.path.dirname(SEARCH_PATH), exist_ok=True)
+    with open(SEARCH_PATH, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def run(n_jobs=-1):
+    """Execute successive-halving hyperparameter search for all targets"""
+    
+    print("\n" + "="*60)
+    print("HYPERPARAMETER TUNING (SUCCESSIVE HALVING)")
+    print("="*60)
+    
+    # Load clustered data
+    profiling.step('T.1 Loading clustered data')
+    print("\n[T.1] Loading clustered data...")
+    df = pd.read_csv('outputs/clustered_data.csv')
+    X_df = classification.build_feature_matrix(df)
+    X = X_df.to_numpy()
+    print(f"  ✓ Loaded {len(df)} records")
+    
+    # Folds computed once and shared by all targets
+    profiling.step('T.2 Preparing cross-validation folds')
+    print("\n[T.2] Preparing cross-validation folds...")
+    signature = data_signature(X_df, df)
+    folds = load_or_build_folds(df, signature)
+    print(f"  ✓ {N_SPLITS} stratified folds (cached in {FOLDS_PATH})")
+    
+    state = load_search()
+    if state.get('signature') != signature:
+        state = {'signature': signature, 'evaluations': {}, 'best': {}}
+    else:
+        print(f"  ✓ Resuming search ({len(state['evaluations'])} evaluations cached)")
+    
+    candidates = candidate_grid()
+    schedule = halving_schedule(len(candidates), min(len(train_idx) for train_idx, _ in folds))
+    profiling.step('T.3 Successive-halving search')
+    print(f"\n[T.3] Searching {len(candidates)} candidates over {len(schedule)} rungs:")
+    for n_samples, n_trees in schedule:
+        print(f"  rows/fold={n_samples:<6} trees={n_trees}")
+    
+    labels = {target_col: LabelEncoder().fit_transform(df[target_col]) for target_col, _ in classification.TARGETS}
+    survivors = {target_col: candidates for target_col, _ in classification.TARGETS}
+    start = time.perf_counter()
+    
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for rung, (n_samples, n_trees) in enumerate(schedule):
+            # Only evaluate what is not already persisted
+            pending = []
+            for target_col, _ in classification.TARGETS:
+                for params in survivors[target_col]:
+                    key = f"{target_col}|{n_samples}|{n_trees}|{candidate_key(params)}"
+                    if key not in state['evaluations']:
+                        pending.append((key, target_col, params))
+            
+            scores = parallel(
+                delayed(evaluate)(X, labels[target_col], train_idx[:n_samples], val_idx, params, n_trees)
+                for _, target_col, params in pending
+                for train_idx, val_idx in folds
+            )
+            for i, (key, _, _) in enumerate(pending):
+                state['evaluations'][key] = float(np.mean(scores[i * N_SPLITS:(i + 1) * N_SPLITS]))
+            save_search(state)
+            
+            # Keep the top 1/ETA of each target's candidates
+            n_keep = max(1, math.ceil(len(candidates) / ETA ** (rung + 1)))
+            for target_col, _ in classification.TARGETS:
+                ranked = sorted(
+                    survivors[target_col],
+                    key=lambda p: (-state['evaluations'][f"{target_col}|{n_samples}|{n_trees}|{candidate_key(p)}"],
+                                   candidate_key(p))
+                )
+                survivors[target_col] = ranked[:n_keep]
+            print(f"  ✓ Rung {rung + 1}/{len(schedule)}: {len(pending)} new evaluations, "
+                  f"{n_keep} candidates kept per target")
+    
+    print(f"  ✓ Search finished in {time.perf_counter() - start:.2f}s")
+    
+    # Best configuration per target, fed to train_model via tuned params file
+    profiling.step('T.4 Best configurations')
+    print("\n[T.4] Best configurations:")
+    n_samples, n_trees = schedule[-1]
+    for target_col, _ in classification.TARGETS:
+        best = survivors[target_col][0]
+        score = state['evaluations'][f"{target_col}|{n_samples}|{n_trees}|{candidate_key(best)}"]
+        state['best'][target_col] = {'params': dict(best, n_estimators=n_trees), 'cv_accuracy': score}
+        print(f"  {target_col}: {state['best'][target_col]['params']} (CV accuracy {score:.4f})")
+    save_search(state)
+    
+    classification.save_tuned_params({target_col: result['params'] for target_col, result in state['best'].items()})
+    print(f"  ✓ Saved to: {classification.TUNED_PARAMS_PATH}")
+    
+    print("\n" + "="*60)
+    print("✓ HYPERPARAMETER TUNING COMPLETE")
+    print("="*60)
+    
+    return state['best']
+
+
+if __name__ == '__main__':
+    run()
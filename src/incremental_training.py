@@ -0,0 +1,197 @@
+"""
+Incremental Random Forest Retraining for New Survey Waves
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.utils.class_weight import compute_class_weight
+from sklearn.exceptions import InconsistentVersionWarning
+import joblib
+import argparse
+import importlib
+import os
+import sys
+import time
+import warnings
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.drift_monitor import build_reference, save_reference, REFERENCE_PATH
+from src import distillation
+
+classification = importlib.import_module('src.4_classification_models')
+
+
+def encode_labels(labels, classes):
+    """Encode labels with a saved model's class order (unknown labels are an error)"""
+    classes = np.asarray(classes)
+    codes = np.searchsorted(classes, labels)
+    codes = np.clip(codes, 0, len(classes) - 1)
+    unknown = classes[codes] != labels
+    if unknown.any():
+        raise ValueError(f"Unknown labels in new wave: {sorted(set(labels[unknown]))}")
+    return codes
+
+
+def load_forest(path):
+    """Load a saved forest, refusing one pickled by another scikit-learn (warm_start fails on it)
+    
+    Returns (model, None), or (None, reason) when the versions differ.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', InconsistentVersionWarning)
+        try:
+            return joblib.load(path), None
+        except InconsistentVersionWarning as w:
+            return None, (f"saved with scikit-learn {w.original_sklearn_version}, running "
+                          f"{w.current_sklearn_version}; retrain with run_analysis.py first")
+
+
+def refresh_dependents(X_seen):
+    """Rebuild what was derived from the old forests: drift reference and distilled fast tier
+    
+    X_seen: feature rows the updated forests have been trained on (history + wave), or None
+    when the history is missing, in which case both files are removed instead of left stale.
+    """
+    if X_seen is None:
+        for path in (REFERENCE_PATH, distillation.DISTILLED_PATH):
+            if os.path.exists(path):
+                os.remove(path)
+                print(f"  ⚠ Removed {path} (no outputs/clustered_data.csv to rebuild it from)")
+        return
+    save_reference(build_reference(X_seen))
+    print(f"  ✓ Drift reference rebuilt on history + wave: {REFERENCE_PATH}")
+    distillation.run()
+
+
+def grow_forest(rf, X_new, y_new, n_new_trees, window, n_jobs=None):
+    """Grow n_new_trees on the new wave with warm_start, then keep only the newest `window` trees"""
+    n_before = len(rf.estimators_)
+    class_weight = rf.class_weight
+    if class_weight == 'balanced':
+        # Balance new trees on the wave itself ('balanced' is ambiguous under warm_start)
+        weights = compute_class_weight('balanced', classes=rf.classes_, y=y_new)
+        rf.set_params(class_weight=dict(zip(rf.classes_, weights)))
+    rf.set_params(warm_start=True, n_estimators=n_before + n_new_trees, n_jobs=n_jobs)
+    rf.fit(X_new, y_new)
+    
+    # Retire the oldest trees (estimators_ is in growth order)
+    retired = max(0, len(rf.estimators_) - window)
+    if retired:
+        rf.estimators_ = rf.estimators_[retired:]
+    rf.set_params(warm_start=False, n_estimators=len(rf.estimators_), n_jobs=None, class_weight=class_weight)
+    return retired
+
+
+def run(wave_path, n_new_trees=25, window=None, holdout=0.2, drift=True, n_jobs=None):
+    """Incrementally retrain all target models on a new survey wave"""
+    
+    print("\n" + "="*60)
+    print("INCREMENTAL RETRAINING")
+    print("="*60)
+    
+    # Load new wave (same columns as outputs/clustered_data.csv)
+    print("\n[R.1] Loading new survey wave...")
+    wave = pd.read_csv(wave_path)
+    X_wave = classification.build_feature_matrix(wave)
+    print(f"  ✓ Loaded {len(wave)} new records from {wave_path}")
+    
+    label_classes = classification.load_label_classes()
+    history = None
+    if os.path.exists('outputs/clustered_data.csv'):
+        history = pd.read_csv('outputs/clustered_data.csv')
+        X_history = classification.build_feature_matrix(history)
+    
+    lines, updated = [], 0
+    print(f"\n[R.2] Growing {n_new_trees} trees per model on the new wave...")
+    for target_col, model_name in classification.TARGETS:
+        path = classification.model_path(model_name)
+        rf, problem = load_forest(path)
+        if rf is None:
+            print(f"  ⚠ {model_name}: {problem}")
+            continue
+        classes = label_classes.get(target_col)
+        if classes is None:
+            print(f"  ⚠ {model_name}: no saved label classes, retrain with 4_classification_models first")
+            continue
+        
+        y_wave = encode_labels(wave[target_col].to_numpy().astype(str), classes)
+        
+        # Hold out part of the wave to measure drift against a full retrain
+        stratify = y_wave if np.bincount(y_wave).min() >= 2 else None
+        train_idx, test_idx = train_test_split(np.arange(len(y_wave)), test_size=holdout,
+                                               random_state=42, stratify=stratify)
+        
+        # warm_start refits the class set from y, so the wave must cover every class
+        if len(np.unique(y_wave[train_idx])) != len(rf.classes_):
+            print(f"  ⚠ {model_name}: wave lacks some of {classes}, skipped (full retrain required)")
+            continue
+        
+        start = time.perf_counter()
+        retired = grow_forest(rf, X_wave.iloc[train_idx], y_wave[train_idx], n_new_trees,
+                              window or len(rf.estimators_), n_jobs)
+        incremental_seconds = time.perf_counter() - start
+        incremental_acc = accuracy_score(y_wave[test_idx], rf.predict(X_wave.iloc[test_idx]))
+        joblib.dump(rf, path)
+        updated += 1
+        print(f"  ✓ {model_name}: +{n_new_trees} trees, -{retired} retired, "
+              f"{len(rf.estimators_)} total in {incremental_seconds:.2f}s → {path}")
+        
+        line = (f"{model_name:<24} incremental acc={incremental_acc:.4f} "
+                f"({incremental_seconds:.2f}s)")
+        
+        # Full retrain on history + wave for comparison
+        if drift and history is not None:
+            y_history = encode_labels(history[target_col].to_numpy().astype(str), classes)
+            X_full = pd.concat([X_history, X_wave.iloc[train_idx]], ignore_index=True)
+            y_full = np.concatenate([y_history, y_wave[train_idx]])
+            full = RandomForestClassifier(**classification.load_tuned_params(target_col),
+                                          class_weight='balanced', random_state=42, n_jobs=n_jobs)
+            start = time.perf_counter()
+            full.fit(X_full, y_full)
+            full_seconds = time.perf_counter() - start
+            full_acc = accuracy_score(y_wave[test_idx], full.predict(X_wave.iloc[test_idx]))
+            line += (f" | full retrain acc={full_acc:.4f} ({full_seconds:.2f}s)"
+                     f" | drift={incremental_acc - full_acc:+.4f}")
+        lines.append(line)
+    
+    # Drift report
+    print("\n[R.3] Accuracy on held-out wave rows:")
+    for line in lines:
+        print(f"  {line}")
+    
+    os.makedirs('outputs/results', exist_ok=True)
+    with open('outputs/results/incremental_retraining.txt', 'w') as f:
+        f.write("="*60 + "\n")
+        f.write("INCREMENTAL RETRAINING - ACCURACY DRIFT\n")
+        f.write("="*60 + "\n\n")
+        f.write(f"Wave: {wave_path} ({len(wave)} rows, {holdout:.0%} held out)\n")
+        f.write(f"Trees grown per model: {n_new_trees}, window: {window or 'current size'}\n\n")
+        f.write("\n".join(lines) + "\n")
+    print("\n✓ Report saved to: outputs/results/incremental_retraining.txt")
+    
+    # The fast tier's thresholds and the drift reference describe the old forests
+    if updated:
+        print("\n[R.4] Refreshing the drift reference and the distilled fast tier...")
+        refresh_dependents(pd.concat([X_history, X_wave], ignore_index=True) if history is not None else None)
+    
+    print("\n" + "="*60)
+    print("✓ INCREMENTAL RETRAINING COMPLETE")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Grow existing forests on a new survey wave')
+    parser.add_argument('wave', help='CSV of new responses with the clustered_data.csv columns')
+    parser.add_argument('--trees', type=int, default=25, help='trees grown per model (default: 25)')
+    parser.add_argument('--window', type=int, default=None,
+                        help='trees kept per model; oldest are retired (default: current size)')
+    parser.add_argument('--holdout', type=float, default=0.2, help='wave fraction held out for evaluation')
+    parser.add_argument('--skip-drift', action='store_true', help='skip the full-retrain comparison')
+    parser.add_argument('--n-jobs', type=int, default=None, help='cores used to grow trees')
+    args = parser.parse_args()
+    
+    run(args.wave, n_new_trees=args.trees, window=args.window, holdout=args.holdout,
+        drift=not args.skip_drift, n_jobs=args.n_jobs)
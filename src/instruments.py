@@ -0,0 +1,185 @@
+"""
+Questionnaire Instruments and Vectorized Scoring Engine
+Author: Sakhi Patel
+"""
+
+import numpy as np
+
+# Every item is answered on the same 0-4 frequency scale
+SCALE_MIN = 0
+SCALE_MAX = 4
+LEVELS = ['Low', 'Medium', 'High']
+CRISIS_THRESHOLD = 2
+
+# Declarative instrument definitions. Items are (survey column, short prompt, reverse-keyed);
+# a reverse-keyed answer x scores SCALE_MAX - x. Totals below cut_points[0] are Low,
+# below cut_points[1] Medium, otherwise High.
+INSTRUMENTS = {
+    'anxiety': {
+        'name': 'Anxiety',
+        'items': [
+            ('In a semester, how often you felt nervous, anxious or on edge due to academic pressure?',
+             'How often you felt nervous, anxious or on edge due to academic pressure?', False),
+            ('In a semester, how often have you been unable to stop worrying about your academic affairs?',
+             'How often have you been unable to stop worrying about your academic affairs?', False),
+            ('In a semester, how often have you had trouble relaxing due to academic pressure?',
+             'How often have you had trouble relaxing due to academic pressure?', False),
+            ('In a semester, how often have you been easily annoyed or irritated because of academic pressure?',
+             'How often have you been easily annoyed or irritated because of academic pressure?', False),
+            ('In a semester, how often have you worried too much about academic affairs?',
+             'How often have you worried too much about academic affairs?', False),
+            ('In a semester, how often have you been so restless due to academic pressure that it is hard to sit still?',
+             'How often have you been so restless that it is hard to sit still?', False),
+            ('In a semester, how often have you felt afraid, as if something awful might happen?',
+             'How often have you felt afraid, as if something awful might happen?', False)
+        ],
+        'max_score': 28,
+        'cut_points': [18, 35],
+        'crisis_item': None,
+        'value_col': 'Anxiety Value',
+        'label_col': 'Anxiety Label',
+        'interpretations': {
+            'Low': 'You appear to have minimal anxiety related to academics.',
+            'Medium': 'You are experiencing moderate levels of academic anxiety.',
+            'High': 'You are experiencing high levels of academic anxiety.'
+        },
+        'recommendations': {
+            'Low': 'Keep up your positive mindset and healthy habits.',
+            'Medium': 'Try relaxation techniques, mindfulness, or breathing exercises. Consider talking to someone you trust.',
+            'High': 'Please consider seeking professional help from a counselor or mental health professional.'
+        }
+    },
+    'stress': {
+        'name': 'Stress',
+        'items': [
+            ('In a semester, how often have you felt upset due to something that happened in your academic affairs?',
+             'How often have you felt upset due to something in your academic affairs?', False),
+            ('In a semester, how often you felt as if you were unable to control important things in your academic affairs?',
+             'How often you felt unable to control important things in your academic affairs?', False),
+            ('In a semester, how often you felt nervous and stressed because of academic pressure?',
+             'How often you felt nervous and stressed because of academic pressure?', False),
+            ('In a semester, how often you felt as if you could not cope with all the mandatory academic activities?',
+             'How often you felt you could not cope with all mandatory academic activities?', False),
+            ('In a semester, how often you felt confident about your ability to handle your academic problems?',
+             'How often you felt confident about your ability to handle academic problems?', True),
+            ('In a semester, how often you felt as if things in your academic life are going your way?',
+             'How often you felt things in your academic life are going your way?', True),
+            ('In a semester, how often are you able to control irritations in your academic affairs?',
+             'How often are you able to control irritations in your academic affairs?', True),
+            ('In a semester, how often you felt as if your academic performance was on top?',
+             'How often you felt your academic performance was on top?', True),
+            ('In a semester, how often you got angered due to bad performance or low grades that are beyond your control?',
+             'How often you got angered due to bad performance beyond your control?', False),
+            ('In a semester, how often you felt as if academic difficulties are piling up so high that you could not overcome them?',
+             'How often you felt academic difficulties are piling up too high to overcome?', False)
+        ],
+        'max_score': 40,
+        'cut_points': [18, 35],
+        'crisis_item': None,
+        'value_col': 'Stress Value',
+        'label_col': 'Stress Label',
+        'interpretations': {
+            'Low': 'You appear to be managing academic stress well.',
+            'Medium': 'You are experiencing moderate levels of academic stress.',
+            'High': 'You are experiencing high levels of academic stress.'
+        },
+        'recommendations': {
+            'Low': 'Continue your current coping strategies and maintain work-life balance.',
+            'Medium': 'Consider stress management techniques like time management, exercise, and talking to friends or counselors.',
+            'High': 'It\'s important to seek support. Consider talking to a counselor, academic advisor, or mental health professional.'
+        }
+    },
+    'depression': {
+        'name': 'Depression',
+        'items': [
+            ('In a semester, how often have you had little interest or pleasure in doing things?',
+             'How often have you had little interest or pleasure in doing things?', False),
+            ('In a semester, how often have you been feeling down, depressed or hopeless?',
+             'How often have you been feeling down, depressed or hopeless?', False),
+            ('In a semester, how often have you had trouble falling or staying asleep, or sleeping too much?',
+             'How often have you had trouble falling or staying asleep, or sleeping too much?', False),
+            ('In a semester, how often have you been feeling tired or having little energy?',
+             'How often have you been feeling tired or having little energy?', False),
+            ('In a semester, how often have you had poor appetite or overeating?',
+             'How often have you had poor appetite or overeating?', False),
+            ('In a semester, how often have you been feeling bad about yourself - or that you are a failure or have let yourself or your family down?',
+             'How often have you been feeling bad about yourself or that you are a failure?', False),
+            ('In a semester, how often have you been having trouble concentrating on things, such as reading books or watching television?',
+             'How often have you been having trouble concentrating on things?', False),
+            ('In a semester, how often have you moved or spoke too slowly for other people to notice?',
+             'How often have you moved or spoke too slowly for others to notice?', False),
+            ('In a semester, how often have you had thoughts that you would be better off dead, or of hurting yourself?',
+             'How often have you had thoughts that you would be better off dead?', False)
+        ],
+        'max_score': 36,
+        'cut_points': [18, 35],
+        'crisis_item': 8,  # self-harm item; answers >= CRISIS_THRESHOLD raise a crisis flag
+        'value_col': 'Depression Value',
+        'label_col': 'Depression Label',
+        'interpretations': {
+            'Low': 'You appear to have minimal depressive symptoms.',
+            'Medium': 'You are experiencing moderate depressive symptoms.',
+            'High': 'You are experiencing significant depressive symptoms.'
+        },
+        'recommendations': {
+            'Low': 'Continue taking care of your mental health through self-care and social connections.',
+            'Medium': 'Consider reaching out to a counselor, therapist, or trusted person. Professional support can be very helpful.',
+            'High': 'Please seek professional help immediately. Contact a mental health professional or crisis helpline.'
+        }
+    }
+}
+
+
+def columns(key):
+    """Survey column names of an instrument's items, in order"""
+    return [column for column, _, _ in INSTRUMENTS[key]['items']]
+
+
+def reverse_mask(key):
+    """Boolean mask of reverse-keyed items"""
+    return np.array([reverse for _, _, reverse in INSTRUMENTS[key]['items']])
+
+
+def score(key, responses):
+    """Score N respondents at once: responses is (N, n_items) or one (n_items,) row of whole 0-4 answers
+    
+    Returns {'total', 'level', 'crisis'} arrays of length N (crisis is all False without a crisis item).
+    """
+    instrument = INSTRUMENTS[key]
+    answers = np.atleast_2d(np.asarray(responses))
+    n_items = len(instrument['items'])
+    if answers.ndim != 2 or answers.shape[1] != n_items:
+        raise ValueError(f"{instrument['name']} expects {n_items} responses per respondent")
+    if answers.size and (answers.min() < SCALE_MIN or answers.max() > SCALE_MAX):
+        raise ValueError(f"Responses must be between {SCALE_MIN} and {SCALE_MAX}")
+    if (answers != np.round(answers)).any():
+        raise ValueError(f"Responses must be whole numbers between {SCALE_MIN} and {SCALE_MAX}")
+    
+    reverse = reverse_mask(key)
+    total = np.where(reverse, SCALE_MIN + SCALE_MAX - answers, answers).sum(axis=1)
+    level = np.array(LEVELS, dtype=object)[np.searchsorted(instrument['cut_points'], total, side='right')]
+    if instrument['crisis_item'] is None:
+        crisis = np.zeros(len(answers), dtype=bool)
+    else:
+        crisis = answers[:, instrument['crisis_item']] >= CRISIS_THRESHOLD
+    return {'total': total, 'level': level, 'crisis': crisis}
+
+
+def score_frame(df, key):
+    """Score the instrument's item columns of a survey DataFrame"""
+    return score(key, df[columns(key)].to_numpy())
+
+
+def assess(key, responses):
+    """Full result for one respondent: score, max score, level, interpretation, recommendation, crisis"""
+    instrument = INSTRUMENTS[key]
+    result = score(key, responses)
+    level = result['level'][0]
+    return {
+        'score': int(result['total'][0]),
+        'max_score': instrument['max_score'],
+        'level': level,
+        'interpretation': instrument['interpretations'][level],
+        'recommendation': instrument['recommendations'][level],
+        'crisis': bool(result['crisis'][0])
+    }
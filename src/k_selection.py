@@ -0,0 +1,81 @@
+"""
+Parallel K Selection Sweep for K-Means (cached scaled matrix)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+from joblib import Parallel, delayed
+import hashlib
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.cluster_quality import sampled_silhouette, EXACT_SILHOUETTE_MAX_ROWS
+
+CACHE_DIR = 'outputs/cache'
+K_RANGE = range(2, 11)
+SELECTION_RULES = ['silhouette', 'elbow']
+
+
+def cached_scaled_matrix(df, features, cache_dir=CACHE_DIR):
+    """Standardize features once and cache the matrix on disk, keyed by the input data"""
+    key = hashlib.sha256(pd.util.hash_pandas_object(df[features], index=False).values.tobytes()).hexdigest()[:16]
+    matrix_path = os.path.join(cache_dir, f'scaled_{key}.npy')
+    if not os.path.exists(matrix_path):
+        os.makedirs(cache_dir, exist_ok=True)
+        np.save(matrix_path, StandardScaler().fit_transform(df[features]))
+    return matrix_path
+
+
+def fit_k(matrix_path, k, exact_max_rows=EXACT_SILHOUETTE_MAX_ROWS, seed=42):
+    """Fit K-Means for one k on the cached matrix; return centers, inertia and silhouette"""
+    X = np.load(matrix_path, mmap_mode='r')
+    kmeans = KMeans(n_clusters=k, random_state=seed, n_init=10).fit(X)
+    if len(X) <= exact_max_rows:
+        silhouette = float(silhouette_score(X, kmeans.labels_))
+    else:
+        silhouette = sampled_silhouette(X, kmeans.labels_, seed=seed)['value']
+    return {'k': k, 'inertia': float(kmeans.inertia_), 'silhouette': silhouette,
+            'centers': kmeans.cluster_centers_}
+
+
+def sweep(matrix_path, k_values=K_RANGE, n_jobs=-1, exact_max_rows=EXACT_SILHOUETTE_MAX_ROWS):
+    """Fit every candidate k in parallel over the same cached matrix (workers memory-map it)"""
+    results = Parallel(n_jobs=n_jobs)(delayed(fit_k)(matrix_path, k, exact_max_rows) for k in k_values)
+    return sorted(results, key=lambda r: r['k'])
+
+
+def choose_k(results, rule='silhouette'):
+    """Pick k by the highest silhouette, or by the elbow (knee) of the inertia curve"""
+    if rule == 'silhouette':
+        return max(results, key=lambda r: r['silhouette'])['k']
+    if rule == 'elbow':
+        # Knee: point farthest below the chord from the first to the last normalized inertia
+        k = np.array([r['k'] for r in results], dtype=float)
+        inertia = np.array([r['inertia'] for r in results])
+        x = (k - k[0]) / (k[-1] - k[0])
+        y = (inertia - inertia[-1]) / (inertia[0] - inertia[-1])
+        return int(k[np.argmax((1 - x) - y)])
+    raise ValueError(f"Unknown k selection rule: {rule} (choose from {SELECTION_RULES})")
+
+
+def write_report(results, chosen_k, rule, output_dir='outputs/results'):
+    """Write the elbow / silhouette table as text and JSON"""
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'k_selection.txt'), 'w') as f:
+        f.write("="*60 + "\n")
+        f.write("K-MEANS K SELECTION (ELBOW / SILHOUETTE)\n")
+        f.write("="*60 + "\n\n")
+        f.write(f"{'k':>3} | {'inertia':>12} | {'silhouette':>10}\n")
+        for r in results:
+            marker = '  ← chosen' if r['k'] == chosen_k else ''
+            f.write(f"{r['k']:>3} | {r['inertia']:>12.2f} | {r['silhouette']:>10.4f}{marker}\n")
+        f.write(f"\nRule: {rule} → k={chosen_k}\n")
+    with open(os.path.join(output_dir, 'k_selection.json'), 'w') as f:
+        json.dump({'rule': rule, 'chosen_k': chosen_k,
+                   'results': [{key: r[key] for key in ('k', 'inertia', 'silhouette')} for r in results]},
+                  f, indent=2)
@@ -0,0 +1,174 @@
+"""
+Out-of-Core K-Means Engine (streamed scaling, map-reduce Lloyd iterations, mini-batch mode)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+from sklearn.cluster import kmeans_plusplus, MiniBatchKMeans
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+
+FEATURES = ['Age', 'Gender', 'Current CGPA', 'Scholarship', 'Academic Year']
+CACHE_DIR = 'outputs/cache'
+CHUNKSIZE = 100000
+
+
+def merge_moments(a, b):
+    """Merge (count, mean, M2) moments of two chunks (Chan et al.)"""
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    if n == 0:
+        return a
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta**2 * n_a * n_b / n
+    return n, mean, m2
+
+
+def stream_to_scaled_matrix(csv_path, features=FEATURES, chunksize=CHUNKSIZE, cache_dir=CACHE_DIR):
+    """One CSV pass: copy features to an on-disk matrix and accumulate scaling statistics, then standardize in place"""
+    os.makedirs(cache_dir, exist_ok=True)
+    raw_path = os.path.join(cache_dir, 'kmeans_raw.npy')
+    matrix_path = os.path.join(cache_dir, 'kmeans_scaled.npy')
+    d = len(features)
+    
+    # Single pass over the CSV; chunks are spilled to disk as they arrive
+    moments = (0, np.zeros(d), np.zeros(d))
+    with open(raw_path, 'wb') as raw:
+        for chunk in pd.read_csv(csv_path, usecols=features, chunksize=chunksize):
+            X = chunk[features].to_numpy(dtype=np.float64)
+            moments = merge_moments(moments, (len(X), X.mean(axis=0), ((X - X.mean(axis=0))**2).sum(axis=0)))
+            raw.write(X.tobytes())
+    n, mean, m2 = moments
+    scale = np.sqrt(m2 / n)
+    scale[scale == 0] = 1.0  # same convention as StandardScaler
+    
+    # Standardize chunk by chunk into a memory-mapped .npy
+    raw = np.memmap(raw_path, dtype=np.float64, mode='r', shape=(n, d))
+    scaled = np.lib.format.open_memmap(matrix_path, mode='w+', dtype=np.float64, shape=(n, d))
+    for start in range(0, n, chunksize):
+        scaled[start:start + chunksize] = (raw[start:start + chunksize] - mean) / scale
+    scaled.flush()
+    del raw, scaled
+    os.remove(raw_path)
+    return matrix_path, mean, scale
+
+
+def _squared_distances(X, centers):
+    """Squared Euclidean distances between rows and centers"""
+    d2 = (X**2).sum(axis=1)[:, None] - 2 * X @ centers.T + (centers**2).sum(axis=1)[None, :]
+    return np.maximum(d2, 0)
+
+
+def _map_partial_sums(matrix_path, start, stop, centers):
+    """Map step: per-restart, per-centroid sums, counts and inertia for one chunk"""
+    X = np.load(matrix_path, mmap_mode='r')[start:stop]
+    n_restarts, k, d = centers.shape
+    sums = np.zeros((n_restarts, k, d))
+    counts = np.zeros((n_restarts, k))
+    inertia = np.zeros(n_restarts)
+    for r in range(n_restarts):
+        d2 = _squared_distances(X, centers[r])
+        labels = d2.argmin(axis=1)
+        counts[r] = np.bincount(labels, minlength=k)
+        for j in range(d):
+            sums[r, :, j] = np.bincount(labels, weights=X[:, j], minlength=k)
+        inertia[r] = d2[np.arange(len(X)), labels].sum()
+    return sums, counts, inertia
+
+
+def _map_labels(matrix_path, start, stop, centers):
+    """Final map step: nearest-center labels and inertia for one chunk"""
+    X = np.load(matrix_path, mmap_mode='r')[start:stop]
+    d2 = _squared_distances(X, centers)
+    labels = d2.argmin(axis=1)
+    return labels.astype(np.int32), float(d2[np.arange(len(X)), labels].sum())
+
+
+def _init_centers(X_sample, n_clusters, n_init, seed):
+    """k-means++ seeds for every restart, drawn from a row sample"""
+    seeds = np.random.default_rng(seed).integers(0, 2**31 - 1, size=n_init)
+    return np.stack([kmeans_plusplus(X_sample, n_clusters, random_state=int(s))[0] for s in seeds])
+
+
+def lloyd_mapreduce(matrix_path, n_clusters=4, n_init=10, max_iter=300, tol=1e-4,
+                    chunksize=CHUNKSIZE, n_jobs=None, seed=42, init_sample=10000):
+    """Lloyd iterations as map-reduce over row chunks; all restarts advance in the same pool"""
+    X = np.load(matrix_path, mmap_mode='r')
+    n = len(X)
+    chunks = [(start, min(start + chunksize, n)) for start in range(0, n, chunksize)]
+    
+    rng = np.random.default_rng(seed)
+    sample_idx = np.sort(rng.choice(n, size=min(n, init_sample), replace=False))
+    centers = _init_centers(np.asarray(X[sample_idx]), n_clusters, n_init, seed)
+    # Same relative tolerance as sklearn: tol * mean feature variance
+    abs_tol = tol * float(np.mean(np.asarray(X[sample_idx]).var(axis=0)))
+    
+    active = np.arange(n_init)
+    inertia = np.full(n_init, np.inf)
+    n_iter = np.zeros(n_init, dtype=int)
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        for _ in range(max_iter):
+            if len(active) == 0:
+                break
+            # Map: each chunk is read once for every active restart
+            futures = [pool.submit(_map_partial_sums, matrix_path, start, stop, centers[active])
+                       for start, stop in chunks]
+            # Reduce in chunk order, so results do not depend on the worker count
+            sums, counts, chunk_inertia = (np.sum(parts, axis=0) for parts in zip(*(f.result() for f in futures)))
+            
+            new_centers = centers[active].copy()
+            filled = counts > 0  # empty clusters keep their previous center
+            new_centers[filled] = sums[filled] / counts[filled][:, None]
+            shift = ((new_centers - centers[active])**2).sum(axis=(1, 2))
+            centers[active] = new_centers
+            inertia[active] = chunk_inertia
+            n_iter[active] += 1
+            active = active[shift > abs_tol]
+    
+    best = int(np.argmin(inertia))
+    return centers[best], int(n_iter[best])
+
+
+def minibatch_fit(matrix_path, n_clusters=4, chunksize=CHUNKSIZE, epochs=3, seed=42):
+    """Mini-batch k-means streamed over memory-mapped chunks (for the largest inputs)"""
+    X = np.load(matrix_path, mmap_mode='r')
+    model = MiniBatchKMeans(n_clusters=n_clusters, random_state=seed, n_init=3)
+    for _ in range(epochs):
+        for start in range(0, len(X), chunksize):
+            model.partial_fit(np.asarray(X[start:start + chunksize]))
+    return model.cluster_centers_, model.n_steps_
+
+
+def assign_labels(matrix_path, centers, chunksize=CHUNKSIZE, n_jobs=None):
+    """Label every row with its nearest center, chunk by chunk across the pool"""
+    n = len(np.load(matrix_path, mmap_mode='r'))
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = [pool.submit(_map_labels, matrix_path, start, min(start + chunksize, n), centers)
+                   for start in range(0, n, chunksize)]
+        results = [f.result() for f in futures]
+    return np.concatenate([labels for labels, _ in results]), sum(inertia for _, inertia in results)
+
+
+def fit_streaming_kmeans(csv_path, features=FEATURES, n_clusters=4, n_init=10, max_iter=300, tol=1e-4,
+                         chunksize=CHUNKSIZE, n_jobs=None, mode='mapreduce', seed=42, scaled=None):
+    """Fit k-means on a CSV without materializing it: streamed scaling, then map-reduce Lloyd or mini-batch
+    
+    scaled: (matrix_path, mean, scale) already returned by stream_to_scaled_matrix, to skip the scaling pass.
+    """
+    start = time.perf_counter()
+    matrix_path, mean, scale = scaled or stream_to_scaled_matrix(csv_path, features, chunksize)
+    if mode == 'minibatch':
+        centers, n_iter = minibatch_fit(matrix_path, n_clusters, chunksize, seed=seed)
+    else:
+        centers, n_iter = lloyd_mapreduce(matrix_path, n_clusters, n_init, max_iter, tol,
+                                          chunksize, n_jobs, seed)
+    labels, inertia = assign_labels(matrix_path, centers, chunksize, n_jobs)
+    return {
+        'centers': centers, 'labels': labels, 'inertia': inertia, 'n_iter': n_iter,
+        'mean': mean, 'scale': scale, 'matrix_path': matrix_path,
+        'seconds': time.perf_counter() - start
+    }
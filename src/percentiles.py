@@ -0,0 +1,91 @@
+"""
+Percentile Ranks from Presorted Score Arrays (global and per cohort)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+from src.stats_cube import DIMENSIONS
+
+# Request key -> column ranked
+RANK_METRICS = {
+    'anxiety': 'Anxiety Value',
+    'stress': 'Stress Value',
+    'depression': 'Depression Value',
+    'cgpa': 'Current CGPA'
+}
+
+
+def build_rank_index(df):
+    """Sorted copy of every metric for the whole dataset and for each value of each cohort dimension"""
+    index = {'all': {key: np.sort(df[col].to_numpy(dtype=np.float64)) for key, col in RANK_METRICS.items()},
+             'cohorts': {}}
+    for dim, col in DIMENSIONS.items():
+        codes, values = pd.factorize(df[col], sort=True)
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(values)))])
+        groups = {str(value): {} for value in values}
+        for key, metric in RANK_METRICS.items():
+            scores = df[metric].to_numpy(dtype=np.float64)
+            # Sort by (cohort, score) once, then slice each cohort's run
+            ordered = scores[np.lexsort((scores, codes))]
+            for i, value in enumerate(values):
+                groups[str(value)][key] = ordered[bounds[i]:bounds[i + 1]]
+        index['cohorts'][dim] = groups
+    return index
+
+
+def percentile_rank(sorted_scores, scores):
+    """Percent of the cohort below each score, counting ties as half (binary search, O(log n) per score)"""
+    scores = np.asarray(scores, dtype=np.float64)
+    if len(sorted_scores) == 0:
+        return np.full(scores.shape, np.nan)
+    below = np.searchsorted(sorted_scores, scores, side='left')
+    at_or_below = np.searchsorted(sorted_scores, scores, side='right')
+    return 100 * (below + at_or_below) / (2 * len(sorted_scores))
+
+
+def rank_scores(index, scores, cohort=None):
+    """{metric: [{'score', 'percentile': {'all', <dimension>...}}]} for lists of scores
+    
+    cohort maps a dimension to one value, e.g. {'university': 'Duke University'}; each score is also
+    ranked within that cohort. Unknown metrics, dimensions or values raise ValueError.
+    """
+    cohort = cohort or {}
+    groups = {}
+    for dim, value in cohort.items():
+        if dim not in index['cohorts']:
+            raise ValueError(f"Unknown cohort {dim!r}, expected one of {list(DIMENSIONS)}")
+        if str(value) not in index['cohorts'][dim]:
+            raise ValueError(f"Unknown {dim} {value!r}, expected one of {list(index['cohorts'][dim])}")
+        groups[dim] = index['cohorts'][dim][str(value)]
+    
+    ranks = {}
+    for key, values in scores.items():
+        if key not in RANK_METRICS:
+            raise ValueError(f"Unknown metric {key!r}, expected one of {list(RANK_METRICS)}")
+        try:
+            values = np.atleast_1d(np.asarray(values, dtype=np.float64))
+        except (TypeError, ValueError):
+            values = np.array([np.nan])
+        if values.ndim != 1 or not np.isfinite(values).all():
+            raise ValueError(f"{key} scores must be numbers")
+        columns = {'all': percentile_rank(index['all'][key], values)}
+        for dim, group in groups.items():
+            columns[dim] = percentile_rank(group[key], values)
+        ranks[key] = [{'score': float(v), 'percentile': {name: _json_float(p[i]) for name, p in columns.items()}}
+                      for i, v in enumerate(values)]
+    return ranks
+
+
+def cohort_sizes(index, cohort=None):
+    """Number of rows behind each ranking: {'all': n, <dimension>: n}"""
+    any_metric = next(iter(RANK_METRICS))
+    sizes = {'all': len(index['all'][any_metric])}
+    for dim, value in (cohort or {}).items():
+        sizes[dim] = len(index['cohorts'][dim][str(value)][any_metric])
+    return sizes
+
+
+def _json_float(value):
+    """Rounded float for JSON, with NaN (empty cohort) as None"""
+    return None if np.isnan(value) else round(float(value), 2)
@@ -0,0 +1,241 @@
+"""
+Multi-Scale Pipeline Benchmark (per-stage wall time, CPU time and peak RSS)
+Author: Sakhi Patel
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import generate_data
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = 'outputs/benchmark'
+RESULTS_PATH = 'outputs/results/pipeline_benchmark.json'
+BASELINE_PATH = 'outputs/results/pipeline_benchmark_baseline.json'
+DEFAULT_ROWS = [1000, 100000, 1000000, 10000000]
+STAGES = ['1_data_preprocessing', '2_exploratory_analysis', '3_clustering_analysis', '4_classification_models']
+METRICS = ['wall_seconds', 'cpu_seconds', 'peak_rss_mb']
+
+# A metric regresses when it grows by more than TOLERANCE and by more than its noise floor
+TOLERANCE = 0.25
+NOISE_FLOOR = {'wall_seconds': 0.5, 'cpu_seconds': 0.5, 'peak_rss_mb': 25.0}
+
+# Each stage runs in a fresh interpreter inside the workspace, so imports and memory are isolated
+STAGE_RUNNER = """
+import importlib, json, sys
+sys.path.insert(0, {root!r})
+importlib.import_module('src.{stage}').run(**json.loads({kwargs!r}))
+"""
+
+
+def stage_kwargs(stage, plots, cluster_engine, n_jobs):
+    """Arguments passed to each stage's run()"""
+    if stage == '1_data_preprocessing':
+        return {}
+    if stage == '2_exploratory_analysis':
+        return {'plots': plots}
+    if stage == '3_clustering_analysis':
+        return {'plots': plots, 'engine': cluster_engine, 'n_jobs': n_jobs}
+    return {'plots': plots, 'n_jobs': n_jobs}
+
+
+def measure_command(cmd, cwd, log_path, timeout=None):
+    """Run a child process; wall time, plus CPU time and peak RSS from its own rusage (wait4)"""
+    env = dict(os.environ, MPLBACKEND='Agg')
+    with open(log_path, 'w') as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=log, stderr=subprocess.STDOUT, env=env)
+        timer = threading.Timer(timeout, proc.kill) if timeout else None
+        if timer:
+            timer.start()
+        # wait4 rather than proc.wait(): it returns this child's resource usage
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start
+        if timer:
+            timer.cancel()
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    
+    if proc.returncode == 0:
+        state = 'ok'
+    elif timeout and wall >= timeout:
+        state = 'timeout'
+    else:
+        state = 'failed'
+    return {
+        'status': state,
+        'wall_seconds': round(wall, 3),
+        'cpu_seconds': round(usage.ru_utime + usage.ru_stime, 3),
+        'peak_rss_mb': round(usage.ru_maxrss / 1024, 1)  # ru_maxrss is in KB on Linux
+    }
+
+
+def prepare_workspace(n_rows, seed, n_jobs):
+    """Per-scale working directory with its own data/ and outputs/, dataset generated once and reused"""
+    workspace = os.path.abspath(os.path.join(BENCHMARK_DIR, f'rows_{n_rows}'))
+    for sub in ('data', 'outputs/visualizations', 'outputs/models', 'outputs/results', 'logs'):
+        os.makedirs(os.path.join(workspace, sub), exist_ok=True)
+    
+    data_path = os.path.join(workspace, 'data', 'student_mental_health_survey.csv')
+    marker = data_path + '.json'
+    spec = {'rows': n_rows, 'seed': seed, 'chunksize': generate_data.CHUNKSIZE}
+    if os.path.exists(marker) and os.path.exists(data_path):
+        with open(marker) as f:
+            if json.load(f) == spec:
+                return workspace, None
+    
+    start = time.perf_counter()
+    generate_data.write_synthetic_data(data_path, n_rows, seed=seed, n_jobs=n_jobs)
+    with open(marker, 'w') as f:
+        json.dump(spec, f)
+    return workspace, round(time.perf_counter() - start, 3)
+
+
+def run_scale(n_rows, seed=42, plots=False, cluster_engine='sklearn', n_jobs=None, timeout=None):
+    """Benchmark every stage in order at one dataset size"""
+    workspace, generate_seconds = prepare_workspace(n_rows, seed, n_jobs)
+    if generate_seconds is None:
+        print(f"  ✓ Reusing dataset: {workspace}/data")
+    else:
+        print(f"  ✓ Generated {n_rows:,} rows in {generate_seconds:.2f}s")
+    
+    stages = {}
+    for stage in STAGES:
+        # Stages read the previous stage's outputs, so one failure skips the rest
+        if any(r['status'] != 'ok' for r in stages.values()):
+            stages[stage] = {'status': 'skipped'}
+            print(f"  - {stage:<26} skipped")
+            continue
+        code = STAGE_RUNNER.format(root=ROOT, stage=stage,
+                                   kwargs=json.dumps(stage_kwargs(stage, plots, cluster_engine, n_jobs)))
+        result = measure_command([sys.executable, '-c', code], workspace,
+                                 os.path.join(workspace, 'logs', f'{stage}.log'), timeout)
+        stages[stage] = result
+        marker = '✓' if result['status'] == 'ok' else '⚠'
+        print(f"  {marker} {stage:<26} {result['status']:<8} wall={result['wall_seconds']:>8.2f}s "
+              f"cpu={result['cpu_seconds']:>8.2f}s peak={result['peak_rss_mb']:>8.1f} MB")
+    return {'generate_seconds': generate_seconds, 'stages': stages}
+
+
+def compare(current, baseline, tolerance=TOLERANCE):
+    """Regressions of current vs baseline: (rows, stage, metric, baseline, current) tuples"""
+    regressions = []
+    for rows, scale in current['scales'].items():
+        base_scale = baseline['scales'].get(rows)
+        if base_scale is None:
+            continue
+        for stage, result in scale['stages'].items():
+            base = base_scale['stages'].get(stage)
+            if base is None:
+                continue
+            if base['status'] == 'ok' and result['status'] != 'ok':
+                regressions.append((rows, stage, 'status', base['status'], result['status']))
+                continue
+            if result['status'] != 'ok' or base['status'] != 'ok':
+                continue
+            for metric in METRICS:
+                old, new = base[metric], result[metric]
+                if new > old * (1 + tolerance) and new - old > NOISE_FLOOR[metric]:
+                    regressions.append((rows, stage, metric, old, new))
+    return regressions
+
+
+def format_results(results):
+    """Text table of one benchmark run"""
+    lines = [f"{'rows':>10} | {'stage':<26} | {'status':<8} | {'wall (s)':>9} | {'cpu (s)':>9} | {'peak MB':>8}"]
+    for rows, scale in results['scales'].items():
+        for stage, r in scale['stages'].items():
+            if r['status'] == 'skipped':
+                lines.append(f"{int(rows):>10} | {stage:<26} | {'skipped':<8} |")
+                continue
+            lines.append(f"{int(rows):>10} | {stage:<26} | {r['status']:<8} | {r['wall_seconds']:>9.2f} | "
+                         f"{r['cpu_seconds']:>9.2f} | {r['peak_rss_mb']:>8.1f}")
+    return lines
+
+
+def run(row_counts=DEFAULT_ROWS, seed=42, plots=False, cluster_engine='sklearn', n_jobs=None,
+        timeout=None, compare_to=None, save_baseline=False, tolerance=TOLERANCE):
+    """Benchmark the pipeline at each dataset size, then optionally compare against a baseline"""
+    
+    print("\n" + "="*60)
+    print("PIPELINE BENCHMARK")
+    print("="*60)
+    
+    results = {
+        'version': 1,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'platform': {'python': platform.python_version(), 'machine': platform.machine(),
+                     'cpu_count': os.cpu_count()},
+        'settings': {'seed': seed, 'plots': plots, 'cluster_engine': cluster_engine, 'n_jobs': n_jobs,
+                     'timeout': timeout},
+        'scales': {}
+    }
+    for i, n_rows in enumerate(row_counts, 1):
+        print(f"\n[B.{i}] {n_rows:,} rows")
+        results['scales'][str(n_rows)] = run_scale(n_rows, seed, plots, cluster_engine, n_jobs, timeout)
+    
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    with open(RESULTS_PATH, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results saved to: {RESULTS_PATH}")
+    
+    lines = format_results(results)
+    regressions = None
+    if compare_to:
+        with open(compare_to) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, tolerance)
+        print(f"\n[B.{len(row_counts) + 1}] Comparison against {compare_to} (tolerance {tolerance:.0%}):")
+        lines += ["", f"Baseline: {compare_to} ({baseline.get('created', 'unknown date')})"]
+        if regressions:
+            for rows, stage, metric, old, new in regressions:
+                line = f"REGRESSION {int(rows):>10} rows | {stage:<26} | {metric:<12} {old} → {new}"
+                print(f"  ⚠ {line}")
+                lines.append(line)
+        else:
+            print("  ✓ No regressions")
+            lines.append("No regressions")
+    
+    with open(RESULTS_PATH.replace('.json', '.txt'), 'w') as f:
+        f.write("="*60 + "\n")
+        f.write("PIPELINE BENCHMARK - STAGE TIME AND PEAK MEMORY VS ROWS\n")
+        f.write("="*60 + "\n\n")
+        f.write("\n".join(lines) + "\n")
+    
+    if save_baseline:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Baseline saved to: {BASELINE_PATH}")
+    
+    print("\n" + "="*60)
+    print("✓ PIPELINE BENCHMARK COMPLETE")
+    print("="*60)
+    
+    return results, regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark each pipeline stage at several dataset sizes')
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS,
+                        help='dataset sizes (default: 1k 100k 1M 10M)')
+    parser.add_argument('--seed', type=int, default=42, help='generator seed')
+    parser.add_argument('--plots', action='store_true', help='include figure rendering (off by default)')
+    parser.add_argument('--cluster-engine', choices=['sklearn', 'mapreduce', 'minibatch'], default='sklearn',
+                        help='K-Means engine used by stage 3')
+    parser.add_argument('--n-jobs', type=int, default=None, help='core budget for generation and stages')
+    parser.add_argument('--timeout', type=float, default=None, help='per-stage timeout in seconds')
+    parser.add_argument('--compare', nargs='?', const=BASELINE_PATH, default=None, metavar='BASELINE',
+                        help=f'flag regressions against a stored run (default: {BASELINE_PATH})')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='relative slowdown flagged (default: 0.25)')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    args = parser.parse_args()
+    
+    _, regressions = run(args.rows, args.seed, args.plots, args.cluster_engine, args.n_jobs, args.timeout,
+                         args.compare, args.save_baseline, args.tolerance)
+    sys.exit(1 if regressions else 0)
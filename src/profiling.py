@@ -0,0 +1,154 @@
+"""
+Per-Stage Pipeline Profiling (wall/CPU timers, tracemalloc peaks, optional cProfile)
+Author: Sakhi Patel
+"""
+
+import cProfile
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import pstats
+import time
+import tracemalloc
+
+PROFILE_DIR = 'outputs/results/profile'
+REPORT_JSON = 'outputs/results/profile_report.json'
+REPORT_TXT = 'outputs/results/profile_report.txt'
+TOP_FUNCTIONS = 15
+
+# Module-level session, like utils.PLOT_STATS; step() is a no-op until start() is called
+SESSION = {'enabled': False, 'cprofile': False, 'stages': [], 'current': None}
+
+
+def start(use_cprofile=False):
+    """Begin a profiling session (tracemalloc on; cProfile per stage if requested)"""
+    SESSION.update({'enabled': True, 'cprofile': use_cprofile, 'stages': [], 'current': None,
+                    'started': datetime.datetime.now().isoformat(timespec='seconds')})
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def stop():
+    """End the session and stop tracemalloc"""
+    SESSION['enabled'] = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _counters():
+    """Wall clock, process CPU time (all threads), traced memory now and its peak since the last reset"""
+    current, peak = tracemalloc.get_traced_memory()
+    return time.perf_counter(), time.process_time(), current, peak
+
+
+def _close_step(stage):
+    """Finish the open sub-step of a stage and reset the allocation peak for the next one"""
+    wall, cpu, _, peak = _counters()
+    step = stage['open_step']
+    stage['peak_bytes'] = max(stage['peak_bytes'], peak)
+    if step is not None:
+        stage['steps'].append({'name': step['name'],
+                               'wall_seconds': round(wall - step['wall'], 4),
+                               'cpu_seconds': round(cpu - step['cpu'], 4),
+                               'peak_mb': round(peak / 2**20, 2),
+                               'peak_growth_mb': round((peak - step['memory']) / 2**20, 2)})
+    tracemalloc.reset_peak()
+
+
+def step(name):
+    """Mark the start of a sub-step inside the running stage (ends the previous sub-step)"""
+    stage = SESSION['current']
+    if not SESSION['enabled'] or stage is None:
+        return
+    _close_step(stage)
+    wall, cpu, memory, _ = _counters()
+    stage['open_step'] = {'name': name, 'wall': wall, 'cpu': cpu, 'memory': memory}
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Time one pipeline stage; sub-steps inside it are marked with step()"""
+    if not SESSION['enabled']:
+        yield
+        return
+    tracemalloc.reset_peak()
+    current = {'name': name, 'steps': [], 'open_step': None, 'peak_bytes': 0}
+    SESSION['current'] = current
+    profiler = cProfile.Profile() if SESSION['cprofile'] else None
+    wall, cpu, memory, _ = _counters()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        _close_step(current)
+        end_wall, end_cpu, _, _ = _counters()
+        record = {'name': name,
+                  'wall_seconds': round(end_wall - wall, 4),
+                  'cpu_seconds': round(end_cpu - cpu, 4),
+                  'peak_mb': round(current['peak_bytes'] / 2**20, 2),
+                  'peak_growth_mb': round((current['peak_bytes'] - memory) / 2**20, 2),
+                  'steps': current['steps']}
+        if profiler:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            record['cprofile_path'] = os.path.join(PROFILE_DIR, f'{name}.prof')
+            profiler.dump_stats(record['cprofile_path'])
+            record['hottest_functions'] = hottest_functions(profiler)
+        SESSION['stages'].append(record)
+        SESSION['current'] = None
+
+
+def hottest_functions(profiler, limit=TOP_FUNCTIONS):
+    """Functions with the most self time in a cProfile run"""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, func), (_, n_calls, self_time, cum_time, _) in stats.stats.items():
+        rows.append({'function': f'{os.path.basename(filename)}:{line}({func})', 'calls': n_calls,
+                     'self_seconds': round(self_time, 4), 'cumulative_seconds': round(cum_time, 4)})
+    rows.sort(key=lambda row: row['self_seconds'], reverse=True)
+    return rows[:limit]
+
+
+def write_report(json_path=REPORT_JSON, txt_path=REPORT_TXT):
+    """Consolidated JSON and text report of every profiled stage"""
+    stages = SESSION['stages']
+    report = {'started': SESSION.get('started'), 'python': platform.python_version(),
+              'cpu_count': os.cpu_count(), 'cprofile': SESSION['cprofile'],
+              'total_wall_seconds': round(sum(s['wall_seconds'] for s in stages), 4),
+              'total_cpu_seconds': round(sum(s['cpu_seconds'] for s in stages), 4),
+              'stages': stages}
+    os.makedirs(os.path.dirname(json_path), exist_ok=True)
+    with open(json_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    with open(txt_path, 'w') as f:
+        f.write("="*60 + "\n")
+        f.write("ANALYSIS PIPELINE PROFILE\n")
+        f.write("="*60 + "\n")
+        f.write(f"Started: {report['started']}   Python {report['python']}   {report['cpu_count']} cores\n")
+        f.write("CPU time is this process only (all threads); worker processes are not included.\n")
+        f.write("Memory is Python/NumPy allocations traced by tracemalloc: the peak held during the\n"
+                "stage or step, and how far that peak rose above what was held when it started.\n\n")
+        f.write(f"{'Stage / step':<44} {'wall s':>8} {'cpu s':>8} {'peak MB':>9} {'growth MB':>10}\n")
+        f.write("-"*83 + "\n")
+        for s in stages:
+            f.write(f"{s['name']:<44} {s['wall_seconds']:>8.3f} {s['cpu_seconds']:>8.3f} {s['peak_mb']:>9.1f} "
+                    f"{s['peak_growth_mb']:>10.1f}\n")
+            for st in s['steps']:
+                f.write(f"  {st['name'][:42]:<42} {st['wall_seconds']:>8.3f} {st['cpu_seconds']:>8.3f} "
+                        f"{st['peak_mb']:>9.1f} {st['peak_growth_mb']:>10.1f}\n")
+        f.write("-"*83 + "\n")
+        f.write(f"{'Total':<44} {report['total_wall_seconds']:>8.3f} {report['total_cpu_seconds']:>8.3f}\n")
+        for s in stages:
+            if 'hottest_functions' not in s:
+                continue
+            f.write(f"\nHottest functions in {s['name']} (self time, {s['cprofile_path']}):\n")
+            for row in s['hottest_functions']:
+                f.write(f"  {row['self_seconds']:>8.3f}s {row['cumulative_seconds']:>8.3f}s cum "
+                        f"{row['calls']:>9} calls  {row['function']}\n")
+    return report
@@ -0,0 +1,123 @@
+"""
+Live Survey Response Ingestion (validation and aggregate checkpoints)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+import hashlib
+import joblib
+import os
+from src import instruments
+
+CHECKPOINT_PATH = 'outputs/stats_checkpoint.pkl'
+CHECKPOINT_VERSION = 1
+CHECKPOINT_EVERY_ROWS = 1000
+CHECKPOINT_EVERY_SECONDS = 60
+
+# Request key -> column of the clustered dataset
+FIELDS = {
+    'university': 'University',
+    'department': 'Department',
+    'academic_year': 'Academic Year',
+    'gender': 'Gender',
+    'scholarship': 'Scholarship',
+    'age': 'Age',
+    'cgpa': 'Current CGPA'
+}
+CODED_FIELDS = ['academic_year', 'gender', 'scholarship']
+NUMERIC_FIELDS = ['age', 'cgpa']
+# Plausible values (inclusive); CGPA is on the 4-point scale, up to the survey's top bucket "3.8-4.3"
+FIELD_RANGES = {'academic_year': (1, 4), 'gender': (0, 1), 'scholarship': (0, 1), 'age': (15, 100), 'cgpa': (0, 4.3)}
+
+# Inverse of utils.encode_categorical_variables, for storing rows in the raw survey layout
+GENDER_NAMES = {0: 'Male', 1: 'Female'}
+SCHOLARSHIP_NAMES = {1: 'Yes', 0: 'No'}
+YEAR_NAMES = {1: '1st Year', 2: '2nd Year', 3: '3rd Year', 4: '4th Year'}
+
+
+def responses_frame(records):
+    """Validate posted responses and score them into rows shaped like outputs/clustered_data.csv
+    
+    records: list of dicts with the FIELDS keys plus <instrument>_responses answer lists.
+    Returns (rows, crisis flags); rows also keep every item answer. Any invalid record raises
+    ValueError naming its position.
+    """
+    if not isinstance(records, list) or not records:
+        raise ValueError('No responses given')
+    required = list(FIELDS) + [f'{key}_responses' for key in instruments.INSTRUMENTS]
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValueError(f'Response {i}: expected an object')
+        missing = [key for key in required if key not in record]
+        if missing:
+            raise ValueError(f'Response {i}: missing required fields: {missing}')
+    
+    rows = pd.DataFrame({col: [record[key] for record in records] for key, col in FIELDS.items()})
+    for key in CODED_FIELDS + NUMERIC_FIELDS:
+        values = pd.to_numeric(rows[FIELDS[key]], errors='coerce').to_numpy(dtype=np.float64)
+        bad = ~np.isfinite(values)
+        if key in CODED_FIELDS:
+            bad |= values != np.round(values)
+        if bad.any():
+            raise ValueError(f"Response {int(np.argmax(bad))}: {key} must be a "
+                             f"{'whole number' if key in CODED_FIELDS else 'number'}")
+        low, high = FIELD_RANGES[key]
+        outside = (values < low) | (values > high)
+        if outside.any():
+            raise ValueError(f"Response {int(np.argmax(outside))}: {key} must be between {low} and {high}")
+        rows[FIELDS[key]] = values.astype(np.int64) if key in CODED_FIELDS else values
+    
+    crisis = np.zeros(len(rows), dtype=bool)
+    for key, instrument in instruments.INSTRUMENTS.items():
+        try:
+            answers = np.array([record[f'{key}_responses'] for record in records], dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError(f'{key}_responses must be lists of {len(instrument["items"])} numbers')
+        if answers.ndim != 2 or (answers != np.round(answers)).any():
+            raise ValueError(f'{key}_responses must be lists of {len(instrument["items"])} whole numbers')
+        result = instruments.score(key, answers.astype(np.int64))
+        for col, values in zip(instruments.columns(key), answers.astype(np.int64).T):
+            rows[col] = values
+        rows[instrument['value_col']] = result['total']
+        rows[instrument['label_col']] = result['level']
+        crisis |= result['crisis']
+    return rows, crisis
+
+
+def survey_rows(rows):
+    """Validated rows back in the raw survey CSV's text encoding (Gender 'Male', Academic Year '2nd Year', ...)"""
+    survey = rows.copy()
+    survey['Gender'] = rows['Gender'].map(GENDER_NAMES)
+    survey['Academic Year'] = rows['Academic Year'].map(YEAR_NAMES)
+    survey['Did you receive a waiver or scholarship at your university?'] = rows['Scholarship'].map(SCHOLARSHIP_NAMES)
+    survey['Age'] = [f'{age:g}' for age in rows['Age']]
+    survey['Current CGPA'] = [f'{cgpa:g}' for cgpa in rows['Current CGPA']]
+    return survey
+
+
+def source_fingerprint(path):
+    """Content hash of the dataset the aggregates were built from"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def save_checkpoint(cube, n_ingested, source, path=CHECKPOINT_PATH):
+    """Persist the live aggregates atomically (write to a temp file, then rename)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump({'version': CHECKPOINT_VERSION, 'source': source, 'ingested': n_ingested, 'cube': cube},
+                path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def load_checkpoint(source, path=CHECKPOINT_PATH):
+    """(cube, ingested rows) from the last checkpoint, or None if missing or built from other data"""
+    if not os.path.exists(path):
+        return None
+    checkpoint = joblib.load(path)
+    if checkpoint.get('version') != CHECKPOINT_VERSION or checkpoint.get('source') != source:
+        return None
+    return checkpoint['cube'], checkpoint['ingested']
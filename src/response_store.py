@@ -0,0 +1,341 @@
+"""
+Append-Only SQLite Response Store (WAL, batched background writes)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import instruments
+
+STORE_PATH = 'data/responses.db'
+BATCH_ROWS = 1000
+FLUSH_SECONDS = 0.05
+WAIT_SECONDS = 30            # flush/close give up after this long (e.g. a writer stuck on a locked database)
+MAX_FAILED_ROWS = 100000     # rows of failed batches kept in memory for retry_failed(); older ones are dropped
+BENCHMARK_PATH = 'outputs/results/store_benchmark.json'
+
+# Raw survey layout, identical to data/student_mental_health_survey.csv
+DEMOGRAPHIC_COLUMNS = ['Age', 'Gender', 'University', 'Department', 'Academic Year', 'Current CGPA',
+                       'Did you receive a waiver or scholarship at your university?']
+SURVEY_COLUMNS = DEMOGRAPHIC_COLUMNS + [col for key, instrument in instruments.INSTRUMENTS.items()
+                                       for col in instruments.columns(key) + [instrument['value_col'],
+                                                                             instrument['label_col']]]
+PREDICTION_COLUMNS = ['age', 'gender', 'cgpa', 'scholarship', 'academic_year', 'cluster',
+                      'target', 'level', 'confidence']
+COHORT_INDEXES = {
+    'idx_responses_cohort': ['University', 'Department', 'Academic Year'],
+    'idx_responses_department': ['Department'],
+    'idx_responses_year': ['Academic Year']
+}
+
+
+def _quote(column):
+    """SQL identifier for a survey column (question text contains spaces and punctuation)"""
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _connect(path):
+    """One connection per thread/process: WAL so readers never block the writer"""
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+def create_schema(path=STORE_PATH):
+    """Append-only tables for survey responses and predictions, indexed on the cohort dimensions"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    conn = _connect(path)
+    with conn:
+        value_cols = {instrument['value_col'] for instrument in instruments.INSTRUMENTS.values()}
+        item_cols = {col for key in instruments.INSTRUMENTS for col in instruments.columns(key)}
+        columns = [f"{_quote(col)} {'INTEGER' if col in item_cols | value_cols else 'TEXT'}"
+                   for col in SURVEY_COLUMNS]
+        conn.execute(f"CREATE TABLE IF NOT EXISTS responses (id INTEGER PRIMARY KEY, "
+                     f"received_at REAL NOT NULL, {', '.join(columns)})")
+        conn.execute("CREATE TABLE IF NOT EXISTS predictions (id INTEGER PRIMARY KEY, created_at REAL NOT NULL, "
+                     "age REAL, gender INTEGER, cgpa REAL, scholarship INTEGER, academic_year INTEGER, "
+                     "cluster INTEGER, target TEXT, level TEXT, confidence REAL)")
+        for name, cols in COHORT_INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON responses ({', '.join(map(_quote, cols))})")
+    conn.close()
+
+
+def _insert_sql(table):
+    """Parameterised INSERT for a table's data columns"""
+    columns = ['received_at'] + SURVEY_COLUMNS if table == 'responses' else ['created_at'] + PREDICTION_COLUMNS
+    return f"INSERT INTO {table} ({', '.join(map(_quote, columns))}) VALUES ({', '.join('?' * len(columns))})"
+
+
+INSERT_SQL = {table: _insert_sql(table) for table in ('responses', 'predictions')}
+
+
+def _records(frame, columns, stamp):
+    """Row tuples for executemany (timestamp first, NumPy scalars as plain Python values)"""
+    values = frame[columns].astype(object).where(frame[columns].notna(), None).to_numpy()
+    return [(stamp,) + tuple(v.item() if isinstance(v, np.generic) else v for v in row) for row in values]
+
+
+def open_store(path=STORE_PATH, batch_rows=BATCH_ROWS, flush_seconds=FLUSH_SECONDS):
+    """Create the schema and start the single background writer; returns the store handle"""
+    create_schema(path)
+    store = {'path': path, 'queue': queue.Queue(), 'local': threading.local(),
+             'batch_rows': batch_rows, 'flush_seconds': flush_seconds, 'written': 0,
+             'error': None, 'failed': [], 'failed_rows': 0, 'dropped_rows': 0}
+    store['writer'] = threading.Thread(target=_writer, args=(store,), name='response-store-writer', daemon=True)
+    store['writer'].start()
+    return store
+
+
+def _writer(store):
+    """Drain the queue into grouped transactions: up to batch_rows rows, or whatever arrived within flush_seconds
+    
+    A batch that fails to commit (locked database, full disk, bad row) is kept in store['failed']
+    and its error recorded in store['error']; the writer carries on with the next batch.
+    """
+    conn = None
+    pending = store['queue']
+    while True:
+        item = pending.get()
+        if item is None:
+            pending.task_done()
+            break
+        batch, n_rows = [item], len(item[1])
+        deadline = time.monotonic() + store['flush_seconds']
+        while n_rows < store['batch_rows']:
+            try:
+                item = pending.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                pending.put(None)  # finish this batch, then stop
+                pending.task_done()
+                break
+            batch.append(item)
+            n_rows += len(item[1])
+        # One executemany per table for the whole batch, in a single transaction
+        tables = {}
+        for table, rows in batch:
+            tables.setdefault(table, []).extend(rows)
+        try:
+            if conn is None:
+                conn = _connect(store['path'])
+            with conn:
+                for table, rows in tables.items():
+                    conn.executemany(INSERT_SQL[table], rows)
+            store['written'] += n_rows
+            store['error'] = None
+        except Exception as e:
+            _keep_failed(store, batch, n_rows, e)
+        finally:
+            for _ in batch:
+                pending.task_done()
+    if conn is not None:
+        conn.close()
+
+
+def _keep_failed(store, batch, n_rows, error):
+    """Record a batch that could not be written, keeping at most MAX_FAILED_ROWS rows for a retry"""
+    store['error'] = f"{type(error).__name__}: {error}"
+    store['failed'].extend(batch)
+    store['failed_rows'] += n_rows
+    while store['failed_rows'] > MAX_FAILED_ROWS:
+        _, rows = store['failed'].pop(0)
+        store['failed_rows'] -= len(rows)
+        store['dropped_rows'] += len(rows)
+    print(f"  ⚠ Response store: {n_rows} rows not written ({store['error']}); "
+          f"{store['failed_rows']} kept for retry_failed()")
+
+
+def retry_failed(store):
+    """Queue the kept rows of failed batches again; returns how many rows were re-queued"""
+    failed, store['failed'] = store['failed'], []
+    n_rows, store['failed_rows'] = store['failed_rows'], 0
+    for item in failed:
+        store['queue'].put(item)
+    return n_rows
+
+
+def store_status(store):
+    """Writer health for /health: rows written, failed and dropped, and the last error (None once a batch succeeds)"""
+    return {'writer_alive': store['writer'].is_alive(), 'written': store['written'], 'error': store['error'],
+            'failed_rows': store['failed_rows'], 'dropped_rows': store['dropped_rows']}
+
+
+def submit_responses(store, frame):
+    """Queue raw survey rows (SURVEY_COLUMNS) for the writer; returns at once with the last write error (or None)"""
+    store['queue'].put(('responses', _records(frame, SURVEY_COLUMNS, time.time())))
+    return store['error']
+
+
+def submit_predictions(store, frame):
+    """Queue prediction rows (PREDICTION_COLUMNS) for the writer; returns at once with the last write error (or None)"""
+    store['queue'].put(('predictions', _records(frame, PREDICTION_COLUMNS, time.time())))
+    return store['error']
+
+
+def flush(store, timeout=WAIT_SECONDS):
+    """Block until every queued row is committed or failed; False if the writer did not finish within timeout"""
+    pending = store['queue']
+    deadline = time.monotonic() + timeout
+    with pending.all_tasks_done:
+        while pending.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not store['writer'].is_alive():
+                return False
+            pending.all_tasks_done.wait(min(remaining, 1.0))
+    return True
+
+
+def close_store(store, timeout=WAIT_SECONDS):
+    """Commit what is queued and stop the writer; False if it was still busy after timeout"""
+    store['queue'].put(None)
+    store['writer'].join(timeout)
+    return not store['writer'].is_alive()
+
+
+def connection(store):
+    """This thread's read connection (opened on first use)"""
+    local = store['local']
+    if not hasattr(local, 'conn'):
+        local.conn = _connect(store['path'])
+    return local.conn
+
+
+def read_responses(path=STORE_PATH):
+    """Every stored response in arrival order, with the raw CSV's columns (ValueError if there are none)"""
+    create_schema(path)  # a missing store becomes an empty one rather than a schema-less file
+    conn = _connect(path)
+    try:
+        df = pd.read_sql_query(f"SELECT {', '.join(map(_quote, SURVEY_COLUMNS))} FROM responses ORDER BY id", conn)
+    finally:
+        conn.close()
+    if df.empty:
+        raise ValueError(f"No responses in {path}; run import_csv first "
+                         f"(python src/response_store.py --import <survey.csv> --store {path})")
+    return df
+
+
+def query_responses(conn, filters=None, limit=100, after_id=0):
+    """Stored responses matching {column: [values]} on the indexed cohort columns, paged by id"""
+    clauses, params = ['id > ?'], [after_id]
+    for col, values in (filters or {}).items():
+        clauses.append(f"{_quote(col)} IN ({', '.join('?' * len(values))})")
+        params += [str(v) for v in values]
+    sql = (f"SELECT id, received_at, {', '.join(map(_quote, SURVEY_COLUMNS))} FROM responses "
+           f"WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ?")
+    return pd.read_sql_query(sql, conn, params=params + [limit])
+
+
+def count_responses(conn):
+    """Number of stored responses"""
+    return conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+def import_csv(csv_path, path=STORE_PATH, chunksize=100000):
+    """Bulk-load a raw survey CSV, one transaction per chunk"""
+    create_schema(path)
+    conn = _connect(path)
+    n_rows = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype=str):
+        for col in SURVEY_COLUMNS:
+            if col not in DEMOGRAPHIC_COLUMNS and not col.endswith('Label'):
+                chunk[col] = pd.to_numeric(chunk[col])
+        with conn:
+            conn.executemany(INSERT_SQL['responses'], _records(chunk, SURVEY_COLUMNS, time.time()))
+        n_rows += len(chunk)
+    conn.close()
+    return n_rows
+
+
+def _fresh_db(path):
+    """Empty store at path (benchmark runs start from scratch)"""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    create_schema(path)
+    return path
+
+
+def benchmark(n_rows=100000, batch_sizes=(1, 100, 1000, 10000), seed=42):
+    """Ingest throughput: one transaction per row vs batched background writes of several sizes"""
+    
+    print("\n" + "="*60)
+    print("RESPONSE STORE INGEST BENCHMARK")
+    print("="*60)
+    
+    from src.generate_data import generate_chunk, chunk_seed
+    sample = generate_chunk(n_rows, chunk_seed(seed, 0))
+    bench_dir = os.path.join('outputs', 'cache', 'store_benchmark')
+    os.makedirs(bench_dir, exist_ok=True)
+    results = []
+    
+    # Baseline: one INSERT and one commit per row on the calling (request) thread
+    rows = min(n_rows, 5000)
+    records = _records(sample.iloc[:rows], SURVEY_COLUMNS, time.time())
+    for i, synchronous in enumerate(['FULL', 'NORMAL'], 1):
+        path = _fresh_db(os.path.join(bench_dir, f'per_row_{synchronous.lower()}.db'))
+        conn = _connect(path)
+        conn.execute(f'PRAGMA synchronous={synchronous}')
+        start = time.perf_counter()
+        for record in records:
+            with conn:
+                conn.execute(INSERT_SQL['responses'], record)
+        seconds = time.perf_counter() - start
+        conn.close()
+        results.append({'mode': f'commit per row (synchronous={synchronous})', 'batch_rows': 1, 'rows': rows,
+                        'seconds': round(seconds, 3), 'rows_per_second': round(rows / seconds)})
+        print(f"[S.{i}] commit per row, sync {synchronous:<6} {rows:>9,} rows {rows / seconds:>12,.0f} rows/s")
+    
+    # Background writer: requests submit single rows, the writer groups them into transactions
+    records = _records(sample, SURVEY_COLUMNS, time.time())
+    for i, batch_rows in enumerate(batch_sizes, 3):
+        store = open_store(_fresh_db(os.path.join(bench_dir, f'batched_{batch_rows}.db')), batch_rows=batch_rows)
+        start = time.perf_counter()
+        for record in records:
+            store['queue'].put(('responses', [record]))
+        submitted = time.perf_counter() - start
+        flush(store)
+        seconds = time.perf_counter() - start
+        close_store(store)
+        results.append({'mode': 'batched writer', 'batch_rows': batch_rows, 'rows': n_rows,
+                        'seconds': round(seconds, 3), 'rows_per_second': round(n_rows / seconds),
+                        'submit_us_per_row': round(submitted / n_rows * 1e6, 2)})
+        print(f"[S.{i}] batched writer, batch {batch_rows:<6} {n_rows:>9,} rows {n_rows / seconds:>12,.0f} rows/s "
+              f"(submit {submitted / n_rows * 1e6:.1f} µs/row)")
+    
+    os.makedirs(os.path.dirname(BENCHMARK_PATH), exist_ok=True)
+    with open(BENCHMARK_PATH, 'w') as f:
+        json.dump({'rows': n_rows, 'results': results}, f, indent=2)
+    print(f"\n✓ Results saved to: {BENCHMARK_PATH}")
+    
+    print("\n" + "="*60)
+    print("✓ BENCHMARK COMPLETE")
+    print("="*60)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='SQLite response store: import survey CSVs, benchmark ingest')
+    parser.add_argument('--import', dest='import_csv', metavar='CSV', help='append a raw survey CSV to the store')
+    parser.add_argument('--store', default=STORE_PATH, help=f'store path (default: {STORE_PATH})')
+    parser.add_argument('--benchmark', type=int, metavar='ROWS', help='measure ingest throughput with ROWS rows')
+    args = parser.parse_args()
+    
+    if args.import_csv:
+        start = time.perf_counter()
+        n = import_csv(args.import_csv, args.store)
+        print(f"✓ Imported {n:,} responses into {args.store} in {time.perf_counter() - start:.2f}s")
+    if args.benchmark:
+        benchmark(args.benchmark)
+    if not (args.import_csv or args.benchmark):
+        parser.print_help()
@@ -0,0 +1,102 @@
+"""
+Similar-Student Index (KD-tree over the standardized clustering features)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+import sklearn
+from sklearn.preprocessing import StandardScaler
+from sklearn.neighbors import KDTree
+import joblib
+import os
+
+INDEX_PATH = 'outputs/models/similarity_index.pkl'
+INDEX_VERSION = 1
+
+# Same features and standardization as 3_clustering_analysis; request key -> column
+FEATURES = {
+    'age': 'Age',
+    'gender': 'Gender',
+    'cgpa': 'Current CGPA',
+    'scholarship': 'Scholarship',
+    'academic_year': 'Academic Year'
+}
+OUTCOMES = {'anxiety': 'Anxiety', 'stress': 'Stress', 'depression': 'Depression'}
+DEFAULT_K = 25
+MAX_K = 500
+
+
+def build_similarity_index(df, leaf_size=40):
+    """Scaler, KD-tree and the outcome arrays the neighbours are summarised from"""
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(df[list(FEATURES.values())])
+    outcomes = {}
+    for key, name in OUTCOMES.items():
+        codes, labels = pd.factorize(df[f'{name} Label'], sort=True)
+        outcomes[key] = {'values': df[f'{name} Value'].to_numpy(dtype=np.float64),
+                         'codes': codes, 'labels': list(labels)}
+    clusters = df['Cluster'].to_numpy() if 'Cluster' in df else None
+    return {'version': INDEX_VERSION, 'sklearn_version': sklearn.__version__, 'n_rows': len(df), 'scaler': scaler,
+            'tree': KDTree(X_scaled, leaf_size=leaf_size), 'outcomes': outcomes, 'clusters': clusters}
+
+
+def save_similarity_index(index, path=INDEX_PATH):
+    """Persist the index next to the prediction models"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(index, path)
+
+
+def load_similarity_index(path=INDEX_PATH):
+    """Load a persisted index (None if the clustering stage has not been run, or ran under another scikit-learn)"""
+    if not os.path.exists(path):
+        return None
+    index = joblib.load(path)
+    if index.get('sklearn_version') != sklearn.__version__:
+        return None
+    return index
+
+
+def nearest_clusters(index, rows):
+    """Cluster of each row's nearest indexed student (rows: DataFrame with the FEATURES columns)"""
+    X_scaled = index['scaler'].transform(rows[list(FEATURES.values())])
+    _, nearest = index['tree'].query(X_scaled, k=1)
+    return index['clusters'][nearest[:, 0]]
+
+
+def query_similar(index, students, k=DEFAULT_K):
+    """Aggregate outcomes of the k nearest students for each query (one batched tree query)
+    
+    students: list of dicts with the FEATURES request keys. Missing keys, non-numeric values
+    or k outside 1-MAX_K raise ValueError.
+    """
+    missing = sorted({key for s in students for key in FEATURES if key not in s})
+    if missing:
+        raise ValueError(f'Missing required fields: {missing}')
+    if not isinstance(k, int) or not 1 <= k <= min(MAX_K, index['n_rows']):
+        raise ValueError(f"k must be between 1 and {min(MAX_K, index['n_rows'])}")
+    try:
+        X = np.array([[float(s[key]) for key in FEATURES] for s in students])
+    except (TypeError, ValueError):
+        raise ValueError('Student features must be numbers')
+    
+    X_scaled = index['scaler'].transform(pd.DataFrame(X, columns=list(FEATURES.values())))
+    distances, neighbours = index['tree'].query(X_scaled, k=k)
+    
+    summaries = [{'neighbours': k, 'mean_distance': float(d.mean()), 'outcomes': {}} for d in distances]
+    for key, outcome in index['outcomes'].items():
+        values = outcome['values'][neighbours]
+        # Per-query label counts: one-hot over the (queries, k) neighbour codes
+        counts = (outcome['codes'][neighbours][..., None] == np.arange(len(outcome['labels']))).sum(axis=1)
+        means, stds = values.mean(axis=1), values.std(axis=1)
+        for i, summary in enumerate(summaries):
+            summary['outcomes'][key] = {
+                'mean': float(means[i]),
+                'std': float(stds[i]),
+                'distribution': {label: int(n) for label, n in zip(outcome['labels'], counts[i]) if n}
+            }
+    if index['clusters'] is not None:
+        for i, summary in enumerate(summaries):
+            ids, n = np.unique(index['clusters'][neighbours[i]], return_counts=True)
+            summary['clusters'] = {int(c): int(m) for c, m in zip(ids, n)}
+    return summaries
@@ -0,0 +1,224 @@
+"""
+Aggregate Cube for Filtered Statistics (OLAP-style, built once at load time)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+from src import instruments
+
+# Query parameter -> column; every combination of these values is one cube cell
+DIMENSIONS = {
+    'university': 'University',
+    'department': 'Department',
+    'year': 'Academic Year',
+    'gender': 'Gender',
+    'scholarship': 'Scholarship'
+}
+METRICS = ['Current CGPA', 'Anxiety Value', 'Stress Value', 'Depression Value']
+LABEL_COLS = ['Anxiety Label', 'Stress Label', 'Depression Label', 'Cluster']
+
+
+def cell_moments(cell, values, n_cells):
+    """Per-cell count, mean and co-moment matrix (sum of centered cross-products) of a batch of rows"""
+    count = np.bincount(cell, minlength=n_cells)
+    # Sums are taken about the batch mean so the cross-products do not lose precision
+    shift = values.mean(axis=0)
+    centered = values - shift
+    sums = np.stack([np.bincount(cell, weights=centered[:, i], minlength=n_cells)
+                     for i in range(values.shape[1])], axis=1)
+    products = np.empty((n_cells, values.shape[1], values.shape[1]))
+    for i in range(values.shape[1]):
+        for j in range(i, values.shape[1]):
+            products[:, i, j] = products[:, j, i] = np.bincount(
+                cell, weights=centered[:, i] * centered[:, j], minlength=n_cells)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cell_sums = np.where(count[:, None] > 0, sums / count[:, None], 0)
+    mean = shift + cell_sums
+    comoment = products - count[:, None, None] * cell_sums[:, :, None] * cell_sums[:, None, :]
+    return count, np.where(count[:, None] > 0, mean, 0), comoment
+
+
+def merge_moments(count_a, mean_a, comoment_a, count_b, mean_b, comoment_b):
+    """Combine two sets of (count, mean, co-moment) along the first axis (Chan et al.; Welford for one row)"""
+    count = count_a + count_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = np.where(count > 0, count_b / count, 0)[:, None]
+    delta = mean_b - mean_a
+    mean = mean_a + delta * weight
+    comoment = comoment_a + comoment_b + (count_a * weight[:, 0])[:, None, None] * delta[:, :, None] * delta[:, None, :]
+    return count, mean, comoment
+
+
+def pool_moments(counts, means, comoments):
+    """Merge many cells into one: pooled mean, then within-cell co-moments plus the spread of the cell means
+    
+    counts (cells,), means (cells, metrics), comoments (cells, metrics, metrics). Returns (n, mean, cov, corr).
+    """
+    n = counts.sum()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = counts @ means / n
+        spread = means - mean
+        comoment = comoments.sum(axis=0) + np.einsum('c,ci,cj->ij', counts, spread, spread)
+        cov = comoment / (n - 1)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        corr = cov / np.outer(std, std)
+    return n, mean, cov, corr
+
+
+def build_cube(df):
+    """Count, mean, co-moment matrix, min/max and label counts for every cell"""
+    categories = {}
+    codes = []
+    for dim, col in DIMENSIONS.items():
+        dim_codes, values = pd.factorize(df[col], sort=True)
+        categories[dim] = values.tolist()
+        codes.append(dim_codes)
+    shape = tuple(len(values) for values in categories.values())
+    n_cells = int(np.prod(shape))
+    cell = np.ravel_multi_index(codes, shape)
+    
+    values = df[METRICS].to_numpy(dtype=np.float64)
+    count, mean, comoment = cell_moments(cell, values, n_cells)
+    mins = np.full((n_cells, len(METRICS)), np.inf)
+    maxs = np.full((n_cells, len(METRICS)), -np.inf)
+    np.minimum.at(mins, cell, values)
+    np.maximum.at(maxs, cell, values)
+    
+    # Label counts: bincount over the joint (cell, label) code. Every instrument level gets a
+    # slot, even if unseen, so ingested rows can add to it
+    labels = {}
+    for col in LABEL_COLS:
+        names = sorted(set(df[col].unique()) | (set(instruments.LEVELS) if col != 'Cluster' else set()))
+        label_codes = pd.Categorical(df[col], categories=names).codes.astype(np.int64)
+        counts = np.bincount(cell * len(names) + label_codes, minlength=n_cells * len(names))
+        labels[col] = ([plain_value(name) for name in names], counts.reshape(shape + (len(names),)))
+    
+    return {
+        'categories': categories,
+        'shape': shape,
+        'count': count.reshape(shape),
+        'mean': mean.reshape(shape + (len(METRICS),)),
+        'comoment': comoment.reshape(shape + (len(METRICS), len(METRICS))),
+        'min': mins.reshape(shape + (len(METRICS),)),
+        'max': maxs.reshape(shape + (len(METRICS),)),
+        'labels': labels
+    }
+
+
+def update_cube(cube, rows):
+    """Add new rows in place: constant work per row, merged into only the cells they fall in
+    
+    rows needs the DIMENSIONS, METRICS and LABEL_COLS columns. Everything is validated before
+    the cube changes; a value outside the cube's categories or labels raises ValueError.
+    """
+    codes = []
+    for dim, col in DIMENSIONS.items():
+        codes.append(_codes(rows[col], cube['categories'][dim], dim))
+    label_codes = {col: _codes(rows[col], names, col) for col, (names, _) in cube['labels'].items()}
+    values = rows[METRICS].to_numpy(dtype=np.float64)
+    if not np.isfinite(values).all():
+        raise ValueError(f"{', '.join(METRICS)} must be numbers")
+    
+    shape = cube['shape']
+    n_cells = int(np.prod(shape))
+    cell = np.ravel_multi_index(codes, shape)
+    
+    # Moments of the batch per touched cell, merged with Chan's formula (Welford's update for one row)
+    touched, local = np.unique(cell, return_inverse=True)
+    batch = cell_moments(local, values, len(touched))
+    count, mean, comoment = (cube[key].reshape((n_cells,) + cube[key].shape[len(shape):])
+                             for key in ('count', 'mean', 'comoment'))
+    count[touched], mean[touched], comoment[touched] = merge_moments(
+        count[touched], mean[touched], comoment[touched], *batch)
+    np.minimum.at(cube['min'].reshape(n_cells, -1), cell, values)
+    np.maximum.at(cube['max'].reshape(n_cells, -1), cell, values)
+    for col, (names, counts) in cube['labels'].items():
+        np.add.at(counts.reshape(n_cells, len(names)), (cell, label_codes[col]), 1)
+    return len(rows)
+
+
+def _codes(column, categories, name):
+    """Positions of a column's values in a category list (matched on text form)"""
+    lookup = {str(value): code for code, value in enumerate(categories)}
+    # Map the few distinct values, not every row
+    inverse, distinct = pd.factorize(column.to_numpy())
+    unknown = [value for value in distinct if str(value) not in lookup]
+    if unknown or (inverse < 0).any():
+        raise ValueError(f"Unknown {name} {unknown[0] if unknown else None!r}, "
+                         f"expected one of {[str(v) for v in categories]}")
+    return np.array([lookup[str(value)] for value in distinct], dtype=np.int64)[inverse]
+
+
+def select_cells(cube, filters):
+    """Per-dimension code index from {dimension: [values]}; unknown dimensions or values raise ValueError"""
+    index = []
+    for dim, values in cube['categories'].items():
+        wanted = filters.get(dim)
+        if not wanted:
+            index.append(np.arange(len(values)))
+            continue
+        # Query strings are matched against the category's text form ('2' selects Academic Year 2)
+        lookup = {str(value): code for code, value in enumerate(values)}
+        unknown = [value for value in wanted if str(value) not in lookup]
+        if unknown:
+            raise ValueError(f"Unknown {dim} {unknown[0]!r}, expected one of {[str(v) for v in values]}")
+        index.append(np.array(sorted({lookup[str(value)] for value in wanted})))
+    extra = set(filters) - set(cube['categories'])
+    if extra:
+        raise ValueError(f"Unknown filter {sorted(extra)[0]!r}, expected one of {list(DIMENSIONS)}")
+    return np.ix_(*index)
+
+
+def query_cube(cube, filters=None):
+    """/stats payload for the rows matching the filters, merged from cube cells"""
+    cells = select_cells(cube, filters or {})
+    dims = tuple(range(len(cube['shape'])))
+    counts = cube['count'][cells].ravel()
+    means = cube['mean'][cells].reshape(len(counts), len(METRICS))
+    comoments = cube['comoment'][cells].reshape(len(counts), len(METRICS), len(METRICS))
+    mins = cube['min'][cells].min(axis=dims)
+    maxs = cube['max'][cells].max(axis=dims)
+    
+    n, mean, cov, corr = pool_moments(counts, means, comoments)
+    n = int(n)
+    std = np.sqrt(np.clip(np.diag(cov), 0, None))
+    
+    distributions = {}
+    for col, (names, label_counts) in cube['labels'].items():
+        totals = label_counts[cells].sum(axis=dims)
+        distributions[col] = {name: int(c) for name, c in sorted(zip(names, totals), key=lambda x: -x[1]) if c}
+    
+    cgpa = METRICS.index('Current CGPA')
+    return {
+        'total_students': n,
+        'cgpa': {
+            'mean': _json_float(mean[cgpa]),
+            'std': _json_float(std[cgpa]),
+            'min': _json_float(mins[cgpa]),
+            'max': _json_float(maxs[cgpa])
+        },
+        'mental_health': {
+            name: {
+                'mean': _json_float(mean[METRICS.index(f'{name.title()} Value')]),
+                'std': _json_float(std[METRICS.index(f'{name.title()} Value')]),
+                'distribution': distributions[f'{name.title()} Label']
+            }
+            for name in ['anxiety', 'stress', 'depression']
+        },
+        'correlations': {
+            f'cgpa_{name}': _json_float(corr[cgpa, METRICS.index(f'{name.title()} Value')])
+            for name in ['anxiety', 'stress', 'depression']
+        },
+        'clusters': distributions['Cluster']
+    }
+
+
+def plain_value(value):
+    """Plain Python value of a NumPy scalar (labels, category codes), for JSON and dict keys"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _json_float(value):
+    """float for JSON, with NaN/inf (empty or single-row selection) as None"""
+    return float(value) if np.isfinite(value) else None
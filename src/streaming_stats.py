@@ -0,0 +1,166 @@
+"""
+Mergeable Streaming Statistics (grouped moments, value counts, quantile sketches, row samples)
+Author: Sakhi Patel
+"""
+
+import pandas as pd
+import numpy as np
+from src.stats_cube import cell_moments, merge_moments, plain_value
+
+SKETCH_CAPACITY = 1 << 16    # distinct values a sketch keeps exactly; beyond this it compresses
+SKETCH_ACCURACY = 0.005      # compressed sketches keep every value within 0.5% (relative) of its true value
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+
+# Each accumulator is a plain dict built from one chunk and combined with merge_* (None is empty).
+# Merging is associative, so chunks can be accumulated in any process and combined in any order;
+# memory follows the number of groups and distinct values, not rows.
+
+
+def group_moments(keys, values):
+    """Count, mean and co-moment matrix per distinct row of keys (rows, k numeric codes) for values (rows, d)"""
+    unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+    count, mean, comoment = cell_moments(inverse.ravel(), values, len(unique))
+    return {'keys': unique, 'count': count, 'mean': mean, 'comoment': comoment}
+
+
+def merge_group_moments(a, b):
+    """Combine two grouped-moment accumulators; groups present in only one are carried over"""
+    if a is None or b is None:
+        return b if a is None else a
+    keys, inverse = np.unique(np.concatenate([a['keys'], b['keys']]), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    
+    def aligned(m, rows):
+        """Moments placed on the merged key list (zero for groups the accumulator has not seen)"""
+        count = np.zeros(len(keys), dtype=np.int64)
+        mean = np.zeros((len(keys),) + m['mean'].shape[1:])
+        comoment = np.zeros((len(keys),) + m['comoment'].shape[1:])
+        count[rows], mean[rows], comoment[rows] = m['count'], m['mean'], m['comoment']
+        return count, mean, comoment
+    
+    count, mean, comoment = merge_moments(*aligned(a, inverse[:len(a['keys'])]),
+                                          *aligned(b, inverse[len(a['keys']):]))
+    return {'keys': keys, 'count': count, 'mean': mean, 'comoment': comoment}
+
+
+def value_counts(column):
+    """Count of every value in a column (missing values skipped)"""
+    return {plain_value(value): int(count) for value, count in column.value_counts(dropna=True).items()}
+
+
+def merge_value_counts(a, b):
+    """Sum two value-count accumulators"""
+    if a is None or b is None:
+        return b if a is None else a
+    merged = dict(a)
+    for value, count in b.items():
+        merged[value] = merged.get(value, 0) + count
+    return merged
+
+
+def sketch(values):
+    """Quantile sketch of a batch: exact distinct values with counts, plus the exact count, mean, min and max
+    
+    Up to SKETCH_CAPACITY distinct values the sketch is the exact distribution, so quantiles,
+    histograms and densities computed from it equal those of the raw values. Beyond that, every
+    value is rounded to a log-spaced bucket (relative error at most SKETCH_ACCURACY), so its size
+    depends on the range of the values and not on their number.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    points, counts = np.unique(values, return_counts=True)
+    mean = float(values.mean()) if len(values) else 0.0
+    result = {'points': points, 'counts': counts.astype(np.int64), 'n': len(values), 'compressed': False,
+              'mean': mean, 'm2': float(((values - mean) ** 2).sum()),
+              'min': float(values.min()) if len(values) else np.inf,
+              'max': float(values.max()) if len(values) else -np.inf}
+    return _bounded(result)
+
+
+def _buckets(points):
+    """Log-spaced bucket representative of each value (zero stays zero); the same value always maps the same way"""
+    magnitude = np.abs(points)
+    with np.errstate(divide='ignore'):
+        index = np.ceil(np.log(magnitude) / np.log(_GAMMA))
+    return np.where(magnitude > 0, np.sign(points) * 2 * _GAMMA ** index / (_GAMMA + 1), 0.0)
+
+
+def _collapse(s, points):
+    """Sketch with its points replaced (duplicates summed)"""
+    unique, inverse = np.unique(points, return_inverse=True)
+    counts = np.bincount(inverse.ravel(), weights=s['counts'], minlength=len(unique)).astype(np.int64)
+    return {**s, 'points': unique, 'counts': counts}
+
+
+def compress(s):
+    """Round a sketch's values to their buckets"""
+    return s if s['compressed'] else {**_collapse(s, _buckets(s['points'])), 'compressed': True}
+
+
+def _bounded(s):
+    """Compress once the exact distribution outgrows SKETCH_CAPACITY"""
+    return compress(s) if not s['compressed'] and len(s['points']) > SKETCH_CAPACITY else s
+
+
+def merge_sketches(a, b):
+    """Combine two sketches; if either is compressed, so is the result"""
+    if a is None or b is None:
+        return b if a is None else a
+    if a['compressed'] or b['compressed']:
+        a, b = compress(a), compress(b)
+    n = a['n'] + b['n']
+    delta = b['mean'] - a['mean']
+    merged = {'points': np.concatenate([a['points'], b['points']]),
+              'counts': np.concatenate([a['counts'], b['counts']]),
+              'n': n, 'compressed': a['compressed'],
+              'mean': a['mean'] + delta * b['n'] / n if n else 0.0,
+              'm2': a['m2'] + b['m2'] + delta ** 2 * a['n'] * b['n'] / n if n else 0.0,
+              'min': min(a['min'], b['min']), 'max': max(a['max'], b['max'])}
+    return _bounded(_collapse(merged, merged['points']))
+
+
+def quantiles(s, q):
+    """Quantiles with np.percentile's linear interpolation (exact for an uncompressed sketch)"""
+    positions = (s['n'] - 1) * np.asarray(q, dtype=np.float64)
+    ends = np.cumsum(s['counts'])
+    lower = s['points'][np.searchsorted(ends, np.floor(positions), side='right')]
+    upper = s['points'][np.searchsorted(ends, np.ceil(positions), side='right')]
+    return lower + (positions - np.floor(positions)) * (upper - lower)
+
+
+def mean_std(s):
+    """Mean and sample standard deviation (ddof=1), kept exactly alongside the sketch"""
+    return s['mean'], float(np.sqrt(s['m2'] / (s['n'] - 1))) if s['n'] > 1 else 0.0
+
+
+def histogram(s, bins):
+    """np.histogram(values, bins) of the sketched values: edges from the exact min and max"""
+    # Bucketed values may round just past the extremes; they still belong to the outer bins
+    points = np.clip(s['points'], s['min'], s['max'])
+    counts, edges = np.histogram(points, bins=bins, range=(s['min'], s['max']), weights=s['counts'])
+    return counts.round().astype(np.int64), edges
+
+
+def row_sample(frame, chunk, size):
+    """Up to size rows of a chunk chosen by content hash: merging samples gives the rows with the smallest hashes
+    
+    The choice depends only on row contents, so any chunking (or none) picks the same rows.
+    """
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    sample = {'hash': hashes, 'chunk': np.full(len(frame), chunk), 'row': np.arange(len(frame)),
+              'values': frame.to_numpy(dtype=np.float64)}
+    return _smallest(sample, size)
+
+
+def merge_row_samples(a, b, size):
+    """Keep the size rows with the smallest hashes of two samples"""
+    if a is None or b is None:
+        return b if a is None else a
+    return _smallest({key: np.concatenate([a[key], b[key]]) for key in a}, size)
+
+
+def _smallest(sample, size):
+    """The size rows with the smallest (hash, chunk, row), back in file order"""
+    keep = np.lexsort((sample['row'], sample['chunk'], sample['hash']))[:size]
+    keep = keep[np.lexsort((sample['row'][keep], sample['chunk'][keep]))]
+    return {key: value[keep] for key, value in sample.items()}
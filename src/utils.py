@@ -6,7 +6,13 @@ Author: Sakhi Patel
 import pandas as pd
 import numpy as np
 import os
-import matplotlib.pyplot as plt
+import json
+import hashlib
+
+# Figure render cache: manifest of cache keys for every saved figure
+FIGURE_CACHE_MANIFEST = 'figure_cache.json'
+FIGURE_CACHE_VERSION = 1
+PLOT_STATS = {'rendered': 0, 'reused': 0}
 
 
 def convert_age(age_str):
@@ -71,10 +77,90 @@ def handle_missing_values(df):
     return df_clean
 
 
-def save_plot(filename, output_dir='outputs/visualizations'):
+def _load_figure_manifest(output_dir):
+    """Load the figure cache manifest, empty if missing or unreadable"""
+    manifest_path = os.path.join(output_dir, FIGURE_CACHE_MANIFEST)
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def figure_cache_key(data, code_file, **params):
+    """Hash the plotted data, the plot parameters and the drawing module's source"""
+    h = hashlib.sha256()
+    h.update(str(FIGURE_CACHE_VERSION).encode())
+    
+    # Data slice
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    if isinstance(data, pd.DataFrame):
+        h.update(json.dumps([str(c) for c in data.columns]).encode())
+        h.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+    elif isinstance(data, (dict, list)):
+        # Aggregates (src/eda_aggregates.py) are plain JSON values
+        h.update(json.dumps(data, sort_keys=True).encode())
+    else:
+        arr = np.ascontiguousarray(data)
+        h.update(str((arr.dtype, arr.shape)).encode())
+        h.update(arr.tobytes())
+    
+    # Plot parameters
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    
+    # Code version: source of the module drawing the figure
+    with open(code_file, 'rb') as f:
+        h.update(f.read())
+    
+    return h.hexdigest()
+
+
+def figure_is_cached(filename, cache_key, output_dir='outputs/visualizations'):
+    """Check whether a figure can be reused instead of re-rendered"""
+    filepath = os.path.join(output_dir, filename)
+    manifest = _load_figure_manifest(output_dir)
+    if manifest.get(filename) == cache_key and os.path.exists(filepath):
+        PLOT_STATS['reused'] += 1
+        print(f"  ↺ Reused: {filename}")
+        return True
+    return False
+
+
+def plot_cache_key(filename, data, code_file, enabled=True, output_dir='outputs/visualizations', **params):
+    """Return the cache key of a figure that must be drawn, or None to skip it"""
+    if not enabled:
+        return None
+    cache_key = figure_cache_key(data, code_file, **params)
+    if figure_is_cached(filename, cache_key, output_dir):
+        return None
+    return cache_key
+
+
+def load_plotting(palette=None):
+    """Import matplotlib/seaborn on first use and apply the shared plot style"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set_style('whitegrid')
+    if palette:
+        sns.set_palette(palette)
+    return plt, sns
+
+
+def save_plot(filename, output_dir='outputs/visualizations', cache_key=None):
     """Save matplotlib figure to file"""
+    import matplotlib.pyplot as plt
     os.makedirs(output_dir, exist_ok=True)
     filepath = os.path.join(output_dir, filename)
     plt.savefig(filepath, dpi=300, bbox_inches='tight')
     plt.close()
+    PLOT_STATS['rendered'] += 1
+    
+    # Record cache key so unchanged figures are skipped next run
+    if cache_key is not None:
+        manifest = _load_figure_manifest(output_dir)
+        manifest[filename] = cache_key
+        with open(os.path.join(output_dir, FIGURE_CACHE_MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    
     print(f"  ✓ Saved: {filename}")
@@ -56,6 +56,16 @@ def test_predict():
     print(f"Anxiety: {result['predictions']['anxiety']['level']}")
     print(f"Stress: {result['predictions']['stress']['level']}")
     print(f"Depression: {result['predictions']['depression']['level']}")
+    
+    # Test case 3: Same student on the fast tier (distilled trees, escalated when unsure)
+    print("\nCase 3: Fast Tier")
+    response = requests.post(f'{BASE_URL}/predict', json={**data, 'tier': 'fast'})
+    print(f"Status: {response.status_code}")
+    if response.status_code == 200:
+        for name, pred in response.json()['predictions'].items():
+            print(f"{name.title()}: {pred['level']} ({pred['confidence']:.2f}, served by {pred['tier']})")
+    else:
+        print(response.json()['error'])
 
 def test_assess():
     """Test assess endpoint"""
@@ -100,6 +110,120 @@ def test_stats():
     print(f"  CGPA vs Anxiety: {result['correlations']['cgpa_anxiety']:.3f}")
     print(f"  CGPA vs Stress: {result['correlations']['cgpa_stress']:.3f}")
     print(f"  CGPA vs Depression: {result['correlations']['cgpa_depression']:.3f}")
+    
+    response = requests.get(f'{BASE_URL}/stats', params={'university': 'Duke University', 'year': 2})
+    result = response.json()
+    print(f"\nDuke University, 2nd year: {result['total_students']} students, "
+          f"mean stress {result['mental_health']['stress']['mean']:.2f}")
+
+def test_clusters():
+    """Test clusters endpoint"""
+    print("\n" + "="*60)
+    print("TEST 6: Cluster Profiles")
+    print("="*60)
+    response = requests.get(f'{BASE_URL}/clusters')
+    print(f"Status: {response.status_code}")
+    result = response.json()
+    
+    for cluster in result['clusters']:
+        print(f"  Cluster {cluster['cluster']}: n={cluster['size']}, "
+              f"mean CGPA={cluster['means']['Current CGPA']:.2f}")
+
+def test_percentile():
+    """Test percentile endpoint"""
+    print("\n" + "="*60)
+    print("TEST 7: Percentile Ranks")
+    print("="*60)
+    response = requests.post(f'{BASE_URL}/percentile', json={
+        'scores': {'stress': [10, 25, 35]},
+        'cohort': {'university': 'Duke University'}
+    })
+    print(f"Status: {response.status_code}")
+    result = response.json()
+    
+    for rank in result['percentiles']['stress']:
+        print(f"  Stress {rank['score']:.0f}: {rank['percentile']['all']:.1f}th percentile overall, "
+              f"{rank['percentile']['university']:.1f}th at Duke")
+
+def test_similar():
+    """Test similar endpoint"""
+    print("\n" + "="*60)
+    print("TEST 8: Similar Students")
+    print("="*60)
+    response = requests.post(f'{BASE_URL}/similar', json={
+        'age': 20, 'gender': 0, 'cgpa': 3.5, 'scholarship': 1, 'academic_year': 2, 'k': 10
+    })
+    print(f"Status: {response.status_code}")
+    result = response.json()
+    
+    for name, outcome in result['outcomes'].items():
+        print(f"  {name.title()}: mean {outcome['mean']:.1f}, {outcome['distribution']}")
+
+def test_responses():
+    """Test responses endpoint"""
+    print("\n" + "="*60)
+    print("TEST 9: Live Response Ingestion")
+    print("="*60)
+    before = requests.get(f'{BASE_URL}/stats').json()['total_students']
+    response = requests.post(f'{BASE_URL}/responses', json={
+        'university': 'Duke University', 'department': 'Biology',
+        'academic_year': 2, 'gender': 1, 'scholarship': 0, 'age': 20, 'cgpa': 3.4,
+        'anxiety_responses': [2, 3, 1, 2, 3, 2, 1],
+        'stress_responses': [2, 2, 3, 2, 1, 3, 2, 1, 2, 3],
+        'depression_responses': [1, 2, 1, 2, 3, 2, 1, 0, 0]
+    })
+    print(f"Status: {response.status_code}")
+    after = requests.get(f'{BASE_URL}/stats').json()['total_students']
+    print(f"  Students in /stats: {before} → {after}")
+    
+    stored = requests.get(f'{BASE_URL}/responses', params={'university': 'Duke University', 'limit': 5}).json()
+    print(f"  Stored responses: {stored['stored_responses']} (first page: {len(stored['responses'])} Duke rows)")
+
+def test_explain():
+    """Test explain endpoint"""
+    print("\n" + "="*60)
+    print("TEST 10: Prediction Explanations")
+    print("="*60)
+    response = requests.post(f'{BASE_URL}/explain', json={
+        'age': 20, 'gender': 1, 'cgpa': 2.5, 'scholarship': 0, 'academic_year': 2
+    })
+    print(f"Status: {response.status_code}")
+    result = response.json()
+    
+    for name, explanation in result.items():
+        top = explanation['contributions'][0]
+        print(f"  {name.title()}: {explanation['level']} ({explanation['probability']:.2f}), "
+              f"baseline {explanation['baseline']:.2f}, biggest effect {top['feature']} {top['contribution']:+.2f}")
+
+def test_drift():
+    """Test drift endpoint"""
+    print("\n" + "="*60)
+    print("TEST 11: Input Drift Monitor")
+    print("="*60)
+    response = requests.get(f'{BASE_URL}/drift', params={'refresh': 1})
+    print(f"Status: {response.status_code}")
+    result = response.json()
+    
+    print(f"  Overall: {result['status']} ({result['window']['observations']} recent /predict inputs)")
+    for name, feature in result['window']['features'].items():
+        print(f"  {name:<14} PSI {feature['psi']:.3f}  KS {feature['ks']:.3f}  {feature['status']}")
+
+def test_eda():
+    """Test EDA aggregates endpoint"""
+    print("\n" + "="*60)
+    print("TEST 12: EDA Aggregates")
+    print("="*60)
+    response = requests.get(f'{BASE_URL}/eda', params={'section': ['groups', 'correlation']})
+    print(f"Status: {response.status_code}")
+    result = response.json()
+    
+    print(f"  Rows: {result['rows']}  (store version {result['version']}, source {result['source']}, exact {result['exact']})")
+    columns, matrix = result['correlation']['columns'], result['correlation']['matrix']
+    for name, row in zip(columns[1:], matrix[1:]):
+        print(f"  CGPA vs {name:<17} {row[0]:.3f}")
+    gender = result['groups']['Gender']
+    for value, mean in zip(gender['values'], gender['mean']):
+        print(f"  Gender {value}: mean scores {[round(m, 1) for m in mean]}")
 
 def main():
     """Run all tests"""
@@ -115,11 +239,18 @@ def main():
         test_predict()
         test_assess()
         test_stats()
+        test_clusters()
+        test_percentile()
+        test_similar()
+        test_responses()
+        test_explain()
+        test_drift()
+        test_eda()
         
         print("\n" + "="*60)
         print("✓ ALL TESTS COMPLETED")
         print("="*60 + "\n")
-        
+    
     except requests.exceptions.ConnectionError:
         print("\n❌ ERROR: Cannot connect to API")
         print("Make sure the API is running: python api.py\n")